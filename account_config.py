@@ -0,0 +1,113 @@
+"""
+Cached per-symbol leverage / margin type and the account's position mode.
+
+The state is loaded in bulk with one position-information call and kept
+current from ACCOUNT_CONFIG_UPDATE events, so change requests that would not
+change anything are skipped instead of costing a signed round trip.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+BULK_WORKERS = 8
+
+# position information reports 'cross'/'isolated', the change endpoint takes 'CROSSED'/'ISOLATED'
+MARGIN_TYPES = {'cross': 'CROSSED', 'crossed': 'CROSSED', 'isolated': 'ISOLATED'}
+
+
+class AccountConfigCache:
+    def __init__(self):
+        self.leverage = {}
+        self.margin_type = {}
+        self.dual_side = None
+        self.loaded = False
+        self.tracking = False       # True once ACCOUNT_CONFIG_UPDATE events keep the state current
+        self.on_change = None
+        self._lock = threading.Lock()
+
+    def load(self, client):
+        """Bulk load leverage and margin type for every symbol plus the position mode"""
+        positions = client.futures_position_information()
+        mode = client.futures_get_position_mode()
+        with self._lock:
+            for pos in positions:
+                if 'leverage' in pos:
+                    self.leverage[pos['symbol']] = int(pos['leverage'])
+                if 'marginType' in pos:
+                    self.margin_type[pos['symbol']] = MARGIN_TYPES.get(pos['marginType'].lower(), pos['marginType'].upper())
+            self.dual_side = bool(mode.get('dualSidePosition'))
+            self.loaded = True
+        logger.info(f"Loaded account config for {len(self.leverage)} symbols")
+
+    def snapshot(self):
+        """JSON-able copy of the state, for a warm start (profiles.ProfileCache)"""
+        with self._lock:
+            return {'leverage': dict(self.leverage), 'margin_type': dict(self.margin_type),
+                    'dual_side': self.dual_side}
+
+    def restore(self, state):
+        with self._lock:
+            self.leverage.update(state.get('leverage', {}))
+            self.margin_type.update(state.get('margin_type', {}))
+            self.dual_side = state.get('dual_side')
+            self.loaded = True
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change(self)
+
+    def attach(self, hub):
+        """Keep leverage current from a StreamHub's user data stream"""
+        hub.on('ACCOUNT_CONFIG_UPDATE', self.on_config_update)
+        self.tracking = True
+
+    def on_config_update(self, event):
+        """Handle ACCOUNT_CONFIG_UPDATE (leverage change on any client, e.g. the web UI)"""
+        config = event.get('ac')
+        if config:
+            with self._lock:
+                self.leverage[config['s']] = int(config['l'])
+            self._changed()
+
+    def ensure_leverage(self, client, symbol, leverage):
+        """Change leverage unless it is already set; returns the response or the cached state"""
+        if self.leverage.get(symbol) == leverage:
+            logger.info(f"Leverage for {symbol} already {leverage}, skipping change")
+            return {'symbol': symbol, 'leverage': leverage, 'cached': True}
+        response = client.futures_change_leverage(symbol=symbol, leverage=leverage)
+        with self._lock:
+            self.leverage[symbol] = int(response.get('leverage', leverage))
+        self._changed()
+        return response
+
+    def ensure_margin_type(self, client, symbol, margin_type):
+        """Change the margin type (ISOLATED/CROSSED) unless it is already set"""
+        margin_type = MARGIN_TYPES.get(margin_type.lower(), margin_type.upper())
+        if self.margin_type.get(symbol) == margin_type:
+            logger.info(f"Margin type for {symbol} already {margin_type}, skipping change")
+            return {'symbol': symbol, 'marginType': margin_type, 'cached': True}
+        response = client.futures_change_margin_type(symbol=symbol, marginType=margin_type)
+        with self._lock:
+            self.margin_type[symbol] = margin_type
+        self._changed()
+        return response
+
+    def ensure_leverage_bulk(self, client, leverages, max_workers=BULK_WORKERS):
+        """Set {symbol: leverage} concurrently, skipping symbols already at that leverage"""
+        todo = {symbol: lev for symbol, lev in leverages.items() if self.leverage.get(symbol) != lev}
+        results = {symbol: {'symbol': symbol, 'leverage': lev, 'cached': True}
+                   for symbol, lev in leverages.items() if symbol not in todo}
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(todo))) as pool:
+                futures = {symbol: pool.submit(self.ensure_leverage, client, symbol, lev)
+                           for symbol, lev in todo.items()}
+                for symbol, future in futures.items():
+                    try:
+                        results[symbol] = future.result()
+                    except Exception as e:
+                        logger.error(f"Leverage change failed for {symbol}: {e}")
+                        results[symbol] = None
+        return results
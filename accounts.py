@@ -0,0 +1,135 @@
+"""
+Multi-account execution.
+
+Accounts are read from .env: API_KEY/API_SECRET is the "main" account and
+every name listed in ACCOUNTS=sub1,sub2 adds SUB1_API_KEY/SUB1_API_SECRET...
+
+MultiAccountExecutor fans one order (or per-account scaled sizes) out to all
+accounts concurrently. Exchange info is loaded once and shared; each key
+keeps its own rate budget and pooled HTTP session,
+so total wall-clock time is about one order round trip, not N.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Binance USDT-M futures allows 300 orders per 10 seconds per account
+ORDER_RATE = 30.0
+ORDER_BURST = 300
+POOL_SIZE = 8
+
+
+class RateBudget:
+    """Token bucket; acquire() blocks until a request fits in the budget"""
+
+    def __init__(self, rate=ORDER_RATE, burst=ORDER_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cost=1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= cost:
+                    self.tokens -= cost
+                    return
+                wait = (cost - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def account_credentials(name):
+    """(api_key, api_secret) of an account: API_KEY/API_SECRET for "main", else NAME_API_KEY/NAME_API_SECRET"""
+    prefix = "" if name == "main" else f"{name.upper()}_"
+    key = os.getenv(f"{prefix}API_KEY")
+    secret = os.getenv(f"{prefix}API_SECRET")
+    if not key or not secret:
+        raise ValueError(f"Account {name}: {prefix}API_KEY/{prefix}API_SECRET not set")
+    return key, secret
+
+
+def load_accounts():
+    """Return {name: (api_key, api_secret)} from the environment"""
+    accounts = {}
+    if os.getenv("API_KEY") and os.getenv("API_SECRET"):
+        accounts["main"] = account_credentials("main")
+    for name in filter(None, (n.strip() for n in os.getenv("ACCOUNTS", "").split(","))):
+        accounts[name] = account_credentials(name)
+    return accounts
+
+
+def pool_session(client, size=POOL_SIZE):
+    """Give a client's requests session a connection pool large enough for concurrent calls"""
+    adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+    client.session.mount("https://", adapter)
+    return client
+
+
+class MultiAccountExecutor:
+    def __init__(self, accounts, testnet=True, bot_class=None, profile=None):
+        if not accounts:
+            raise ValueError("No accounts configured")
+        if bot_class is None:
+            from bot import BasicBot as bot_class
+
+        names = list(accounts)
+        self._pool = ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="account")
+
+        def connect(name, exchange_info):
+            api_key, api_secret = accounts[name]
+            bot = bot_class(api_key, api_secret, testnet=testnet, exchange_info=exchange_info,
+                            profile=profile, account=name)
+            pool_session(bot.client)
+            return bot
+
+        # The first account loads exchange info; the rest reuse it and connect in parallel
+        first = connect(names[0], None)
+        self.exchange_info = first.exchange_info
+        others = {name: self._pool.submit(connect, name, self.exchange_info) for name in names[1:]}
+        self.bots = {names[0]: first}
+        self.bots.update({name: future.result() for name, future in others.items()})
+        self.budgets = {name: RateBudget() for name in names}
+
+    def _run(self, name, method, args, kwargs):
+        self.budgets[name].acquire()
+        return getattr(self.bots[name], method)(*args, **kwargs)
+
+    def fan_out(self, method, symbol, side, quantity, *args, scale=None, **kwargs):
+        """Call a BasicBot order method on every account concurrently; returns {account: response}
+
+        scale maps account name -> multiplier for that account's quantity (default 1).
+        """
+        scale = scale or {}
+        futures = {
+            name: self._pool.submit(self._run, name, method,
+                                    (symbol, side, quantity * scale.get(name, 1.0)) + args, kwargs)
+            for name in self.bots
+            if scale.get(name, 1.0) > 0
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+    def place_market_order(self, symbol, side, quantity, scale=None):
+        return self.fan_out("place_market_order", symbol, side, quantity, scale=scale)
+
+    def place_limit_order(self, symbol, side, quantity, price, scale=None):
+        return self.fan_out("place_limit_order", symbol, side, quantity, price, scale=scale)
+
+    def place_stop_order(self, symbol, side, quantity, stopPrice, price=None, stop_type="STOP_MARKET", scale=None):
+        return self.fan_out("place_stop_order", symbol, side, quantity, stopPrice,
+                            scale=scale, price=price, stop_type=stop_type)
+
+    def change_leverage(self, symbol, leverage):
+        futures = {name: self._pool.submit(self._run, name, "change_leverage", (symbol, leverage), {})
+                   for name in self.bots}
+        return {name: future.result() for name, future in futures.items()}
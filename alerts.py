@@ -0,0 +1,401 @@
+"""
+Alert bus: fans order results, fills, rejects, errors and latency SLO
+breaches out to pluggable sinks.
+
+publish() only appends to a bounded in-memory queue, so the order path never
+waits on delivery. A background thread runs an asyncio loop that drains the
+queue in batches of up to BATCH_SIZE events and hands each batch to every
+sink concurrently, each under its own timeout; events published while a
+batch is in flight go out together in the next one. When sinks fall behind
+and the queue is full, new events are dropped and counted, and the count is
+delivered as a "dropped" event once there is room again.
+
+Sinks are configured in .env (any combination):
+  ALERT_WEBHOOK_URL   POST {"events": [...]} as JSON
+  ALERT_FILE          append JSON lines to a file
+  ALERT_SOCKET        JSON lines over a local socket (host:port, or a Unix socket path)
+  ALERT_LATENCY_MS    order submission SLO; slower submissions raise a "latency" alert
+
+`python alerts.py receive` runs a local HTTP receiver that prints what the
+webhook sink posts (ALERT_WEBHOOK_URL=http://127.0.0.1:8765/), and
+`python alerts.py test` sends one event through the configured sinks.
+"""
+
+import argparse
+import asyncio
+import atexit
+import collections
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from latency import tracker
+
+logger = logging.getLogger(__name__)
+
+MAX_QUEUE = 10000
+BATCH_SIZE = 100
+IDLE_WAIT = 0.5
+SINK_TIMEOUT = 5.0
+SLO_ALERT_INTERVAL = 10.0
+RECEIVER_PORT = 8765
+REJECT_STATUSES = ('REJECTED', 'EXPIRED')
+
+
+def _dumps(event):
+    return json.dumps(event, separators=(",", ":"), default=str)
+
+
+def published(error):
+    """logging extra for a record reporting an order error the bus already published"""
+    return {'alerted': getattr(error, 'alerted', False)}
+
+
+class FileSink:
+    def __init__(self, path):
+        self.path = path
+
+    async def send(self, events):
+        await asyncio.get_running_loop().run_in_executor(None, self._write, events)
+
+    def _write(self, events):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(_dumps(event) + "\n" for event in events))
+
+    def __repr__(self):
+        return f"FileSink({self.path})"
+
+
+class WebhookSink:
+    def __init__(self, url, timeout=SINK_TIMEOUT, headers=None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = dict({"Content-Type": "application/json"}, **(headers or {}))
+
+    async def send(self, events):
+        await asyncio.get_running_loop().run_in_executor(None, self._post, events)
+
+    def _post(self, events):
+        body = _dumps({"events": events}).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers=self.headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def __repr__(self):
+        return f"WebhookSink({self.url})"
+
+
+class SocketSink:
+    """JSON lines over one persistent local connection, reopened after a failure"""
+
+    def __init__(self, address):
+        self.address = address
+        self._writer = None
+
+    async def _connect(self):
+        host, _, port = self.address.rpartition(":")
+        if host and port.isdigit():
+            return (await asyncio.open_connection(host, int(port)))[1]
+        return (await asyncio.open_unix_connection(self.address))[1]
+
+    async def send(self, events):
+        if self._writer is None:
+            self._writer = await self._connect()
+        try:
+            self._writer.write("".join(_dumps(event) + "\n" for event in events).encode("utf-8"))
+            await self._writer.drain()
+        except Exception:
+            self._writer.close()
+            self._writer = None
+            raise
+
+    def __repr__(self):
+        return f"SocketSink({self.address})"
+
+
+class AlertHandler(logging.Handler):
+    """Publishes log records (ERROR and above by default) as "error" events"""
+
+    def __init__(self, bus, level=logging.ERROR):
+        super().__init__(level)
+        self.bus = bus
+
+    def emit(self, record):
+        if record.name == __name__:
+            return  # the bus's own delivery warnings
+        if getattr(record, 'alerted', False):
+            return  # the bot logging an order error OrderSender already published
+        self.bus.publish("error", logger=record.name, level=record.levelname, message=record.getMessage())
+
+
+class AlertBus:
+    def __init__(self, sinks, source=None, slos=None, max_queue=MAX_QUEUE, batch_size=BATCH_SIZE,
+                 sink_timeout=SINK_TIMEOUT):
+        self.sinks = list(sinks)
+        self.source = source or socket.gethostname()
+        self.slos = dict(slos or {})    # latency name -> SLO in seconds
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.sink_timeout = sink_timeout
+        self.queue = collections.deque()
+        self.dropped = 0
+        self.delivered = 0
+        self.failures = {sink: 0 for sink in self.sinks}
+        self._breaches = {}             # latency name -> [last alert time, breaches since]
+        self._handlers = set()
+        self._lock = threading.Lock()
+        self._waiting = False
+        self._closing = False
+        self._loop = asyncio.new_event_loop()
+        self._wake = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="alerts", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        atexit.register(self.close)
+
+    def publish(self, kind, **fields):
+        """Queue an event for delivery without blocking; False if the queue was full and it was dropped"""
+        event = {"kind": kind, "time": time.time(), "source": self.source}
+        event.update(fields)
+        with self._lock:
+            if len(self.queue) >= self.max_queue:
+                self.dropped += 1
+                return False
+            self.queue.append(event)
+            wake, self._waiting = self._waiting, False
+        if wake:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        return True
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._wake = asyncio.Event()
+        self._ready.set()
+        try:
+            self._loop.run_until_complete(self._deliver_loop())
+        finally:
+            self._loop.close()
+
+    async def _deliver_loop(self):
+        while True:
+            batch = self._take()
+            if batch:
+                await self._deliver(batch)
+                continue
+            if self._closing:
+                return
+            try:
+                await asyncio.wait_for(self._wake.wait(), IDLE_WAIT)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def _take(self):
+        with self._lock:
+            batch = [self.queue.popleft() for _ in range(min(self.batch_size, len(self.queue)))]
+            if self.dropped and len(self.queue) < self.max_queue:
+                batch.append({"kind": "dropped", "time": time.time(), "source": self.source, "count": self.dropped})
+                self.dropped = 0
+            if not batch:
+                self._waiting = True
+        return batch
+
+    async def _deliver(self, batch):
+        results = await asyncio.gather(
+            *(asyncio.wait_for(sink.send(batch), self.sink_timeout) for sink in self.sinks),
+            return_exceptions=True,
+        )
+        for sink, result in zip(self.sinks, results):
+            if isinstance(result, BaseException):
+                self.failures[sink] += 1
+                logger.warning(f"Alert delivery to {sink} failed ({len(batch)} events): {result!r}")
+        self.delivered += len(batch)
+
+    def close(self, timeout=SINK_TIMEOUT):
+        """Deliver what is queued (waiting up to timeout) and stop"""
+        if self._closing:
+            return
+        self._closing = True
+        try:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            return  # loop already closed
+        self._thread.join(timeout)
+
+    # Event sources
+
+    def instrument(self, sender=None, log=None, hub=None, latency=tracker):
+        """Publish a bot's order results and rejects, its error logs, stream fills and SLO breaches"""
+        if sender is not None:
+            sender.alerts = self
+        if log is not None and log.name not in self._handlers:
+            self._handlers.add(log.name)
+            log.addHandler(AlertHandler(self))
+        if hub is not None:
+            hub.on('ORDER_TRADE_UPDATE', self.on_order_update)
+        if latency is not None and self.slos:
+            latency.watch(self.slos, self.on_latency)
+
+    def order_sent(self, params, response):
+        self.publish("order", symbol=params.get("symbol"), side=params.get("side"), type=params.get("type"),
+                     quantity=params.get("quantity"), price=params.get("price"),
+                     clientOrderId=response.get("clientOrderId"), orderId=response.get("orderId"),
+                     status=response.get("status"), filled=response.get("executedQty"),
+                     avgPrice=response.get("avgPrice"))
+
+    def _note_error(self, error):
+        try:
+            error.alerted = True    # the bot's log record of this exception is tagged with published()
+        except AttributeError:
+            pass
+
+    def order_unknown(self, params, error, attempts):
+        self._note_error(error)
+        self.publish("error", message=f"Order {params.get('newClientOrderId')} state unknown after {attempts} attempts",
+                     symbol=params.get("symbol"), clientOrderId=params.get("newClientOrderId"), error=str(error))
+
+    def order_rejected(self, params, error):
+        self._note_error(error)
+        self.publish("reject", symbol=params.get("symbol"), side=params.get("side"), type=params.get("type"),
+                     quantity=params.get("quantity"), price=params.get("price"),
+                     clientOrderId=params.get("newClientOrderId"), code=getattr(error, "code", None),
+                     error=str(error))
+
+    def on_order_update(self, event):
+        """ORDER_TRADE_UPDATE: fills and exchange-side rejects/expiries"""
+        o = event['o']
+        if o.get('x') == 'TRADE':
+            self.publish("fill", symbol=o['s'], side=o['S'], price=float(o['L']), quantity=float(o['l']),
+                         filled=float(o['z']), status=o['X'], orderId=o['i'], clientOrderId=o['c'],
+                         maker=o.get('m'), realizedPnl=float(o.get('rp') or 0))
+        elif o.get('X') in REJECT_STATUSES:
+            self.publish("reject", symbol=o['s'], side=o['S'], type=o.get('o'), quantity=float(o['q']),
+                         orderId=o['i'], clientOrderId=o['c'], status=o['X'])
+
+    def on_latency(self, name, seconds, limit):
+        """SLO breach from a LatencyTracker; at most one alert per call name every SLO_ALERT_INTERVAL"""
+        now = time.monotonic()
+        with self._lock:
+            state = self._breaches.setdefault(name, [0.0, 0])
+            state[1] += 1
+            if now - state[0] < SLO_ALERT_INTERVAL:
+                return
+            count, state[0], state[1] = state[1], now, 0
+        self.publish("latency", name=name, seconds=round(seconds, 6), limit=limit, breaches=count)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def from_env():
+    """The process-wide AlertBus for the sinks configured in the environment, or None if there are none"""
+    global _shared
+    with _shared_lock:
+        if _shared is not None:
+            return _shared
+        sinks = []
+        if os.getenv("ALERT_WEBHOOK_URL"):
+            sinks.append(WebhookSink(os.getenv("ALERT_WEBHOOK_URL")))
+        if os.getenv("ALERT_FILE"):
+            sinks.append(FileSink(os.getenv("ALERT_FILE")))
+        if os.getenv("ALERT_SOCKET"):
+            sinks.append(SocketSink(os.getenv("ALERT_SOCKET")))
+        if not sinks:
+            return None
+        slos = {}
+        if os.getenv("ALERT_LATENCY_MS"):
+            slos["futures_create_order"] = float(os.getenv("ALERT_LATENCY_MS")) / 1000.0
+        _shared = AlertBus(sinks, source=os.getenv("ALERT_SOURCE"), slos=slos)
+        return _shared
+
+
+class _ReceiverHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            events = json.loads(self.rfile.read(length)).get("events", [])
+        except (ValueError, AttributeError):
+            self.send_response(400)
+            self.end_headers()
+            return
+        self.server.receiver.received(events)
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class AlertReceiver:
+    """Local HTTP endpoint for the webhook sink: keeps (and optionally prints) every event posted to it"""
+
+    def __init__(self, host="127.0.0.1", port=RECEIVER_PORT, echo=False):
+        self.events = []
+        self.echo = echo
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _ReceiverHandler)
+        self.server.receiver = self
+        self.url = f"http://{host}:{self.server.server_address[1]}/"
+        self._thread = None
+
+    def received(self, events):
+        with self._lock:
+            self.events.extend(events)
+        if self.echo:
+            for event in events:
+                fields = {k: v for k, v in event.items() if k not in ("kind", "time", "source")}
+                stamp = time.strftime('%H:%M:%S', time.localtime(event.get("time", 0)))
+                print(f"🔔 {stamp} [{event.get('source')}] {event.get('kind', '?'):<8} {_dumps(fields)}")
+
+    def start(self):
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="alert-receiver", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alert sinks: local webhook receiver and test event")
+    commands = parser.add_subparsers(dest="command", required=True)
+    receive = commands.add_parser("receive", help="Print the events the webhook sink posts")
+    receive.add_argument("--host", default="127.0.0.1")
+    receive.add_argument("--port", type=int, default=RECEIVER_PORT)
+    commands.add_parser("test", help="Send one test event through the sinks configured in .env")
+    args = parser.parse_args()
+
+    if args.command == "receive":
+        receiver = AlertReceiver(args.host, args.port, echo=True)
+        print(f"📡 Receiving alerts on {receiver.url} (set ALERT_WEBHOOK_URL={receiver.url})")
+        try:
+            receiver.server.serve_forever()
+        except KeyboardInterrupt:
+            print(f"\n👋 {len(receiver.events)} events received")
+        return 0
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    bus = from_env()
+    if bus is None:
+        print("❌ No sinks configured (set ALERT_WEBHOOK_URL, ALERT_FILE or ALERT_SOCKET)")
+        return 1
+    bus.publish("test", message="Alert pipeline test")
+    bus.close()
+    for sink, failures in bus.failures.items():
+        print(f"{'❌' if failures else '✅'} {sink}")
+    return 1 if any(bus.failures.values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+"""
+Order amendment: move a resting limit order in one round trip.
+
+The futures order-modify endpoint (PUT /fapi/v1/order) changes a LIMIT
+order's price and quantity in place and keeps its order ID. Orders it cannot
+amend (stop orders, or a client without the endpoint) are replaced by a
+pipelined cancel+new instead: the cancel and the new order, which gets its
+own journaled client order ID, go out together rather than one after the
+other. If the cancel fails, e.g. because the old order filled first, the new
+order is cancelled again so the exposure is not doubled.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from alerts import published
+from journal import is_ambiguous
+from latency import tracker
+
+logger = logging.getLogger(__name__)
+
+AMENDABLE_TYPES = ("LIMIT",)
+NO_CHANGE = -5027           # amendment with the order's current price and quantity
+AMEND_WORKERS = 8
+
+
+class OrderAmender:
+    def __init__(self, sender, latency=tracker, max_workers=AMEND_WORKERS):
+        self.sender = sender
+        self.client = sender.client
+        self.risk = sender.risk
+        self.latency = latency
+        self.supported = True       # False once the client turns out not to have futures_modify_order
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="amend")
+
+    def modify(self, symbol, side, quantity, price, order_id=None, client_order_id=None, order_type="LIMIT", **extra):
+        """Move an order to a new quantity/price; returns the amended (or replacement) order"""
+        if order_id is None and client_order_id is None:
+            raise ValueError("order_id or client_order_id is required")
+        ref = {"orderId": order_id} if order_id is not None else {"origClientOrderId": client_order_id}
+        if self.supported and order_type in AMENDABLE_TYPES and not extra:
+            try:
+                return self._amend(symbol, side, quantity, price, ref, client_order_id)
+            except AttributeError:
+                logger.info("Order amendment not supported by the client, using cancel+new")
+                self.supported = False
+        params = dict(symbol=symbol, side=side, type=order_type, quantity=quantity, **extra)
+        if price is not None:
+            params.update(price=price, timeInForce="GTC")
+        return self._cancel_replace(symbol, ref, params)
+
+    def modify_many(self, amendments):
+        """Requote many orders concurrently; amendments are modify() kwargs, results are in order (None if failed)"""
+        futures = [self._pool.submit(self.modify, **amendment) for amendment in amendments]
+        results = []
+        for amendment, future in zip(amendments, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error(f"Amendment of {amendment.get('symbol')} order failed: {e}", extra=published(e))
+                results.append(None)
+        return results
+
+    def _amend(self, symbol, side, quantity, price, ref, cid):
+        modify = self.client.futures_modify_order
+        if cid is None and self.risk is not None and self.risk.enabled:
+            # Risk reservations are kept by client order ID; only orders it never saw need a lookup
+            cid = self.risk.client_order_id(ref["orderId"])
+            if cid is None:
+                cid = self.sender.hedged_call("futures_get_order", self.client.futures_get_order,
+                                              symbol=symbol, **ref)["clientOrderId"]
+        params = dict(symbol=symbol, side=side, quantity=quantity, price=price, **ref)
+        old = self.risk.replace(cid, params) if self.risk is not None and cid is not None else None
+        start = time.perf_counter()
+        try:
+            response = modify(**params)
+        except Exception as e:
+            self.latency.record("futures_modify_order", time.perf_counter() - start)
+            response = self._resolve(symbol, ref, quantity, price, e)
+            if response is None:
+                if self.risk is not None and cid is not None:
+                    self.risk.restore(cid, old)
+                raise
+        else:
+            self.latency.record("futures_modify_order", time.perf_counter() - start)
+        if self.risk is not None:
+            self.risk.on_response(response)
+        return response
+
+    def _resolve(self, symbol, ref, quantity, price, error):
+        """The order as it stands after a failed amendment, if it already has the requested quantity/price"""
+        if getattr(error, "code", None) != NO_CHANGE and not is_ambiguous(error):
+            return None
+        try:
+            order = self.sender.hedged_call("futures_get_order", self.client.futures_get_order, symbol=symbol, **ref)
+        except Exception as e:
+            logger.warning(f"Lookup after failed amendment failed: {e}")
+            return None
+        if float(order["origQty"]) == float(quantity) and float(order["price"]) == float(price):
+            return order
+        return None
+
+    def _cancel_replace(self, symbol, ref, params):
+        old_cid = ref.get("origClientOrderId")
+        if old_cid is None and self.risk is not None:
+            old_cid = self.risk.client_order_id(ref["orderId"])
+        cancel = self._pool.submit(self.client.futures_cancel_order, symbol=symbol, **ref)
+        # The replacement is checked as if the old order were already gone
+        placed = self._pool.submit(self.sender.submit, params, replaces=old_cid)
+        try:
+            cancelled = cancel.result()
+        except Exception as e:
+            logger.warning(f"Cancel of {symbol} {ref} failed, withdrawing its replacement: {e}")
+            try:
+                replacement = placed.result()
+            except Exception:
+                raise e
+            self._withdraw(symbol, replacement)
+            raise
+        if self.risk is not None:
+            self.risk.on_response(cancelled)
+        return placed.result()
+
+    def _withdraw(self, symbol, order):
+        try:
+            response = self.client.futures_cancel_order(symbol=symbol, origClientOrderId=order["clientOrderId"])
+        except Exception as e:
+            logger.error(f"Could not withdraw replacement order {order['clientOrderId']}: {e}")
+            return
+        if self.risk is not None:
+            self.risk.on_response(response)
@@ -0,0 +1,115 @@
+"""
+Scripted order-file mode: runs many trade.py commands through one bot.
+
+Each line is a normal trade command ("buy --symbol ETHUSDT --amount 0.01",
+"sell -p 3500", "close -s BTCUSDT"); blank lines and '#' comments are
+skipped. Commands are pipelined through a bounded worker pool: different
+symbols run concurrently, while commands for the same symbol keep their file
+order. Every command produces one JSON line with its outcome.
+"""
+
+import json
+import logging
+import shlex
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from models import Order, Position
+
+logger = logging.getLogger(__name__)
+
+BATCH_COMMANDS = ('buy', 'sell', 'close')
+DEFAULT_CONCURRENCY = 8
+
+
+class BatchRunner:
+    def __init__(self, bot, parser, out, concurrency=DEFAULT_CONCURRENCY):
+        self.bot = bot
+        self.parser = parser
+        self.out = out
+        self.concurrency = concurrency
+        self.counts = {'ok': 0, 'failed': 0}
+        self._out_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(concurrency * 2)
+        self._last = {}
+
+    def parse(self, line):
+        """Parse one command line with the trade.py parser"""
+        try:
+            args = self.parser.parse_args(shlex.split(line))
+        except SystemExit:
+            raise ValueError("invalid command")
+        if args.command not in BATCH_COMMANDS:
+            raise ValueError(f"'{args.command}' is not allowed in a command file (use {', '.join(BATCH_COMMANDS)})")
+        return args
+
+    def execute(self, args):
+        """Run one parsed command and return the fields of its result record"""
+        symbol = args.symbol.upper()
+        if args.command in ('buy', 'sell'):
+            params = {'symbol': symbol, 'side': args.command.upper(), 'quantity': args.amount}
+            if args.price:
+                params.update(type='LIMIT', price=args.price, timeInForce='GTC')
+            else:
+                params['type'] = 'MARKET'
+        else:
+            positions = self.bot.client.futures_position_information(symbol=symbol)
+            current_pos = Position.from_raw(positions[0]).amount
+            if current_pos == 0:
+                return {'skipped': f'no position for {symbol}'}
+            params = {'symbol': symbol, 'side': 'SELL' if current_pos > 0 else 'BUY',
+                      'type': 'MARKET', 'quantity': abs(current_pos), 'reduceOnly': True}
+        order = Order.from_raw(self.bot.sender.submit(params))
+        return {
+            'orderId': order.order_id,
+            'clientOrderId': order.client_order_id,
+            'status': order.status,
+            'executedQty': order.filled,
+            'avgPrice': order.avg_price,
+        }
+
+    def _run(self, number, line, args, previous):
+        try:
+            if previous is not None:
+                # keep per-symbol file order
+                previous.exception()
+            start = time.perf_counter()
+            try:
+                record = {'line': number, 'command': line, 'ok': True}
+                record.update(self.execute(args))
+            except Exception as e:
+                record = {'line': number, 'command': line, 'ok': False, 'error': str(e)}
+            record['latency_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            self.emit(record)
+        finally:
+            self._slots.release()
+
+    def emit(self, record):
+        with self._out_lock:
+            self.counts['ok' if record['ok'] else 'failed'] += 1
+            self.out.write(json.dumps(record) + "\n")
+            self.out.flush()
+
+    def run(self, lines):
+        """Execute every command from an iterable of lines (a file or stdin)"""
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch") as pool:
+            for number, raw in enumerate(lines, 1):
+                line = raw.strip()
+                if not line or line.startswith('#'):
+                    continue
+                try:
+                    args = self.parse(line)
+                except ValueError as e:
+                    self.emit({'line': number, 'command': line, 'ok': False, 'error': str(e)})
+                    continue
+                self._slots.acquire()
+                symbol = args.symbol.upper()
+                future = pool.submit(self._run, number, line, args, self._last.get(symbol))
+                self._last[symbol] = future
+        elapsed = time.perf_counter() - start
+        total = self.counts['ok'] + self.counts['failed']
+        logger.info(f"Batch done: {self.counts['ok']} ok, {self.counts['failed']} failed in {elapsed:.2f}s"
+                    f" ({total / elapsed if elapsed else 0:.1f} commands/s)")
+        return self.counts
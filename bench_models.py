@@ -0,0 +1,110 @@
+"""
+Benchmark: raw response dicts vs the slotted models in models.py.
+
+Builds a large positionRisk list and an allOrders list shaped like the
+exchange's responses, then compares parse + read time and retained memory
+of json.loads dicts (fields re-parsed with float() on every read) against
+models.loads + Position/Order.from_raw (parsed once).
+Usage: python bench_models.py [orders]
+"""
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+from models import Order, Position, loads
+
+
+def position_payload(count):
+    return json.dumps([{
+        "symbol": f"SYM{i}USDT", "positionAmt": f"{(i % 7 - 3) * 0.125:.3f}", "entryPrice": f"{100 + i * 0.37:.2f}",
+        "breakEvenPrice": "0.0", "markPrice": f"{101 + i * 0.37:.8f}", "unRealizedProfit": "0.00000000",
+        "liquidationPrice": "0", "leverage": "20", "maxNotionalValue": "25000", "marginType": "cross",
+        "isolatedMargin": "0.00000000", "isAutoAddMargin": "false", "positionSide": "BOTH",
+        "notional": "0", "isolatedWallet": "0", "updateTime": 1700000000000 + i,
+    } for i in range(count)]).encode()
+
+
+def order_payload(count):
+    return json.dumps([{
+        "orderId": 4000000000 + i, "symbol": "BTCUSDT", "status": "FILLED" if i % 3 else "CANCELED",
+        "clientOrderId": f"bot18c2f3a-{i}", "price": "0", "avgPrice": f"{50000 + i % 1000 * 0.1:.5f}",
+        "origQty": "0.010", "executedQty": "0.010", "cumQuote": "500.00", "timeInForce": "GTC",
+        "type": "MARKET", "reduceOnly": False, "closePosition": False, "side": "BUY" if i % 2 else "SELL",
+        "positionSide": "BOTH", "stopPrice": "0", "workingType": "CONTRACT_PRICE", "priceProtect": False,
+        "origType": "MARKET", "priceMatch": "NONE", "selfTradePreventionMode": "NONE",
+        "goodTillDate": 0, "time": 1700000000000 + i, "updateTime": 1700000000000 + i,
+    } for i in range(count)]).encode()
+
+
+def raw_positions(data, reads=1):
+    positions = json.loads(data)
+    total = 0.0
+    for _ in range(reads):
+        for pos in positions:
+            if float(pos['positionAmt']) != 0:
+                total += float(pos['positionAmt']) * float(pos['entryPrice'])
+    return positions, total
+
+
+def model_positions(data, reads=1):
+    positions = [Position.from_raw(raw) for raw in loads(data)]
+    total = 0.0
+    for _ in range(reads):
+        for pos in positions:
+            if pos.amount != 0:
+                total += pos.amount * pos.entry_price
+    return positions, total
+
+
+def raw_orders(data):
+    orders = json.loads(data)
+    filled = sum(float(o['executedQty']) * float(o['avgPrice']) for o in orders if o['status'] == 'FILLED')
+    return orders, filled
+
+
+def model_orders(data):
+    orders = [Order.from_raw(raw) for raw in loads(data)]
+    filled = sum(o.filled * o.avg_price for o in orders if o.status == 'FILLED')
+    return orders, filled
+
+
+def measure(fn, data, repeat):
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    gc.collect()
+    tracemalloc.start()
+    kept = fn(data)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return best, retained
+
+
+def compare(name, raw_fn, model_fn, data, repeat):
+    raw_time, raw_mem = measure(raw_fn, data, repeat)
+    model_time, model_mem = measure(model_fn, data, repeat)
+    print(f"{name:<22} raw    {raw_time * 1000:9.2f} ms {raw_mem / 1e6:9.2f} MB")
+    print(f"{'':<22} model  {model_time * 1000:9.2f} ms {model_mem / 1e6:9.2f} MB"
+          f"   ({raw_time / model_time:.2f}x time, {raw_mem / model_mem:.2f}x memory)")
+
+
+def main():
+    orders = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"decoder: {loads.__module__ or 'json'}")
+    positions = position_payload(1000)
+    compare("positions (1 read)", raw_positions, model_positions, positions, 5)
+    compare("positions (20 reads)", partial(raw_positions, reads=20), partial(model_positions, reads=20), positions, 5)
+    compare(f"orders ({orders:,})", raw_orders, model_orders, order_payload(orders), 3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Microbenchmark: per-order CPU time of the pre-trade risk checks.
+
+Runs RiskEngine.check plus the response update for a stream of orders over
+a book of open positions, with every limit enabled. Budget: 50 µs/order.
+Usage: python bench_risk.py [iterations]
+"""
+
+import sys
+import time
+
+from risk import RiskEngine, RiskLimits
+
+BUDGET_US = 50.0
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT", "LINKUSDT", "ADAUSDT", "DOGEUSDT"]
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    engine = RiskEngine(RiskLimits(max_order_notional=1e9, max_position_notional=1e12, max_gross_notional=1e13,
+                                   max_open_orders=10 ** 9, max_daily_loss=1e9))
+    for i, symbol in enumerate(SYMBOLS):
+        engine.marks[symbol] = 100.0 * (i + 1)
+    orders = []
+    for i in range(iterations):
+        symbol = SYMBOLS[i % len(SYMBOLS)]
+        side = "BUY" if i % 3 else "SELL"
+        if i % 2:
+            params = {"symbol": symbol, "side": side, "type": "MARKET", "quantity": 0.01, "newClientOrderId": f"bot-{i}"}
+            response = {"clientOrderId": f"bot-{i}", "status": "FILLED", "executedQty": "0.01", "avgPrice": "100.5"}
+        else:
+            params = {"symbol": symbol, "side": side, "type": "LIMIT", "quantity": 0.01, "price": 99.5,
+                      "timeInForce": "GTC", "newClientOrderId": f"bot-{i}"}
+            response = {"clientOrderId": f"bot-{i}", "status": "NEW", "executedQty": "0", "avgPrice": "0"}
+        orders.append((params, response))
+
+    start = time.process_time()
+    for params, response in orders:
+        engine.check(params)
+        engine.on_response(response)
+    elapsed = time.process_time() - start
+    per_order = elapsed / iterations * 1e6
+    print(f"risk check   {per_order:8.2f} µs/order ({len(engine.orders)} resting, gross {engine.gross_notional:,.0f} USDT)")
+    print(f"budget       {BUDGET_US:8.2f} µs/order {'✅' if per_order < BUDGET_US else '❌'}")
+    return 0 if per_order < BUDGET_US else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
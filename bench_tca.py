@@ -0,0 +1,76 @@
+"""
+Benchmark: TCA metrics over a large synthetic fill set.
+
+Builds array columns shaped like history.fill_columns for one symbol plus
+1m klines covering them, and times tca.accumulate (per-fill totals, order
+slippage, markouts at every horizon).
+Usage: python bench_tca.py [fills]
+"""
+
+import random
+import sys
+import time
+from array import array
+
+from history import KLINE_MS
+from models import Order
+from tca import PriceSeries, accumulate, metrics
+
+
+def build(count, seed=7):
+    rng = random.Random(seed)
+    start = 1700000000000
+    minutes = count // 20 + 60
+    times, opens, closes = array('q'), array('d'), array('d')
+    price = 50000.0
+    for m in range(minutes):
+        times.append(start + m * KLINE_MS)
+        opens.append(price)
+        price *= 1 + rng.gauss(0, 0.0005)
+        closes.append(price)
+
+    fills = {"order_id": array('q'), "sign": array('b'), "price": array('d'), "quantity": array('d'),
+             "commission": array('d'), "commission_asset": [], "realized_pnl": array('d'),
+             "time": array('q'), "maker": array('b')}
+    orders = []
+    t = start
+    for i in range(count):
+        t += rng.randint(100, 5000)
+        order_id = 1000000 + i // 3
+        m = min((t - start) // KLINE_MS, minutes - 1)
+        fill_price = opens[m] * (1 + rng.gauss(0, 0.0002))
+        quantity = 0.001 * rng.randint(1, 50)
+        maker = rng.random() < 0.4
+        fills["order_id"].append(order_id)
+        fills["sign"].append(1 if order_id % 2 else -1)
+        fills["price"].append(fill_price)
+        fills["quantity"].append(quantity)
+        fills["commission"].append(fill_price * quantity * (0.0002 if maker else 0.0005))
+        fills["commission_asset"].append("USDT")
+        fills["realized_pnl"].append(rng.gauss(0, 1))
+        fills["time"].append(t)
+        fills["maker"].append(maker)
+        if i % 3 == 0:
+            orders.append(Order(order_id, f"bot-{order_id}", "BTCUSDT", "BUY" if order_id % 2 else "SELL",
+                                "LIMIT" if maker else "MARKET", "FILLED", fill_price, fill_price, 0.0,
+                                quantity * 3, quantity * 3, False, t, t - 500))
+    return fills, orders, PriceSeries(times, opens, closes)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    started = time.perf_counter()
+    fills, orders, prices = build(count)
+    print(f"built        {count:,} fills, {len(orders):,} orders, {len(prices.times):,} klines "
+          f"in {time.perf_counter() - started:.2f}s")
+    started = time.perf_counter()
+    row = metrics("BTCUSDT", accumulate(fills, orders, prices, fills["time"][-1] + 3600 * 1000))
+    elapsed = time.perf_counter() - started
+    print(f"accumulate   {elapsed:8.2f} s ({count / elapsed:,.0f} fills/s)")
+    print(f"             fee {row['fee_bps']} bps, maker {row['maker_pct']}%, slippage {row['slippage_bps']} bps, "
+          f"markout 60s {row['markout_60s_bps']} bps")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,19 @@ from binance.exceptions import BinanceAPIException
 import os
 import time
 from dotenv import load_dotenv
+from clock import ClockSync
+import alerts
+from account_config import AccountConfigCache
+from amend import OrderAmender
+from guard import CircuitOpen, ExchangeGuard
+from journal import OrderJournal
+from retry import OrderSender
+from signing import FastOrderClient
+from models import SymbolSpec
+from precision import floor_step
+import profiler
+from profiles import ProfileError, resolve_profile
+from risk import RiskEngine, RiskLimitExceeded
 
 
 BINANCE_TESTNET_URL = "https://testnet.binancefuture.com"
@@ -26,57 +39,77 @@ file_handler.setFormatter(formatter)
 logger.addHandler(file_handler)
 
 class BasicBot:
-    def __init__(self, api_key, api_secret, testnet=True):
+    def __init__(self, api_key, api_secret, testnet=True, journal_path=None, exchange_info=None,
+                 profile=None, account="main"):
         self.api_key = api_key
         self.api_secret = api_secret
-        self.testnet = testnet
-        self.client = Client(api_key, api_secret, testnet=testnet)
-        self.exchange_info = self.client.futures_exchange_info()
-        logger.info(f"Connected to Binance Futures {'Testnet' if testnet else 'Mainnet'}.")
+        self.profile = profile or resolve_profile(testnet=testnet)
+        self.account = account
+        self.testnet = testnet = self.profile.testnet
+        self.guard = ExchangeGuard(store=self.profile.cache)
+        self.client = self.guard.wrap(Client(api_key, api_secret, testnet=testnet))
+        self.clock = ClockSync(self.client).start()
+        self.exchange_info = exchange_info or self.profile.cache.exchange_info(self.client)
+        self.specs = SymbolSpec.index(self.exchange_info)
+        logger.info(f"Connected to Binance Futures {'Testnet' if testnet else 'Mainnet'} ({self.profile.name}).")
+        journal_name = "orders.journal" if account == "main" else f"orders-{account}.journal"
+        self.journal = OrderJournal(journal_path or self.profile.path(journal_name))
+        self.journal.recover(self.client)
+        self.risk = RiskEngine(self.profile.risk_limits())
+        if self.risk.enabled:
+            self.risk.load(self.client)
+        self.sender = OrderSender(FastOrderClient(self.client, clock=self.clock, guard=self.guard), self.journal, risk=self.risk)
+        self.alerts = alerts.from_env()
+        if self.alerts is not None:
+            self.alerts.instrument(sender=self.sender, log=logger)
+        self.amender = OrderAmender(self.sender)
+        self.account_config = AccountConfigCache()
 
-    def _get_symbol_filters(self, symbol):
-        for s in self.exchange_info['symbols']:
-            if s['symbol'] == symbol:
-                return {f['filterType']: f for f in s['filters']}
-        raise ValueError(f"Symbol {symbol} not found in exchange info.")
+    def load_account_config(self, hub=None):
+        """Load leverage/margin state so redundant change calls are skipped; warm from the profile cache with a hub"""
+        if hub is not None:
+            self.account_config.attach(hub)
+        self.profile.cache.account_config(self.account_config, self.client, self.account)
+
+    def _get_symbol_spec(self, symbol):
+        spec = self.specs.get(symbol)
+        if spec is None:
+            raise ValueError(f"Symbol {symbol} not found in exchange info.")
+        return spec
 
     def _round_quantity(self, symbol, quantity):
-        filters = self._get_symbol_filters(symbol)
-        lot_size = filters['LOT_SIZE']
-        step_size = float(lot_size['stepSize'])
-        min_qty = float(lot_size['minQty'])
-        max_qty = float(lot_size['maxQty'])
-        quantity = max(min_qty, min(quantity, max_qty))
-        rounded = round((quantity // step_size) * step_size, 8)
-        return rounded
+        spec = self._get_symbol_spec(symbol)
+        quantity = max(spec.min_qty, min(quantity, spec.max_qty))
+        return floor_step(quantity, spec.step_size)
 
     def _round_price(self, symbol, price):
-        filters = self._get_symbol_filters(symbol)
-        price_filter = filters['PRICE_FILTER']
-        tick_size = float(price_filter['tickSize'])
-        min_price = float(price_filter['minPrice'])
-        max_price = float(price_filter['maxPrice'])
-        price = max(min_price, min(price, max_price))
-        rounded = round((price // tick_size) * tick_size, 2)
-        return rounded
+        spec = self._get_symbol_spec(symbol)
+        price = max(spec.min_price, min(price, spec.max_price))
+        return floor_step(price, spec.tick_size)
 
     def place_market_order(self, symbol, side, quantity):
         try:
             quantity = self._round_quantity(symbol, quantity)
             logger.info(f"Placing MARKET order: {side} {quantity} {symbol}")
-            response = self.client.futures_create_order(
+            response = self.sender.submit(dict(
                 symbol=symbol,
                 side="BUY" if side.upper() == "BUY" else "SELL",
                 type="MARKET",
                 quantity=quantity
-            )
+            ))
             logger.info(f"Order response: {response}")
             return response
         except BinanceAPIException as e:
-            logger.error(f"API Error: {e}")
+            logger.error(f"API Error: {e}", extra=alerts.published(e))
+            return None
+        except RiskLimitExceeded as e:
+            logger.warning(f"Order blocked by risk limits: {e}")
+            return None
+        except CircuitOpen as e:
+            logger.warning(f"Order not sent: {e}")
             return None
         except Exception as e:
-            logger.error(f"Error: {e}")
+            logger.error(f"Error: {e}", extra=alerts.published(e))
             return None
 
     def place_limit_order(self, symbol, side, quantity, price):
@@ -84,21 +117,27 @@ class BasicBot:
             quantity = self._round_quantity(symbol, quantity)
             price = self._round_price(symbol, price)
             logger.info(f"Placing LIMIT order: {side} {quantity} {symbol} @ {price}")
-            response = self.client.futures_create_order(
+            response = self.sender.submit(dict(
                 symbol=symbol,
                 side="BUY" if side.upper() == "BUY" else "SELL",
                 type="LIMIT",
                 quantity=quantity,
                 price=price,
                 timeInForce="GTC"
-            )
+            ))
             logger.info(f"Order response: {response}")
             return response
         except BinanceAPIException as e:
-            logger.error(f"API Error: {e}")
+            logger.error(f"API Error: {e}", extra=alerts.published(e))
+            return None
+        except RiskLimitExceeded as e:
+            logger.warning(f"Order blocked by risk limits: {e}")
+            return None
+        except CircuitOpen as e:
+            logger.warning(f"Order not sent: {e}")
             return None
         except Exception as e:
-            logger.error(f"Error: {e}")
+            logger.error(f"Error: {e}", extra=alerts.published(e))
             return None
 
     def place_stop_order(self, symbol, side, quantity, stopPrice, price=None, stop_type="STOP_MARKET"):
@@ -116,20 +155,71 @@ class BasicBot:
                 params["price"] = self._round_price(symbol, price)
                 params["timeInForce"] = "GTC"
             logger.info(f"Placing {stop_type} order: {side} {quantity} {symbol} stop @ {stopPrice} price @ {params.get('price')}")
-            response = self.client.futures_create_order(**params)
+            response = self.sender.submit(params)
             logger.info(f"Order response: {response}")
             return response
         except BinanceAPIException as e:
-            logger.error(f"API Error: {e}")
+            logger.error(f"API Error: {e}", extra=alerts.published(e))
+            return None
+        except RiskLimitExceeded as e:
+            logger.warning(f"Order blocked by risk limits: {e}")
+            return None
+        except CircuitOpen as e:
+            logger.warning(f"Order not sent: {e}")
             return None
         except Exception as e:
-            logger.error(f"Error: {e}")
+            logger.error(f"Error: {e}", extra=alerts.published(e))
+            return None
+
+    def modify_order(self, symbol, side, quantity, price, order_id=None, client_order_id=None):
+        """Move a resting LIMIT order to a new quantity/price (amended in place, else cancel+new)"""
+        try:
+            quantity = self._round_quantity(symbol, quantity)
+            price = self._round_price(symbol, price)
+            logger.info(f"Modifying order {order_id or client_order_id}: {side} {quantity} {symbol} @ {price}")
+            response = self.amender.modify(symbol, "BUY" if side.upper() == "BUY" else "SELL", quantity, price,
+                                           order_id=order_id, client_order_id=client_order_id)
+            logger.info(f"Modify response: {response}")
+            return response
+        except BinanceAPIException as e:
+            logger.error(f"API Error: {e}", extra=alerts.published(e))
+            return None
+        except RiskLimitExceeded as e:
+            logger.warning(f"Modification blocked by risk limits: {e}")
             return None
+        except CircuitOpen as e:
+            logger.warning(f"Modification not sent: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error: {e}", extra=alerts.published(e))
+            return None
+
+    def modify_orders(self, amendments):
+        """Requote many orders concurrently; amendments are modify_order kwargs, results are in order (None if failed)"""
+        results = [None] * len(amendments)
+        prepared, slots = [], []
+        for i, amendment in enumerate(amendments):
+            symbol = amendment.get("symbol")
+            try:
+                prepared.append(dict(
+                    amendment,
+                    side="BUY" if amendment["side"].upper() == "BUY" else "SELL",
+                    quantity=self._round_quantity(symbol, amendment["quantity"]),
+                    price=self._round_price(symbol, amendment["price"]),
+                ))
+            except Exception as e:
+                logger.error(f"Amendment of {symbol} order skipped: {e}")
+                continue
+            slots.append(i)
+        logger.info(f"Modifying {len(prepared)} orders")
+        for i, result in zip(slots, self.amender.modify_many(prepared)):
+            results[i] = result
+        return results
 
     def change_leverage(self, symbol, leverage):
         try:
             logger.info(f"Changing leverage for {symbol} to {leverage}")
-            response = self.client.futures_change_leverage(symbol=symbol, leverage=leverage)
+            response = self.account_config.ensure_leverage(self.client, symbol, leverage)
             logger.info(f"Leverage response: {response}")
             return response
         except BinanceAPIException as e:
@@ -139,15 +229,35 @@ class BasicBot:
             logger.error(f"Error: {e}")
             return None
 
+    def change_leverage_bulk(self, leverages):
+        """Set leverage for many symbols concurrently ({symbol: leverage})"""
+        logger.info(f"Changing leverage for {len(leverages)} symbols")
+        return self.account_config.ensure_leverage_bulk(self.client, leverages)
+
+    def change_margin_type(self, symbol, margin_type):
+        try:
+            logger.info(f"Changing margin type for {symbol} to {margin_type}")
+            response = self.account_config.ensure_margin_type(self.client, symbol, margin_type)
+            logger.info(f"Margin type response: {response}")
+            return response
+        except BinanceAPIException as e:
+            logger.error(f"API Error: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error: {e}")
+            return None
+
 def main():
     load_dotenv()
     parser = argparse.ArgumentParser(
         description="Binance USDT-M Futures Trading Bot",
         epilog=(
             "Example usage:\n"
-            "  python bot.py order --symbol BTCUSDT --side BUY --type MARKET --quantity 0.001 --testnet\n"
-            "  python bot.py order --symbol ETHUSDT --side SELL --type LIMIT --quantity 0.01 --price 3500 --testnet\n"
-            "  python bot.py order --symbol BTCUSDT --side BUY --type STOP_MARKET --quantity 0.001 --stopPrice 25000 --testnet\n"
+            "  python bot.py order --symbol BTCUSDT --side BUY --type MARKET --quantity 0.001\n"
+            "  python bot.py order --symbol ETHUSDT --side SELL --type LIMIT --quantity 0.01 --price 3500\n"
+            "  python bot.py order --symbol BTCUSDT --side BUY --type STOP_MARKET --quantity 0.001 --stopPrice 25000\n"
+            "  python bot.py order --symbol BTCUSDT --side BUY --quantity 0.001 --mainnet\n"
+            "  python bot.py order --symbol BTCUSDT --side BUY --quantity 0.001 --profile live\n"
         )
     )
     parser.add_argument("order", nargs="?", help="Order command")
@@ -160,8 +270,27 @@ def main():
     parser.add_argument("--leverage", type=int, help="Change leverage before order")
     parser.add_argument("--apiKey", help="Binance API Key")
     parser.add_argument("--apiSecret", help="Binance API Secret")
-    parser.add_argument("--testnet", action="store_true", help="Use Binance Futures Testnet")
+    environment = parser.add_mutually_exclusive_group()
+    environment.add_argument("--testnet", action="store_true", help="Use a testnet profile even if the default profile is mainnet")
+    environment.add_argument("--mainnet", action="store_true", help="Use a mainnet profile (default: the default profile, testnet without profiles.json)")
+    parser.add_argument("--profile", help="Profile from profiles.json (default: the file's default profile)")
+    parser.add_argument("--accounts", help="Comma-separated accounts from .env to send the order to concurrently, or 'all'")
+    parser.add_argument("--scale", help="Per-account quantity multipliers, e.g. main=1,sub1=0.5")
+    parser.add_argument("--profiler", nargs="?", const=profiler.PROFILE_FILE, metavar="FILE",
+                        help=f"Sample the process and time order stages, writing a speedscope file on exit (default: {profiler.PROFILE_FILE})")
     args = parser.parse_args()
+    if args.profiler:
+        profiler.start(args.profiler, bot_class=BasicBot)
+
+    try:
+        profile = resolve_profile(args.profile, testnet=False if args.mainnet else True if args.testnet else None)
+    except ProfileError as e:
+        print(f"Error: {e}")
+        return
+
+    if args.accounts:
+        run_multi_account(args, profile)
+        return
 
     api_key = args.apiKey or os.getenv("API_KEY")
     api_secret = args.apiSecret or os.getenv("API_SECRET")
@@ -169,7 +298,7 @@ def main():
         print("Error: API Key and Secret must be provided via CLI or .env file.")
         return
 
-    bot = BasicBot(api_key, api_secret, testnet=args.testnet)
+    bot = BasicBot(api_key, api_secret, profile=profile)
 
     if args.leverage:
         result = bot.change_leverage(args.symbol, args.leverage)
@@ -194,5 +323,52 @@ def main():
     print("Order result:")
     print(result)
 
+def run_multi_account(args, profile):
+    from accounts import MultiAccountExecutor
+
+    try:
+        accounts = profile.credentials()
+        if args.accounts != "all":
+            accounts = {name: accounts[name] for name in args.accounts.split(",")}
+    except (KeyError, ValueError) as e:
+        print(f"Error: unknown or incomplete account {e}")
+        return
+    scale = {}
+    if args.scale:
+        for item in args.scale.split(","):
+            name, _, factor = item.partition("=")
+            name = name.strip()
+            try:
+                scale[name] = float(factor)
+            except ValueError:
+                scale[name] = -1.0
+            if scale[name] < 0 or name not in accounts:
+                print(f"Error: invalid --scale entry '{item}'; expected ACCOUNT=FACTOR for the chosen accounts,"
+                      f" e.g. main=1,sub1=0.5")
+                return
+
+    executor = MultiAccountExecutor(accounts, profile=profile)
+
+    if args.leverage:
+        print("Leverage change result:", executor.change_leverage(args.symbol, args.leverage))
+
+    if args.type == "MARKET":
+        results = executor.place_market_order(args.symbol, args.side, args.quantity, scale=scale)
+    elif args.type == "LIMIT":
+        if not args.price:
+            print("Error: --price required for LIMIT order.")
+            return
+        results = executor.place_limit_order(args.symbol, args.side, args.quantity, args.price, scale=scale)
+    else:
+        if not args.stopPrice:
+            print("Error: --stopPrice required for STOP/STOP_MARKET order.")
+            return
+        results = executor.place_stop_order(args.symbol, args.side, args.quantity, args.stopPrice,
+                                            price=args.price, stop_type=args.type, scale=scale)
+
+    for name, result in results.items():
+        print(f"[{name}] Order result:")
+        print(result)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,103 @@
+"""
+Local market and order caches kept current from the websocket streams.
+
+Each cache carries a `version` counter that is bumped on every change so
+consumers (e.g. the dashboard) can cheaply tell whether anything moved.
+"""
+
+import threading
+import time
+
+from guard import require_fresh, stale_age
+from models import Order
+
+TICKER_STREAM = "!miniTicker@arr"
+
+OPEN_STATUSES = ('NEW', 'PARTIALLY_FILLED')
+
+
+class PriceCache:
+    def __init__(self):
+        self.prices = {}
+        self.open_prices = {}
+        self.updated = {}
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def attach(self, hub):
+        """Keep prices current from the all-market mini ticker stream"""
+        hub.on('24hrMiniTicker', self.on_ticker)
+        hub.add_streams([TICKER_STREAM])
+
+    def load(self, client):
+        """Seed every symbol's price from one bulk ticker call"""
+        tickers = client.futures_symbol_ticker()
+        now = time.time() - (stale_age(tickers) or 0)  # prices served from cache keep their real age
+        with self._lock:
+            for ticker in tickers:
+                self.prices[ticker['symbol']] = float(ticker['price'])
+                self.updated[ticker['symbol']] = now
+            self.version += 1
+
+    def on_ticker(self, event):
+        with self._lock:
+            self.prices[event['s']] = float(event['c'])
+            self.open_prices[event['s']] = float(event['o'])
+            self.updated[event['s']] = event.get('E', time.time() * 1000) / 1000.0
+            self.version += 1
+
+    def get(self, symbol, max_age=None):
+        """Return the cached price for symbol, or None if missing or older than max_age seconds"""
+        if max_age is not None and time.time() - self.updated.get(symbol, 0) > max_age:
+            return None
+        return self.prices.get(symbol)
+
+    def set(self, symbol, price):
+        """Store a price fetched outside the stream (e.g. a REST ticker)"""
+        with self._lock:
+            self.prices[symbol] = price
+            self.updated[symbol] = time.time()
+            self.version += 1
+
+    def change_pct(self, symbol):
+        """Return the 24h change in percent, or None"""
+        price, open_price = self.prices.get(symbol), self.open_prices.get(symbol)
+        if not price or not open_price:
+            return None
+        return (price - open_price) / open_price * 100
+
+
+class OrderCache:
+    def __init__(self):
+        self.orders = {}
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def attach(self, hub):
+        """Keep open orders current from the user data stream"""
+        hub.on('ORDER_TRADE_UPDATE', self.on_order_update)
+
+    def load(self, client):
+        """Seed open orders from one REST call"""
+        # Stream events only update what is seeded, so a cached list would never lose closed orders
+        orders = require_fresh(client.futures_get_open_orders(), "Open orders")
+        with self._lock:
+            self.orders = {order.order_id: order for order in map(Order.from_raw, orders)}
+            self.version += 1
+
+    def on_order_update(self, event):
+        order = Order.from_event(event['o'])
+        with self._lock:
+            if order.status in OPEN_STATUSES:
+                self.orders[order.order_id] = order
+            else:
+                self.orders.pop(order.order_id, None)
+            self.version += 1
+
+    def open_orders(self, symbol=None):
+        """Return cached open orders, optionally for one symbol"""
+        with self._lock:
+            orders = list(self.orders.values())
+        if symbol:
+            orders = [order for order in orders if order.symbol == symbol]
+        return orders
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Record the raw websocket streams the bots consume, for replay.py.
+
+A capture is a directory of segment files. Each segment is a sequence of
+zlib-compressed blocks of JSON lines [receive_time, kind, payload], where
+kind is 'ws' for a raw StreamHub message or 'rest' for a REST snapshot the
+replay's mock exchange serves (order books, account, positions). Every
+segment has an .idx file with one fixed-size entry per block (first/last
+time, offset, record count), so a reader can seek to a time range without
+decompressing the segments in front of it.
+
+Usage: python capture.py record captures/btc --symbols BTCUSDT,ETHUSDT --duration 600 [--mainnet]
+       python capture.py info captures/btc
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+
+from models import loads
+
+logger = logging.getLogger(__name__)
+
+BLOCK_HEADER = struct.Struct("<II")       # compressed length, record count
+INDEX_ENTRY = struct.Struct("<ddQI")      # first time, last time, offset, record count
+BLOCK_RECORDS = 2000
+FLUSH_INTERVAL = 1.0
+SEGMENT_BYTES = 32 * 1024 * 1024
+META_FILE = "meta.json"
+
+
+class SegmentWriter:
+    """Appends records to compressed, indexed segment files in a directory"""
+
+    def __init__(self, directory, segment_bytes=SEGMENT_BYTES, block_records=BLOCK_RECORDS):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.block_records = block_records
+        self.records = 0
+        self.bytes_raw = 0
+        self.bytes_written = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._data = None
+        self._index = None
+        os.makedirs(directory, exist_ok=True)
+        self._segment = len(glob.glob(os.path.join(directory, "segment-*.dat")))
+
+    def _open_segment(self):
+        self._segment += 1
+        base = os.path.join(self.directory, f"segment-{self._segment:06d}")
+        self._data = open(base + ".dat", "ab")
+        self._index = open(base + ".idx", "ab")
+
+    def append(self, kind, payload, t=None):
+        """Queue one record; blocks are compressed and written by flush()"""
+        with self._lock:
+            self._pending.append((time.time() if t is None else t, kind, payload))
+            full = len(self._pending) >= self.block_records
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return
+            raw = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in pending).encode("utf-8")
+            block = zlib.compress(raw, 6)
+            if self._data is None or self._data.tell() >= self.segment_bytes:
+                self.close_segment()
+                self._open_segment()
+            offset = self._data.tell()
+            self._data.write(BLOCK_HEADER.pack(len(block), len(pending)) + block)
+            self._data.flush()
+            self._index.write(INDEX_ENTRY.pack(pending[0][0], pending[-1][0], offset, len(pending)))
+            self._index.flush()
+            self.records += len(pending)
+            self.bytes_raw += len(raw)
+            self.bytes_written += BLOCK_HEADER.size + len(block)
+
+    def close_segment(self):
+        if self._data is not None:
+            self._data.close()
+            self._index.close()
+            self._data = self._index = None
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self.close_segment()
+
+
+class SegmentReader:
+    """Reads a capture directory back in time order"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.segments = sorted(glob.glob(os.path.join(directory, "segment-*.dat")))
+        meta_path = os.path.join(directory, META_FILE)
+        self.meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+
+    def index(self, segment):
+        """Block index entries (first, last, offset, count) of a segment"""
+        with open(segment[:-4] + ".idx", "rb") as f:
+            data = f.read()
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        return [INDEX_ENTRY.unpack_from(data, i) for i in range(0, usable, INDEX_ENTRY.size)]
+
+    def records(self, start=None, end=None, kinds=None):
+        """Yield (time, kind, payload) records, skipping blocks outside [start, end]"""
+        for segment in self.segments:
+            with open(segment, "rb") as f:
+                for first, last, offset, _ in self.index(segment):
+                    if (start is not None and last < start) or (end is not None and first > end):
+                        continue
+                    f.seek(offset)
+                    length, _ = BLOCK_HEADER.unpack(f.read(BLOCK_HEADER.size))
+                    for line in zlib.decompress(f.read(length)).splitlines():
+                        t, kind, payload = loads(line)
+                        if (start is not None and t < start) or (end is not None and t > end):
+                            continue
+                        if kinds is None or kind in kinds:
+                            yield t, kind, payload
+
+    def rest_snapshots(self):
+        """{method: {key: result}} of the REST snapshots in the capture"""
+        snapshots = {}
+        for _, _, payload in self.records(kinds=("rest",)):
+            snapshots.setdefault(payload["method"], {})[payload.get("key")] = payload["result"]
+        return snapshots
+
+    def summary(self):
+        blocks = records = 0
+        first = last = None
+        for segment in self.segments:
+            for block_first, block_last, _, count in self.index(segment):
+                blocks += 1
+                records += count
+                first = block_first if first is None else min(first, block_first)
+                last = block_last if last is None else max(last, block_last)
+        size = sum(os.path.getsize(s) for s in self.segments)
+        return {"segments": len(self.segments), "blocks": blocks, "records": records,
+                "bytes": size, "start": first, "end": last}
+
+
+def market_streams(symbols):
+    """The market streams the bots subscribe to, for the given depth symbols"""
+    from caches import TICKER_STREAM
+    from orderbook import DEPTH_STREAM
+    from portfolio import MARK_PRICE_STREAM
+    return [TICKER_STREAM, MARK_PRICE_STREAM] + [DEPTH_STREAM.format(s.lower()) for s in symbols]
+
+
+def record(args):
+    from binance.client import Client
+    from dotenv import load_dotenv
+    from streams import StreamHub
+
+    load_dotenv()
+    api_key, api_secret = os.getenv("API_KEY"), os.getenv("API_SECRET")
+    testnet = not args.mainnet
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    client = Client(api_key, api_secret, testnet=testnet)
+    writer = SegmentWriter(args.directory)
+    streams = market_streams(symbols)
+
+    hub = StreamHub(api_key, api_secret, testnet=testnet)
+    hub.tap(lambda msg: writer.append("ws", msg))
+    hub.start(streams=streams, user_data=not args.no_user_data)
+
+    # Snapshots the mock exchange serves during replay; depth snapshots are taken after
+    # subscribing so the recorded diffs line up with them
+    def snapshot(method, key=None, **kwargs):
+        writer.append("rest", {"method": method, "key": key, "result": getattr(client, method)(**kwargs)})
+
+    snapshot("futures_symbol_ticker")
+    snapshot("futures_mark_price")
+    if not args.no_user_data:
+        snapshot("futures_account")
+        snapshot("futures_position_information")
+        snapshot("futures_get_open_orders")
+    for symbol in symbols:
+        snapshot("futures_order_book", symbol, symbol=symbol, limit=1000)
+
+    with open(os.path.join(args.directory, META_FILE), "w") as f:
+        json.dump({"symbols": symbols, "streams": streams, "testnet": testnet,
+                   "user_data": not args.no_user_data, "started": time.time()}, f, indent=1)
+
+    print(f"🎙️  Recording {', '.join(streams)} to {args.directory} (Ctrl+C to stop)")
+    deadline = time.time() + args.duration if args.duration else None
+    try:
+        while deadline is None or time.time() < deadline:
+            time.sleep(FLUSH_INTERVAL)
+            writer.flush()
+            print(f"\r   {writer.records:,} records, {writer.bytes_written / 1e6:.1f} MB", end="", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        hub.stop()
+        writer.close()
+    ratio = writer.bytes_raw / writer.bytes_written if writer.bytes_written else 0
+    print(f"\n✅ {writer.records:,} records, {writer.bytes_written / 1e6:.1f} MB ({ratio:.1f}x compression)")
+    return 0
+
+
+def info(args):
+    reader = SegmentReader(args.directory)
+    summary = reader.summary()
+    if not summary["records"]:
+        print(f"❌ No capture in {args.directory}")
+        return 1
+    span = summary["end"] - summary["start"]
+    print(f"📼 {args.directory}: {summary['records']:,} records over {span:.1f}s in "
+          f"{summary['segments']} segments / {summary['blocks']} blocks, {summary['bytes'] / 1e6:.1f} MB")
+    if reader.meta:
+        print(f"   Symbols: {', '.join(reader.meta.get('symbols', []))}")
+        print(f"   Streams: {', '.join(reader.meta.get('streams', []))}")
+    return 0
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    parser = argparse.ArgumentParser(description="Record bot streams for replay")
+    sub = parser.add_subparsers(dest="action", required=True)
+    rec = sub.add_parser("record", help="record streams into a capture directory")
+    rec.add_argument("directory")
+    rec.add_argument("--symbols", default="BTCUSDT", help="comma-separated symbols for depth streams")
+    rec.add_argument("--duration", type=float, default=0, help="seconds to record (default: until Ctrl+C)")
+    rec.add_argument("--mainnet", action="store_true", help="record mainnet instead of testnet")
+    rec.add_argument("--no-user-data", action="store_true", help="skip the user data stream and account snapshots")
+    show = sub.add_parser("info", help="summarize a capture directory")
+    show.add_argument("directory")
+    args = parser.parse_args()
+    return record(args) if args.action == "record" else info(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
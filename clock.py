@@ -0,0 +1,119 @@
+"""
+Server clock-offset tracker.
+
+Estimates the offset between the local clock and the exchange NTP-style:
+each /time request gives offset = serverTime - midpoint(send, receive), and
+the estimate is the median offset of the lowest-RTT samples in a rolling
+window. Date headers of every other response are folded in as coarse
+samples. The estimate is written to client.timestamp_offset, which every
+signed python-binance call (and FastOrderClient) adds to its timestamp, and
+recv_window() picks a recvWindow from the observed RTT.
+"""
+
+import email.utils
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+WINDOW = 64
+BEST_FRACTION = 0.25
+SYNC_INTERVAL = 30.0
+MIN_RECV_WINDOW = 1000
+MAX_RECV_WINDOW = 60000
+# Date headers only have 1s resolution
+HEADER_UNCERTAINTY_MS = 500
+
+
+class ClockSync:
+    def __init__(self, client, interval=SYNC_INTERVAL, window=WINDOW):
+        self.client = client
+        self.interval = interval
+        self.samples = deque(maxlen=window)
+        self.header_samples = deque(maxlen=window)
+        self.rtts = deque(maxlen=window)
+        self.offset_ms = 0.0
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Sample in the background; the first sample runs concurrently with startup work"""
+        hooks = self.client.session.hooks.setdefault('response', [])
+        hooks.append(self._on_response)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        burst = 4
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Clock sync failed: {e}")
+                self.ready.set()  # don't block orders; fall back to the last estimate
+            if burst > 1:
+                burst -= 1
+                continue
+            self._stop.wait(self.interval)
+
+    def sample(self):
+        """Take one precise sample from the server time endpoint"""
+        t0 = time.time() * 1000
+        server = self.client.futures_time()['serverTime']
+        t1 = time.time() * 1000
+        self.add_sample(server - (t0 + t1) / 2, t1 - t0)
+
+    def add_sample(self, offset_ms, rtt_ms):
+        with self._lock:
+            self.samples.append((rtt_ms, offset_ms))
+            self.rtts.append(rtt_ms)
+            self._update()
+        self.ready.set()
+
+    def _on_response(self, response, *args, **kwargs):
+        """requests response hook: use the Date header and elapsed time as a coarse sample"""
+        date = response.headers.get('Date')
+        if not date:
+            return
+        try:
+            server = email.utils.parsedate_to_datetime(date).timestamp() * 1000 + HEADER_UNCERTAINTY_MS
+        except (TypeError, ValueError):
+            return
+        rtt = response.elapsed.total_seconds() * 1000
+        now = time.time() * 1000
+        with self._lock:
+            self.header_samples.append(server - (now - rtt / 2))
+            self.rtts.append(rtt)
+            if not self.samples:
+                self._update()
+
+    def _update(self):
+        if self.samples:
+            best = sorted(self.samples)[:max(1, int(len(self.samples) * BEST_FRACTION))]
+            offsets = sorted(offset for _, offset in best)
+        else:
+            offsets = sorted(self.header_samples)
+        if offsets:
+            self.offset_ms = offsets[len(offsets) // 2]
+            self.client.timestamp_offset = int(self.offset_ms)
+
+    def wait_ready(self, timeout=2.0):
+        return self.ready.wait(timeout)
+
+    def recv_window(self):
+        """recvWindow (ms) covering the p99 RTT plus the offset uncertainty, with headroom"""
+        with self._lock:
+            rtts = sorted(self.rtts)
+            uncertainty = HEADER_UNCERTAINTY_MS if not self.samples else min(rtt for rtt, _ in self.samples) / 2
+        if not rtts:
+            return None
+        p99 = rtts[min(len(rtts) - 1, int(0.99 * (len(rtts) - 1) + 0.5))]
+        return int(min(MAX_RECV_WINDOW, max(MIN_RECV_WINDOW, 3 * p99 + uncertainty + 500)))
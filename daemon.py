@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Resident trading bot daemon.
+
+Keeps one warm TradingBot (client, exchange info, clock sync, journal,
+streaming portfolio and funding rates) and serves trade.py commands over a
+local socket, so a CLI call only pays for a small client (trade_client.py)
+and one round trip to the exchange.
+
+Usage: python daemon.py start [--profile NAME | --mainnet]
+       python daemon.py stop [--profile NAME | --mainnet]
+"""
+
+import argparse
+import io
+import json
+import os
+import secrets
+import socket
+import socketserver
+import sys
+import threading
+
+from daemon_protocol import ENCODING, MAX_REQUEST, endpoint, token_path
+
+
+class ThreadLocalStream:
+    """sys.stdout/stderr replacement that routes each handler thread's output to its own buffer"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        buffer = getattr(self.local, "buffer", None)
+        (buffer or self.stream).flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class BotDaemon:
+    def __init__(self, profile):
+        import trade
+        from funding import FundingTracker
+        from portfolio import Portfolio
+        from streams import StreamHub
+
+        self.trade = trade
+        self.profile = profile
+        self.testnet = testnet = profile.testnet
+        self.bot = trade.TradingBot(profile=profile)
+        self.parser = trade.build_parser()
+        # Warm, streaming portfolio so status is a local read
+        self.bot.portfolio = Portfolio.from_client(self.bot.client)
+        self.bot.funding = FundingTracker(self.bot.portfolio)
+        self.bot.funding.load(self.bot.client)
+        self.streams = StreamHub(self.bot.api_key, self.bot.api_secret, testnet=testnet)
+        try:
+            self.streams.start()
+            self.bot.portfolio.attach(self.streams)
+            self.bot.funding.attach(self.streams)
+            if self.bot.risk.enabled:
+                self.bot.risk.attach(self.streams)
+            if self.bot.alerts is not None:
+                self.bot.alerts.instrument(hub=self.streams, latency=None)  # fills; the rest is set up by the bot
+        except Exception as e:
+            print(f"⚠️  Streams unavailable, status will be polled: {e}")
+            self.streams = None
+        self.token = secrets.token_hex(16)
+        self.stdout = ThreadLocalStream(sys.stdout)
+        self.stderr = ThreadLocalStream(sys.stderr)
+
+    def handle(self, request):
+        """Run one request and return the response dict"""
+        if request.get("token") != self.token:
+            return {"exit": 1, "output": "❌ Invalid daemon token\n"}
+        argv = request.get("argv", [])
+        out = io.StringIO()
+        self.stdout.local.buffer = self.stderr.local.buffer = out
+        code = 0
+        try:
+            args = self.parser.parse_args(argv)
+            profile = self.trade.get_profile(args)
+            if profile.name != self.profile.name:
+                print(f"❌ Daemon is running profile {self.profile.name}, not {profile.name}")
+                code = 1
+            elif args.command == "run":
+                print("❌ 'run' is not served by the daemon, use trade.py run")
+                code = 1
+            else:
+                if self.streams is None and args.command == "status":
+                    self.bot.portfolio.load(self.bot.client)
+                self.trade.dispatch(self.bot, args)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            code = 1
+        finally:
+            self.stdout.local.buffer = self.stderr.local.buffer = None
+        return {"exit": code, "output": out.getvalue()}
+
+    def serve(self):
+        daemon = self
+        family, address = endpoint(self.profile.name)
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline(MAX_REQUEST)
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    return
+                if request.get("argv") == ["__stop__"] and request.get("token") == daemon.token:
+                    self.wfile.write(b'{"exit": 0, "output": "Daemon stopping\\n"}\n')
+                    threading.Thread(target=server.shutdown, daemon=True).start()
+                    return
+                response = daemon.handle(request)
+                self.wfile.write(json.dumps(response).encode(ENCODING) + b"\n")
+
+        if family == getattr(socket, "AF_UNIX", None):
+            if os.path.exists(address):
+                os.unlink(address)
+            server = socketserver.ThreadingUnixStreamServer(address, Handler)
+            os.chmod(address, 0o600)
+        else:
+            socketserver.ThreadingTCPServer.allow_reuse_address = True
+            server = socketserver.ThreadingTCPServer(address, Handler)
+        server.daemon_threads = True
+
+        path = token_path(self.profile.name)
+        if os.path.exists(path):
+            os.unlink(path)  # a stale file keeps its old permissions
+        # Created user-only: the token must never be readable by others, even briefly
+        with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "w") as f:
+            f.write(self.token)
+
+        sys.stdout, sys.stderr = self.stdout, self.stderr
+        print(f"🟢 Daemon listening on {address} ({self.profile.name}, {'TESTNET' if self.testnet else 'MAINNET'}), "
+              f"Ctrl+C to stop")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            sys.stdout, sys.stderr = self.stdout.stream, self.stderr.stream
+            for path in (token_path(self.profile.name), address if isinstance(address, str) else None):
+                if path and os.path.exists(path):
+                    os.unlink(path)
+            if self.streams:
+                self.streams.stop()
+            print("👋 Daemon stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="daemon", description="Resident trading bot daemon")
+    parser.add_argument("action", choices=["start", "stop"])
+    parser.add_argument("--mainnet", action="store_true", help="Use mainnet (default: testnet)")
+    parser.add_argument("--profile", help="Profile from profiles.json (default: the file's default profile)")
+    args = parser.parse_args()
+
+    from profiles import ProfileError, resolve_profile
+    try:
+        profile = resolve_profile(args.profile, testnet=False if args.mainnet else None)
+    except ProfileError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    if args.action == "stop":
+        from trade_client import NoAnswer, send
+        try:
+            response = send(["__stop__"], profile=profile.name)
+        except NoAnswer as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(response["output"] if response else "Daemon is not running", end="" if response else "\n")
+        return
+    BotDaemon(profile).serve()
+
+
+if __name__ == "__main__":
+    main()
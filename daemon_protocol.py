@@ -0,0 +1,49 @@
+"""
+Local socket endpoint shared by daemon.py and trade_client.py.
+
+A Unix socket where available, otherwise TCP on localhost (Windows), one per
+profile. Requests and responses are single JSON lines; every request carries
+the token the daemon writes to a user-only file at startup.
+"""
+
+import os
+import socket
+import tempfile
+import zlib
+
+ENCODING = "utf-8"
+MAX_REQUEST = 65536
+DEFAULT_PORT = 47321
+
+
+def _runtime_dir():
+    return os.getenv("TRADE_DAEMON_DIR") or tempfile.gettempdir()
+
+
+def _user():
+    return str(os.getuid()) if hasattr(os, "getuid") else os.getenv("USERNAME", "user")
+
+
+def endpoint(profile):
+    """Return (address family, address) of the daemon socket of a profile (one daemon per profile)"""
+    if hasattr(socket, "AF_UNIX"):
+        return socket.AF_UNIX, os.path.join(_runtime_dir(), f"trading-bot-{_user()}-{profile}.sock")
+    port = int(os.getenv("TRADE_DAEMON_PORT", DEFAULT_PORT)) + zlib.crc32(profile.encode(ENCODING)) % 1000
+    return socket.AF_INET, ("127.0.0.1", port)
+
+
+def token_path(profile):
+    return os.path.join(_runtime_dir(), f"trading-bot-{_user()}-{profile}.token")
+
+
+def profile_name(argv):
+    """Name of the profile a trade.py command line selects (--profile / --mainnet)"""
+    from profiles import resolve_profile
+
+    name = None
+    for i, arg in enumerate(argv):
+        if arg == "--profile" and i + 1 < len(argv):
+            name = argv[i + 1]
+        elif arg.startswith("--profile="):
+            name = arg.split("=", 1)[1]
+    return resolve_profile(name, testnet=False if "--mainnet" in argv else None).name
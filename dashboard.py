@@ -0,0 +1,169 @@
+"""
+Full-screen live dashboard with differential redraw.
+
+The dashboard reads the streaming caches (prices, portfolio, open orders,
+latency stats) and, at a capped frame rate, rewrites only the screen cells
+whose text changed since the previous frame. Nothing is redrawn while the
+caches are idle, so CPU stays low even when hundreds of symbols stream.
+"""
+
+import os
+import shutil
+import sys
+import time
+
+ESC = "\x1b["
+MAX_FPS = 10
+
+
+class Screen:
+    """Cell buffer that writes only changed cells using ANSI cursor moves"""
+
+    def __init__(self, out=sys.stdout):
+        self.out = out
+        self.previous = {}
+        self.current = {}
+
+    def put(self, row, col, text, width):
+        """Place text in a fixed-width cell"""
+        self.current[(row, col)] = text[:width].ljust(width)
+
+    def flush(self):
+        """Blank removed cells, then write the cells that changed since the last flush"""
+        parts = []
+        blanked = {}                # row -> [(start, end)] of removed cells
+        # Blanks go first so a removed cell cannot wipe a new, wider one written over it
+        for key, text in self.previous.items():
+            if key not in self.current:
+                parts.append(f"{ESC}{key[0] + 1};{key[1] + 1}H{' ' * len(text)}")
+                blanked.setdefault(key[0], []).append((key[1], key[1] + len(text)))
+        for key, text in self.current.items():
+            if self.previous.get(key) != text or any(
+                    start < key[1] + len(text) and key[1] < end for start, end in blanked.get(key[0], ())):
+                parts.append(f"{ESC}{key[0] + 1};{key[1] + 1}H{text}")
+        if parts:
+            self.out.write("".join(parts))
+            self.out.flush()
+        self.previous, self.current = self.current, {}
+        return len(parts)
+
+    def enter(self):
+        if os.name == "nt":
+            os.system("")  # enables ANSI escape handling in the Windows console
+        self.out.write(f"{ESC}?1049h{ESC}?25l{ESC}2J")
+        self.out.flush()
+
+    def clear(self):
+        """Forget the previous frame and blank the terminal (e.g. after a resize)"""
+        self.previous = {}
+        self.out.write(f"{ESC}2J")
+        self.out.flush()
+
+    def exit(self):
+        self.out.write(f"{ESC}?25h{ESC}?1049l")
+        self.out.flush()
+
+
+class Dashboard:
+    def __init__(self, prices, portfolio, orders, latency, watchlist=(), max_fps=MAX_FPS, screen=None, funding=None):
+        self.prices = prices
+        self.portfolio = portfolio
+        self.funding = funding
+        self.orders = orders
+        self.latency = latency
+        self.watchlist = list(watchlist)
+        self.frame_interval = 1.0 / max_fps
+        self.screen = screen or Screen()
+        self.frames = 0
+        self.cells_written = 0
+
+    def _versions(self):
+        funding = self.funding.version if self.funding is not None else 0
+        return (self.prices.version, self.portfolio.version, self.orders.version, funding, int(time.time()))
+
+    def _symbols(self):
+        symbols = list(self.watchlist)
+        for pos in self.portfolio.active_positions():
+            if pos.symbol not in symbols:
+                symbols.append(pos.symbol)
+        return symbols
+
+    def render(self, width, height):
+        """Lay out one frame into the screen buffer"""
+        put = self.screen.put
+        put(0, 0, f"🚀 LIVE DASHBOARD  {time.strftime('%H:%M:%S')}  (Ctrl+C to return)", width)
+        row = 2
+
+        put(row, 0, f"{'SYMBOL':<12}{'PRICE':>16}{'24H %':>10}", width)
+        row += 1
+        for symbol in self._symbols():
+            if row >= height // 2:
+                break
+            price = self.prices.get(symbol)
+            change = self.prices.change_pct(symbol)
+            put(row, 0, f"{symbol:<12}", 12)
+            put(row, 12, f"{price:>16,.4f}" if price else f"{'N/A':>16}", 16)
+            put(row, 28, f"{change:>+9.2f}%" if change is not None else f"{'':>10}", 10)
+            row += 1
+
+        row += 1
+        put(row, 0, f"💰 Balance: {self.portfolio.wallet_balance:,.2f} USDT   "
+                    f"PnL: {self.portfolio.unrealized_pnl:+,.4f}   Margin: {self.portfolio.margin_used:,.2f}", width)
+        row += 1
+        put(row, 0, f"{'POSITION':<12}{'SIDE':>6}{'SIZE':>14}{'ENTRY':>14}{'MARK':>14}{'PNL':>14}"
+                    f"{'NEXT FUNDING':>14}", width)
+        row += 1
+        for pos in self.portfolio.active_positions():
+            if row >= height - 8:
+                break
+            put(row, 0, f"{pos.symbol:<12}{pos.side:>6}{abs(pos.amount):>14}", 32)
+            put(row, 32, f"{pos.entry_price:>14,.4f}", 14)
+            put(row, 46, f"{pos.mark_price:>14,.4f}", 14)
+            put(row, 60, f"{pos.unrealized_pnl:>+14,.4f}", 14)
+            projected = self.funding.projected(pos.symbol) if self.funding is not None else None
+            put(row, 74, f"{projected[2]:>+14,.4f}" if projected else f"{'':>14}", 14)
+            row += 1
+
+        row += 1
+        put(row, 0, f"{'OPEN ORDER':<12}{'SIDE':>6}{'TYPE':>14}{'QTY':>14}{'PRICE':>14}{'STATUS':>18}", width)
+        row += 1
+        for order in self.orders.open_orders():
+            if row >= height - 4:
+                break
+            put(row, 0, f"{order.symbol:<12}{order.side:>6}{order.type:>14}"
+                        f"{order.quantity:>14}{order.price:>14,.4f}{order.status:>18}", width)
+            row += 1
+
+        row += 1
+        for name, (count, p50, p99, worst) in sorted(self.latency.summary().items()):
+            if row >= height - 1:
+                break
+            put(row, 0, f"⏱  {name:<20} n={count:<6} p50={p50 * 1000:7.1f}ms "
+                        f"p99={p99 * 1000:7.1f}ms max={worst * 1000:7.1f}ms", width)
+            row += 1
+
+    def run(self):
+        """Redraw until Ctrl+C"""
+        self.screen.enter()
+        last_versions = None
+        last_size = None
+        try:
+            while True:
+                started = time.perf_counter()
+                versions = self._versions()
+                size = shutil.get_terminal_size()
+                if size != last_size:
+                    self.screen.clear()
+                    last_size = size
+                    last_versions = None
+                if versions != last_versions:
+                    self.render(size.columns, size.lines)
+                    self.cells_written += self.screen.flush()
+                    self.frames += 1
+                    last_versions = versions
+                elapsed = time.perf_counter() - started
+                time.sleep(max(0.0, self.frame_interval - elapsed))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.screen.exit()
@@ -0,0 +1,118 @@
+"""
+Funding cost tracking for open futures positions.
+
+The all-market mark price stream (!markPrice@arr@1s) carries every
+symbol's mark price, current funding rate (r) and next funding time (T)
+each second, so rates for all positions are kept without per-symbol REST
+polling. When a symbol's next funding time moves forward, the funding
+that just settled is accrued to its position as amount x mark x rate
+(positive rate: longs pay, shorts receive). Costs are positive when paid.
+The funding the exchange actually books (FUNDING_FEE account updates) is
+summed separately for the whole account.
+"""
+
+import logging
+import threading
+import time
+
+from portfolio import MARK_PRICE_STREAM
+
+logger = logging.getLogger(__name__)
+
+INCOME_DAYS = 7
+INCOME_PAGE = 1000
+
+
+class FundingTracker:
+    def __init__(self, portfolio):
+        self.portfolio = portfolio
+        self.rates = {}          # symbol -> [funding rate, next funding time (ms), mark price]
+        self.accrued = {}        # symbol -> funding settled while tracking (estimated)
+        self.paid = {}           # symbol -> funding from the income history of the last `days` days at load
+        self.days = INCOME_DAYS
+        self.settled = 0.0       # account funding the exchange booked (ACCOUNT_UPDATE FUNDING_FEE) while tracking
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def load(self, client, days=INCOME_DAYS):
+        """Seed rates from one bulk mark price call and past funding from the income history"""
+        marks = client.futures_mark_price()
+        income = []
+        seen = set()
+        start = int((time.time() - days * 86400) * 1000)
+        while True:
+            page = client.futures_income_history(incomeType="FUNDING_FEE", limit=INCOME_PAGE, startTime=start)
+            new = [item for item in page if item['tranId'] not in seen]
+            seen.update(item['tranId'] for item in new)
+            income += new
+            if len(page) < INCOME_PAGE:
+                break
+            # Every symbol settles at the same timestamp, so the next page starts at the last row's
+            # time again (a page can end halfway through a settlement) and repeats are dropped by
+            # tranId. Only a full page that brought nothing new moves past that millisecond.
+            last = int(page[-1]['time'])
+            start = last if new and last > start else last + 1
+        with self._lock:
+            self.days = days
+            for mark in marks:
+                self.rates[mark['symbol']] = [float(mark.get('lastFundingRate') or 0),
+                                              int(mark.get('nextFundingTime') or 0), float(mark['markPrice'])]
+            self.paid = {}
+            for item in income:
+                self.paid[item['symbol']] = self.paid.get(item['symbol'], 0.0) - float(item['income'])
+            self.version += 1
+        logger.info(f"Funding loaded: {len(self.rates)} rates, {len(income)} payments in {days} days")
+
+    def attach(self, hub):
+        """Keep rates and accruals current from a StreamHub"""
+        hub.on('markPriceUpdate', self.on_mark_price)
+        hub.on('ACCOUNT_UPDATE', self.on_account_update)
+        hub.add_streams([MARK_PRICE_STREAM])
+
+    def on_mark_price(self, event):
+        symbol = event['s']
+        next_time = int(event.get('T') or 0)
+        with self._lock:
+            entry = self.rates.get(symbol)
+            if entry is not None and entry[1] and next_time > entry[1]:
+                # The previous funding time has passed: settle it at the last rate and mark before it
+                amount = self.portfolio.get_position(symbol)
+                if amount:
+                    self.accrued[symbol] = self.accrued.get(symbol, 0.0) + amount * entry[2] * entry[0]
+                    self.version += 1
+            self.rates[symbol] = [float(event.get('r') or 0), next_time, float(event['p'])]
+
+    def on_account_update(self, event):
+        data = event['a']
+        if data.get('m') != 'FUNDING_FEE':
+            return
+        with self._lock:
+            for balance in data.get('B', ()):
+                if balance['a'] == 'USDT':
+                    self.settled -= float(balance.get('bc') or 0)
+                    self.version += 1
+
+    def projected(self, symbol):
+        """(funding rate, next funding time, projected cost) of the current position, or None"""
+        entry = self.rates.get(symbol)
+        if entry is None:
+            return None
+        rate, next_time, mark = entry
+        return rate, next_time, self.portfolio.get_position(symbol) * mark * rate
+
+    def projections(self):
+        """[(symbol, rate, next funding time, projected cost)] of the open positions, soonest first"""
+        rows = []
+        for pos in self.portfolio.active_positions():
+            projected = self.projected(pos.symbol)
+            if projected is not None:
+                rows.append((pos.symbol,) + projected)
+        return sorted(rows, key=lambda row: row[2])
+
+    @property
+    def projected_total(self):
+        return sum(row[3] for row in self.projections())
+
+    def cost(self, symbol):
+        """Funding paid for a symbol over the last `days` days: income history at load plus estimated accruals since"""
+        return self.paid.get(symbol, 0.0) + self.accrued.get(symbol, 0.0)
@@ -0,0 +1,281 @@
+"""
+Deadlines, circuit breakers and stale fallbacks around exchange calls.
+
+Every futures_* call made through a GuardedClient gets a per-endpoint
+deadline (the HTTP timeout) instead of the client's blanket default, and
+goes through one of three circuit breakers (orders, account, market). A
+breaker opens after repeated exchange faults or slow calls and then fails
+fast with CircuitOpen until a single probe call succeeds. Client errors the
+exchange answered (insufficient margin, bad quantity...) do not count.
+
+While the exchange is unreachable, bulk read-only endpoints (prices, mark
+prices, account, positions, open orders) fall back to their last good
+answer, in memory or in the profile cache from an earlier run, if it is at
+most MAX_STALE_AGE old. Such results are marked: stale_age(result) is their
+age in seconds, None for fresh data. Callers that build state which later
+events only update incrementally (risk counters, the open order cache) use
+require_fresh() and fail instead.
+"""
+
+import inspect
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE = 5.0
+DEADLINES = {
+    'futures_create_order': 5.0,
+    'futures_cancel_order': 5.0,
+    'futures_modify_order': 5.0,
+    'futures_get_order': 3.0,
+    'futures_symbol_ticker': 2.0,
+    'futures_mark_price': 2.0,
+    'futures_order_book': 3.0,
+    'futures_time': 2.0,
+    'futures_account': 3.0,
+    'futures_position_information': 3.0,
+    'futures_get_open_orders': 3.0,
+    'futures_exchange_info': 10.0,
+    'futures_get_all_orders': 8.0,
+    'futures_account_trades': 8.0,
+    'futures_income_history': 8.0,
+    'futures_klines': 8.0,
+}
+
+ORDER_ENDPOINTS = frozenset((
+    'futures_create_order', 'futures_cancel_order', 'futures_cancel_all_open_orders', 'futures_place_batch_order',
+    'futures_modify_order', 'futures_change_leverage', 'futures_change_margin_type',
+))
+MARKET_ENDPOINTS = frozenset((
+    'futures_symbol_ticker', 'futures_mark_price', 'futures_order_book', 'futures_exchange_info', 'futures_klines',
+    'futures_ticker', 'futures_time', 'futures_ping', 'futures_orderbook_ticker',
+))
+# Bulk reads whose last answer may be served (marked stale) while the exchange is down
+STALE_ENDPOINTS = frozenset((
+    'futures_symbol_ticker', 'futures_mark_price', 'futures_account', 'futures_account_balance',
+    'futures_position_information', 'futures_get_open_orders',
+))
+
+# Error codes that mean the exchange itself is unwell (unknown error, disconnected, rate limit, timeout, overload)
+EXCHANGE_FAULT_CODES = (-1000, -1001, -1003, -1006, -1007, -1008)
+
+FAILURE_THRESHOLD = 5
+RESET_AFTER = 15.0
+SLOW_FRACTION = 0.5
+PERSIST_INTERVAL = 5.0
+MAX_STALE_AGE = 3600.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpen(Exception):
+    # Not an exchange code: the call was never sent, so journal/retry treat it as a definite failure
+    code = "CIRCUIT_OPEN"
+
+    def __init__(self, group, retry_in):
+        super().__init__(f"exchange {group} calls suspended after repeated failures, retry in {retry_in:.0f}s")
+        self.group = group
+        self.retry_in = retry_in
+
+
+class StaleData(Exception):
+    """Live data was required but the exchange only left a cached answer"""
+
+
+class StaleList(list):
+    stale_age = None
+
+
+class StaleDict(dict):
+    stale_age = None
+
+
+def stale_age(result):
+    """Age in seconds of a result served from cache during an outage, or None if it is fresh"""
+    return getattr(result, "stale_age", None)
+
+
+def require_fresh(result, what):
+    """Return result, or raise StaleData if it was served from cache"""
+    age = stale_age(result)
+    if age is not None:
+        raise StaleData(f"{what} unavailable: exchange unreachable (only {age:.0f}s old cached data)")
+    return result
+
+
+def is_exchange_fault(error):
+    """True for failures that say the exchange is unhealthy rather than that the request was wrong"""
+    if isinstance(error, CircuitOpen):
+        return False
+    code = getattr(error, "code", None)
+    if code is None:
+        return True  # timeout / connection error
+    status = getattr(error, "status_code", None)
+    return code in EXCHANGE_FAULT_CODES or (status is not None and status >= 500)
+
+
+class CircuitBreaker:
+    def __init__(self, name, failures=FAILURE_THRESHOLD, reset_after=RESET_AFTER):
+        self.name = name
+        self.threshold = failures
+        self.reset_after = reset_after
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before(self):
+        """Raise CircuitOpen unless a call may go out now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            retry_in = self.opened_at + self.reset_after - time.monotonic()
+            if self.state == OPEN and retry_in <= 0:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True  # let exactly one probe through
+                return
+            raise CircuitOpen(self.name, max(retry_in, 0.0))
+
+    def success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"Exchange {self.name} calls recovered")
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.threshold):
+                if self.state == CLOSED:
+                    logger.warning(f"Exchange {self.name} calls failing, suspending for {self.reset_after:.0f}s")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+
+class ExchangeGuard:
+    def __init__(self, deadlines=None, failures=FAILURE_THRESHOLD, reset_after=RESET_AFTER,
+                 slow_fraction=SLOW_FRACTION, store=None, max_stale_age=MAX_STALE_AGE):
+        self.deadlines = dict(DEADLINES, **(deadlines or {}))
+        self.slow_fraction = slow_fraction
+        self.max_stale_age = max_stale_age
+        self.breakers = {group: CircuitBreaker(group, failures, reset_after) for group in ("orders", "account", "market")}
+        self.store = store          # profiles.ProfileCache for last-good answers across runs
+        self._last = {}             # (endpoint, params) -> (time, result)
+        self._persisted = {}
+
+    def wrap(self, client):
+        return GuardedClient(client, self)
+
+    @staticmethod
+    def group(name):
+        if name in ORDER_ENDPOINTS:
+            return "orders"
+        return "market" if name in MARKET_ENDPOINTS else "account"
+
+    def status(self):
+        """{group: breaker state}"""
+        return {group: breaker.state for group, breaker in self.breakers.items()}
+
+    def call(self, name, fn, kwargs, pass_deadline=True):
+        """Run one exchange call under its deadline and breaker, falling back to stale data for bulk reads
+
+        pass_deadline=False for methods without **params (futures_exchange_info, futures_time), which
+        keep the client's default timeout.
+        """
+        breaker = self.breakers[self.group(name)]
+        key = (name, tuple(sorted(kwargs.items()))) if name in STALE_ENDPOINTS else None
+        try:
+            breaker.before()
+        except CircuitOpen:
+            stale = self._stale(key)
+            if stale is None:
+                raise
+            return stale
+
+        deadline = self.deadlines.get(name, DEFAULT_DEADLINE)
+        if pass_deadline:
+            kwargs = dict(kwargs, requests_params=dict(kwargs.get("requests_params") or {}, timeout=deadline))
+        start = time.monotonic()
+        try:
+            result = fn(**kwargs)
+        except Exception as e:
+            if not is_exchange_fault(e):
+                breaker.success()
+                raise
+            breaker.failure()
+            logger.warning(f"{name} failed after {time.monotonic() - start:.2f}s: {e}")
+            stale = self._stale(key)
+            if stale is None:
+                raise
+            return stale
+        if time.monotonic() - start > deadline * self.slow_fraction:
+            breaker.failure()  # a latency spike counts toward opening the breaker
+        else:
+            breaker.success()
+        if key is not None:
+            self._remember(key, result)
+        return result
+
+    def _remember(self, key, result):
+        now = time.time()
+        self._last[key] = (now, result)
+        # Only bulk (parameterless) answers are persisted, at most every PERSIST_INTERVAL
+        if self.store is not None and not key[1] and now - self._persisted.get(key, 0) > PERSIST_INTERVAL:
+            self._persisted[key] = now
+            try:
+                self.store.write(f"last-{key[0]}.json", result)
+            except OSError as e:
+                logger.warning(f"Could not persist {key[0]}: {e}")
+
+    def _stale(self, key):
+        if key is None:
+            return None
+        entry = self._last.get(key)
+        if entry is None and self.store is not None and not key[1]:
+            entry = self.store.read_entry(f"last-{key[0]}.json")
+        if entry is None or entry[1] is None:
+            return None
+        saved, result = entry
+        age = time.time() - saved
+        if age > self.max_stale_age:
+            logger.warning(f"Cached {key[0]} is {age:.0f}s old, too old to serve")
+            return None
+        stale = StaleList(result) if isinstance(result, list) else StaleDict(result)
+        stale.stale_age = age
+        logger.warning(f"Serving {key[0]} from cache ({stale.stale_age:.0f}s old)")
+        return stale
+
+
+class GuardedClient:
+    """Wraps a python-binance Client; every futures_* method runs through an ExchangeGuard"""
+
+    def __init__(self, client, guard):
+        object.__setattr__(self, "client", client)
+        object.__setattr__(self, "guard", guard)
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if not name.startswith("futures_") or not callable(attr):
+            return attr
+        try:
+            takes_params = any(p.kind == p.VAR_KEYWORD for p in inspect.signature(attr).parameters.values())
+        except (TypeError, ValueError):
+            takes_params = False
+
+        def guarded(**kwargs):
+            return self.guard.call(name, attr, kwargs, takes_params)
+
+        object.__setattr__(self, name, guarded)  # later lookups skip __getattr__
+        return guarded
+
+    def __setattr__(self, name, value):
+        setattr(self.client, name, value)  # e.g. ClockSync's timestamp_offset belongs on the real client
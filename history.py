@@ -0,0 +1,335 @@
+"""
+Local, incremental order and fill history.
+
+futures_get_all_orders only returns up to 1000 orders from a window of at
+most 7 days, so showing "recent orders" by fetching a page and slicing its
+tail both misses history and re-downloads the same orders every time.
+OrderHistory keeps every order in an indexed SQLite file and syncs it
+incrementally: the first sync scans 7-day windows of the last INITIAL_DAYS
+for the oldest order and then pages forward by orderId; later syncs page forward
+from the last known orderId (or from the oldest order still open locally,
+so fills and cancels of resting orders are picked up). An open order the
+pass no longer returns was purged by the exchange (cancelled unfilled
+orders go after a few days); it is looked up once and otherwise marked
+UNKNOWN so it stops holding the sync start back. Fills
+(futures_account_trades) and 1m klines for tca.py are kept the same way.
+Queries by symbol and time range never touch the exchange.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from functools import partial
+
+from models import Fill, Order
+from profiles import resolve_profile
+
+logger = logging.getLogger(__name__)
+
+PAGE_LIMIT = 1000
+KLINE_LIMIT = 1500
+KLINE_MS = 60 * 1000
+WINDOW_MS = 7 * 24 * 3600 * 1000
+INITIAL_DAYS = 90
+OPEN_STATUSES = ("NEW", "PARTIALLY_FILLED")
+PURGED_STATUS = "UNKNOWN"   # open locally, gone from the exchange's order history
+ORDER_NOT_FOUND = -2013
+
+# Column order matches Order.__init__, so rows map straight back to Order objects
+COLUMNS = ("order_id", "client_order_id", "symbol", "side", "type", "status", "price", "avg_price",
+           "stop_price", "quantity", "filled", "reduce_only", "update_time", "time")
+# Same for Fill.__init__
+FILL_COLUMNS = ("symbol", "order_id", "trade_id", "side", "price", "quantity", "commission",
+                "commission_asset", "realized_pnl", "time", "maker")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id INTEGER NOT NULL,
+    client_order_id TEXT,
+    symbol TEXT NOT NULL,
+    side TEXT,
+    type TEXT,
+    status TEXT,
+    price REAL,
+    avg_price REAL,
+    stop_price REAL,
+    quantity REAL,
+    filled REAL,
+    reduce_only INTEGER,
+    update_time INTEGER,
+    time INTEGER,
+    PRIMARY KEY (symbol, order_id)
+);
+CREATE INDEX IF NOT EXISTS orders_symbol_time ON orders (symbol, time);
+CREATE INDEX IF NOT EXISTS orders_time ON orders (time);
+CREATE TABLE IF NOT EXISTS sync_state (
+    symbol TEXT PRIMARY KEY,
+    last_order_id INTEGER NOT NULL,
+    synced_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fills (
+    symbol TEXT NOT NULL,
+    order_id INTEGER NOT NULL,
+    trade_id INTEGER NOT NULL,
+    side TEXT,
+    price REAL,
+    quantity REAL,
+    commission REAL,
+    commission_asset TEXT,
+    realized_pnl REAL,
+    time INTEGER,
+    maker INTEGER,
+    PRIMARY KEY (symbol, trade_id)
+);
+CREATE INDEX IF NOT EXISTS fills_symbol_time ON fills (symbol, time);
+CREATE TABLE IF NOT EXISTS fill_sync_state (
+    symbol TEXT PRIMARY KEY,
+    last_trade_id INTEGER NOT NULL,
+    synced_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS klines (
+    symbol TEXT NOT NULL,
+    open_time INTEGER NOT NULL,
+    open REAL,
+    close REAL,
+    PRIMARY KEY (symbol, open_time)
+);
+"""
+
+
+class OrderHistory:
+    def __init__(self, path=None, testnet=True):
+        # One file per profile, since order ids of testnet and mainnet overlap
+        self.path = path or resolve_profile(testnet=testnet).path("orders.db")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _insert(self, table, columns, rows):
+        with self._lock, self._db:
+            self._db.executemany(f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+                                 f"VALUES ({', '.join('?' * len(columns))})", rows)
+        return len(rows)
+
+    def _store(self, raw_orders):
+        orders = [Order.from_raw(raw) for raw in raw_orders]
+        return self._insert("orders", COLUMNS, [tuple(getattr(o, c) for c in COLUMNS) for o in orders])
+
+    def _store_fills(self, raw_fills):
+        fills = [Fill.from_raw(raw) for raw in raw_fills]
+        return self._insert("fills", FILL_COLUMNS, [tuple(getattr(f, c) for c in FILL_COLUMNS) for f in fills])
+
+    def _page_forward(self, fetch, key, param, store, from_id):
+        """Page forward by id until a short page; returns (stored, highest id)"""
+        stored, last_id = 0, None
+        while True:
+            page = fetch(**{param: from_id, "limit": PAGE_LIMIT})
+            if not page:
+                break
+            stored += store(page)
+            last_id = max(r[key] for r in page)
+            if len(page) < PAGE_LIMIT:
+                break
+            from_id = last_id + 1
+        return stored, last_id
+
+    def _first_id(self, fetch, key, start):
+        """Oldest id since `start` (ms), scanning forward in 7-day windows"""
+        now = int(time.time() * 1000)
+        while start < now:
+            end = min(start + WINDOW_MS - 1, now)
+            page = fetch(startTime=start, endTime=end, limit=PAGE_LIMIT)
+            if page:
+                return min(r[key] for r in page)
+            start = end + 1
+        return None
+
+    def state(self, symbol):
+        with self._lock:
+            row = self._db.execute("SELECT last_order_id, synced_at FROM sync_state WHERE symbol = ?",
+                                   (symbol,)).fetchone()
+        return row
+
+    def sync(self, client, symbol, days=INITIAL_DAYS):
+        """Fetch orders of a symbol that are new or may have changed since the last sync"""
+        fetch = partial(client.futures_get_all_orders, symbol=symbol)
+        state = self.state(symbol)
+        if state is None or not state[0]:
+            # Never synced, or nothing was found last time: scan windows since then
+            start = state[1] if state else int(time.time() * 1000) - days * 24 * 3600 * 1000
+            from_id = self._first_id(fetch, 'orderId', start)
+            last_known = None
+        else:
+            last_known = state[0]
+            with self._lock:
+                open_ids = [row[0] for row in self._db.execute(
+                    f"SELECT order_id FROM orders WHERE symbol = ? AND status IN "
+                    f"({', '.join('?' * len(OPEN_STATUSES))})", (symbol,) + OPEN_STATUSES)]
+            from_id = min([last_known + 1] + open_ids)
+
+        stored = 0
+        if from_id is not None:
+            seen = set()
+
+            def store(page):
+                seen.update(r['orderId'] for r in page)
+                return self._store(page)
+
+            stored, last_id = self._page_forward(fetch, 'orderId', 'orderId', store, from_id)
+            if last_id is not None:
+                last_known = max(last_known or 0, last_id)
+            if state is not None and state[0]:
+                self._resolve_purged(client, symbol, [oid for oid in open_ids if oid not in seen])
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO sync_state (symbol, last_order_id, synced_at) VALUES (?, ?, ?)",
+                             (symbol, last_known or 0, int(time.time() * 1000)))
+        logger.info(f"Synced {stored} {symbol} orders into {self.path}")
+        return stored
+
+    def _resolve_purged(self, client, symbol, order_ids):
+        """Look up open orders a full pass did not return; mark the ones the exchange no longer has"""
+        for order_id in order_ids:
+            try:
+                self._store([client.futures_get_order(symbol=symbol, orderId=order_id)])
+                continue
+            except Exception as e:
+                if getattr(e, "code", None) != ORDER_NOT_FOUND:
+                    logger.warning(f"Lookup of {symbol} order {order_id} failed, keeping it open: {e}")
+                    continue
+            with self._lock, self._db:
+                self._db.execute("UPDATE orders SET status = ? WHERE symbol = ? AND order_id = ?",
+                                 (PURGED_STATUS, symbol, order_id))
+            logger.info(f"{symbol} order {order_id} purged by the exchange, marked {PURGED_STATUS}")
+
+    def query(self, symbol=None, start=None, end=None, status=None, limit=None):
+        """Orders in time order, filtered by symbol, [start, end) in ms and status; `limit` keeps the newest"""
+        sql, params = self._range(f"SELECT {', '.join(COLUMNS)} FROM orders", symbol, start, end)
+        if status:
+            sql += (" AND" if params else " WHERE") + " status = ?"
+            params.append(status)
+        sql += " ORDER BY time DESC, order_id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [Order(*row[:11], bool(row[11]), *row[12:]) for row in reversed(rows)]
+
+    def recent(self, symbol, limit=5):
+        return self.query(symbol=symbol, limit=limit)
+
+    def sync_fills(self, client, symbol, days=INITIAL_DAYS):
+        """Fetch account trades of a symbol newer than the last sync"""
+        fetch = partial(client.futures_account_trades, symbol=symbol)
+        with self._lock:
+            state = self._db.execute("SELECT last_trade_id, synced_at FROM fill_sync_state WHERE symbol = ?",
+                                     (symbol,)).fetchone()
+        if state is None or not state[0]:
+            start = state[1] if state else int(time.time() * 1000) - days * 24 * 3600 * 1000
+            from_id = self._first_id(fetch, 'id', start)
+            last_known = None
+        else:
+            from_id = state[0] + 1
+            last_known = state[0]
+
+        stored = 0
+        if from_id is not None:
+            stored, last_id = self._page_forward(fetch, 'id', 'fromId', self._store_fills, from_id)
+            if last_id is not None:
+                last_known = max(last_known or 0, last_id)
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO fill_sync_state (symbol, last_trade_id, synced_at) "
+                             "VALUES (?, ?, ?)", (symbol, last_known or 0, int(time.time() * 1000)))
+        logger.info(f"Synced {stored} {symbol} fills into {self.path}")
+        return stored
+
+    def fills(self, symbol=None, start=None, end=None):
+        """Fills in time order, filtered by symbol and [start, end) in ms"""
+        sql, params = self._range(f"SELECT {', '.join(FILL_COLUMNS)} FROM fills", symbol, start, end)
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY time, trade_id", params).fetchall()
+        return [Fill(*row[:10], bool(row[10])) for row in rows]
+
+    def fill_columns(self, symbol, start=None, end=None):
+        """Fills of one symbol in time order as columns (arrays for numbers) for bulk analytics"""
+        sql, params = self._range("SELECT order_id, side, price, quantity, commission, commission_asset, "
+                                  "realized_pnl, time, maker FROM fills", symbol, start, end)
+        columns = {"order_id": array('q'), "sign": array('b'), "price": array('d'), "quantity": array('d'),
+                   "commission": array('d'), "commission_asset": [], "realized_pnl": array('d'),
+                   "time": array('q'), "maker": array('b')}
+        with self._lock:
+            cursor = self._db.execute(sql + " ORDER BY time, trade_id", params)
+            for order_id, side, price, quantity, commission, asset, pnl, t, maker in cursor:
+                columns["order_id"].append(order_id)
+                columns["sign"].append(1 if side == "BUY" else -1)
+                columns["price"].append(price)
+                columns["quantity"].append(quantity)
+                columns["commission"].append(commission)
+                columns["commission_asset"].append(asset)
+                columns["realized_pnl"].append(pnl)
+                columns["time"].append(t)
+                columns["maker"].append(maker)
+        return columns
+
+    def _range(self, sql, symbol, start, end):
+        where, params = [], []
+        if symbol:
+            where.append("symbol = ?")
+            params.append(symbol)
+        if start is not None:
+            where.append("time >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("time < ?")
+            params.append(end)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return sql, params
+
+    def sync_klines(self, client, symbol, start, end):
+        """Fetch the 1m klines of [start, end] in ms that are not stored yet (before or after the stored span)"""
+        with self._lock:
+            first, last = self._db.execute("SELECT MIN(open_time), MAX(open_time) FROM klines WHERE symbol = ?",
+                                           (symbol,)).fetchone()
+        start -= start % KLINE_MS
+        spans = [(start, end)] if first is None else [(start, first - 1), (last + KLINE_MS, end)]
+        stored = 0
+        for span_start, span_end in spans:
+            while span_start <= span_end:
+                page = client.futures_klines(symbol=symbol, interval="1m", startTime=span_start,
+                                             endTime=span_end, limit=KLINE_LIMIT)
+                if not page:
+                    break
+                # Skip the still-open minute so it is fetched again once complete
+                rows = [(symbol, k[0], float(k[1]), float(k[4])) for k in page if k[6] < time.time() * 1000]
+                stored += self._insert("klines", ("symbol", "open_time", "open", "close"), rows)
+                if len(page) < KLINE_LIMIT:
+                    break
+                span_start = page[-1][0] + KLINE_MS
+        return stored
+
+    def klines(self, symbol, start=None, end=None):
+        """(open_time, open, close) arrays of the stored 1m klines of a symbol"""
+        sql = "SELECT open_time, open, close FROM klines WHERE symbol = ?"
+        params = [symbol]
+        if start is not None:
+            sql += " AND open_time >= ?"
+            params.append(start - start % KLINE_MS)
+        if end is not None:
+            sql += " AND open_time <= ?"
+            params.append(end)
+        times, opens, closes = array('q'), array('d'), array('d')
+        with self._lock:
+            for t, o, c in self._db.execute(sql + " ORDER BY open_time", params):
+                times.append(t)
+                opens.append(o)
+                closes.append(c)
+        return times, opens, closes
@@ -4,12 +4,37 @@ Binance Futures Trading Bot - Interactive CLI
 Usage: python interactive_trade.py
 """
 
+import argparse
+import asyncio
 import os
 import sys
+import time
+from functools import partial
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from dotenv import load_dotenv
+from clock import ClockSync
 import logging
+import alerts
+from caches import OrderCache, PriceCache
+from dashboard import Dashboard
+from funding import FundingTracker
+from guard import CircuitOpen, ExchangeGuard
+from history import OrderHistory
+from journal import OrderJournal
+from latency import tracker
+from orderbook import DepthCache
+from models import Order, Position, SymbolSpec
+from portfolio import Portfolio
+from precision import ceil_step, round_step
+from prefetch import Prefetcher, ainput
+import profiler
+from profiles import ProfileError, resolve_profile
+from retry import OrderSender
+from risk import RiskEngine, RiskLimitExceeded
+from signing import FastOrderClient
+from streams import StreamHub
+from symbols import SymbolIndex
 
 # Load environment variables
 load_dotenv()
@@ -18,8 +43,20 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 logger = logging.getLogger(__name__)
 
+# Cached prices older than this are refetched
+PRICE_MAX_AGE = 10.0
+
+# Warn before MARKET orders whose estimated slippage vs mid exceeds this (basis points)
+MAX_SLIPPAGE_BPS = 50.0
+
+# Symbols offered in the pick list (ranked by 24h volume) and matches shown for a custom entry
+POPULAR_COUNT = 10
+SEARCH_RESULTS = 8
+FALLBACK_SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'ADAUSDT', 'DOTUSDT',
+                    'LINKUSDT', 'LTCUSDT', 'BCHUSDT', 'XLMUSDT', 'EOSUSDT']
+
 class InteractiveTradingBot:
-    def __init__(self, testnet=True):
+    def __init__(self, testnet=True, profile=None):
         self.api_key = os.getenv("API_KEY")
         self.api_secret = os.getenv("API_SECRET")
         
@@ -27,56 +64,95 @@ class InteractiveTradingBot:
             print("❌ Error: API_KEY and API_SECRET not found in .env file")
             sys.exit(1)
         
-        self.testnet = testnet
-        self.client = Client(self.api_key, self.api_secret, testnet=testnet)
+        self.profile = profile or resolve_profile(testnet=testnet)
+        self.testnet = testnet = self.profile.testnet
+        self.guard = ExchangeGuard(store=self.profile.cache)
+        self.client = self.guard.wrap(Client(self.api_key, self.api_secret, testnet=testnet))
+        self.clock = ClockSync(self.client).start()
         
-        # Get exchange info for validation
+        # Get exchange info for validation (warm from the profile cache)
         try:
-            self.exchange_info = self.client.futures_exchange_info()
+            self.exchange_info = self.profile.cache.exchange_info(self.client)
+            self.specs = SymbolSpec.index(self.exchange_info)
+            self.symbols = SymbolIndex(self.specs)
             env_name = "TESTNET" if testnet else "MAINNET"
-            print(f"✅ Connected to Binance Futures {env_name}")
+            print(f"✅ Connected to Binance Futures {env_name} ({self.profile.name})")
         except Exception as e:
             print(f"❌ Connection failed: {e}")
             sys.exit(1)
 
+        # Keep positions and PnL current from the user data and mark price streams
+        self.portfolio = Portfolio()
+        self.portfolio_loaded = False
+        try:
+            self.load_portfolio()
+        except Exception as e:
+            # Streams only send changes, so keep polling until one full load succeeds
+            print(f"⚠️  Could not load balances and positions ({e}), retrying in the background")
+        self.funding = FundingTracker(self.portfolio)
+        self.prices = PriceCache()
+        self.open_orders = OrderCache()
+        self.streams = StreamHub(self.api_key, self.api_secret, testnet=testnet)
+        self.depth = None
+        try:
+            self.streams.start()
+            self.depth = DepthCache(self.client, self.streams)
+            self.portfolio.attach(self.streams)
+            self.funding.attach(self.streams)
+            self.prices.attach(self.streams)
+            self.open_orders.attach(self.streams)
+            self.prices.load(self.client)
+            self.open_orders.load(self.client)
+        except Exception as e:
+            logger.warning(f"Streams unavailable, status will be polled: {e}")
+            self.streams.stop()
+            self.streams = None
+            self.depth = None
+        if self.streams is not None:
+            try:
+                self.funding.load(self.client)
+            except Exception as e:
+                # Rates still arrive on the mark price stream; only past payments are missing
+                logger.warning(f"Funding history unavailable: {e}")
+
+        self.journal = OrderJournal(self.profile.path("orders.journal"))
+        self.journal.recover(self.client)
+        self.risk = RiskEngine(self.profile.risk_limits())
+        if self.risk.enabled:
+            self.risk.load(self.client)
+            if self.streams is not None:
+                self.risk.attach(self.streams)
+        self.sender = OrderSender(FastOrderClient(self.client, clock=self.clock, guard=self.guard), self.journal, risk=self.risk)
+        self.alerts = alerts.from_env()
+        if self.alerts is not None:
+            self.alerts.instrument(sender=self.sender, log=logger, hub=self.streams)
+        self.prefetcher = Prefetcher()
+        self.history = OrderHistory(self.profile.path("orders.db"))
+
     def get_popular_symbols(self):
-        """Get list of popular trading symbols"""
-        popular = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'ADAUSDT', 'DOTUSDT', 
-                  'LINKUSDT', 'LTCUSDT', 'BCHUSDT', 'XLMUSDT', 'EOSUSDT']
-        return popular
-
-    def _get_symbol_filters(self, symbol):
-        """Get trading filters for a symbol"""
-        for s in self.exchange_info['symbols']:
-            if s['symbol'] == symbol:
-                return {f['filterType']: f for f in s['filters']}
-        return {}
+        """Get list of popular trading symbols (the profile's universe, else the top 24h volume)"""
+        if self.profile.symbols:
+            return list(self.profile.symbols)
+        popular = self.symbols.popular(POPULAR_COUNT)
+        if popular:
+            return popular
+        # 24h volumes unavailable
+        return [symbol for symbol in FALLBACK_SYMBOLS if self.symbols.tradable(symbol)]
+
+    def _get_symbol_spec(self, symbol):
+        """Get trading rules for a symbol, or None"""
+        return self.specs.get(symbol)
 
     def _round_quantity(self, symbol, quantity):
         """Round quantity according to symbol's LOT_SIZE filter"""
         try:
-            filters = self._get_symbol_filters(symbol)
-            if 'LOT_SIZE' in filters:
-                lot_size = filters['LOT_SIZE']
-                step_size = float(lot_size['stepSize'])
-                min_qty = float(lot_size['minQty'])
-                max_qty = float(lot_size['maxQty'])
-                
+            spec = self._get_symbol_spec(symbol)
+            if spec is not None and spec.step_size:
                 # Ensure quantity is within bounds
-                quantity = max(min_qty, min(quantity, max_qty))
+                quantity = max(spec.min_qty, min(quantity, spec.max_qty))
                 
                 # Round UP to next valid step to meet minimum $5 requirement
-                steps = quantity / step_size
-                rounded_steps = int(steps) if steps == int(steps) else int(steps) + 1
-                rounded_quantity = rounded_steps * step_size
-                
-                # Determine precision based on step_size
-                if step_size >= 1:
-                    precision = 0
-                else:
-                    precision = len(str(step_size).split('.')[-1])
-                
-                return round(rounded_quantity, precision)
+                return ceil_step(quantity, spec.step_size)
             else:
                 # Default fallback
                 return round(quantity, 6)
@@ -84,14 +160,44 @@ class InteractiveTradingBot:
             logger.warning(f"Error rounding quantity for {symbol}: {e}")
             return round(quantity, 6)
 
+    def _round_price(self, symbol, price):
+        """Round price to the symbol's tick size"""
+        spec = self._get_symbol_spec(symbol)
+        if spec is None or not spec.tick_size or not float(spec.tick_size):
+            return price
+        return round_step(price, spec.tick_size)
+
     def get_symbol_price(self, symbol):
         """Get current price for symbol"""
+        price = self.prices.get(symbol, max_age=PRICE_MAX_AGE)
+        if price is not None:
+            return price
         try:
             ticker = self.client.futures_symbol_ticker(symbol=symbol)
-            return float(ticker['price'])
+            price = float(ticker['price'])
+            self.prices.set(symbol, price)
+            return price
         except:
             return None
 
+    def load_portfolio(self):
+        self.portfolio.load(self.client)
+        self.portfolio_loaded = self.portfolio.stale_age is None  # cached data is reloaded once the exchange is back
+
+    def prefetch(self, symbol=None):
+        """Fetch what the next screens will need in the background while the user types"""
+        if not self.symbols.volumes:
+            self.prefetcher.schedule('volumes', self.symbols.load_volumes, self.client, self.profile.cache)
+        if self.streams is None:
+            self.prefetcher.schedule('prices', self.prices.load, self.client)
+        if self.streams is None or not self.portfolio_loaded:
+            self.prefetcher.schedule('portfolio', self.load_portfolio)
+        if symbol:
+            if self.depth is not None:
+                self.depth.subscribe(symbol)
+            self.prefetcher.schedule(('price', symbol), self.get_symbol_price, symbol)
+            self.prefetcher.schedule(('position', symbol), partial(self.client.futures_position_information, symbol=symbol))
+
     def show_menu(self):
         """Show main menu"""
         print("\n" + "="*50)
@@ -102,12 +208,15 @@ class InteractiveTradingBot:
         print("3. 📊 Account Status")
         print("4. 📋 Recent Orders")
         print("5. ❌ Close Position")
-        print("6. 🚪 Exit")
+        print("6. 📺 Live Dashboard")
+        print("7. 🚪 Exit")
         print("="*50)
 
-    def ask_symbol(self):
+    async def ask_symbol(self):
         """Ask user to select trading symbol"""
+        await self.prefetcher.wait('volumes')
         popular = self.get_popular_symbols()
+        await self.prefetcher.wait('prices')
         
         print("\n📈 Popular Trading Pairs:")
         for i, symbol in enumerate(popular, 1):
@@ -120,7 +229,7 @@ class InteractiveTradingBot:
         
         while True:
             try:
-                choice = input(f"\nSelect symbol (1-{len(popular)+2}): ").strip().lower()
+                choice = (await ainput(f"\nSelect symbol (1-{len(popular)+2}): ")).strip().lower()
                 
                 # Check for exit commands
                 if choice in ['exit', 'quit', 'q', str(len(popular)+2)]:
@@ -130,17 +239,17 @@ class InteractiveTradingBot:
                 if choice.isdigit():
                     choice = int(choice)
                     if 1 <= choice <= len(popular):
+                        self.prefetch(popular[choice-1])
                         return popular[choice-1]
                     elif choice == len(popular)+1:
-                        custom = input("Enter custom symbol (e.g., DOGEUSDT) or 'exit' to quit: ").strip().upper()
+                        custom = (await ainput("Enter custom symbol (e.g., DOGEUSDT or just DOGE) or 'exit' to quit: ")).strip().upper()
                         if custom.lower() in ['exit', 'quit', 'q']:
                             print("👋 Goodbye!")
                             sys.exit(0)
-                        # Validate symbol exists
-                        if self.get_symbol_price(custom):
-                            return custom
-                        else:
-                            print("❌ Invalid symbol. Please try again.")
+                        symbol = await self.resolve_symbol(custom)
+                        if symbol:
+                            self.prefetch(symbol)
+                            return symbol
                     else:
                         print("❌ Invalid choice. Please try again.")
                 else:
@@ -149,7 +258,32 @@ class InteractiveTradingBot:
                 print("\n👋 Goodbye!")
                 sys.exit(0)
 
-    def ask_order_type(self):
+    async def resolve_symbol(self, text):
+        """Validate a typed symbol against the local index, offering matches for partial or mistyped names"""
+        if self.symbols.tradable(text):
+            return text
+        if text in self.symbols:
+            print(f"❌ {text} is not trading right now ({self.symbols.get(text).status}).")
+            return None
+        matches = self.symbols.search(text, limit=SEARCH_RESULTS)
+        if not matches:
+            print("❌ Invalid symbol. Please try again.")
+            return None
+        if len(matches) == 1:
+            # Not an exact match, so a typo could have picked another instrument: ask first
+            answer = (await ainput(f"❓ Did you mean {matches[0]}? (y/n): ")).strip().lower()
+            return matches[0] if answer in ['y', 'yes'] else None
+        print(f"\n🔎 Matches for {text}:")
+        for i, symbol in enumerate(matches, 1):
+            price = self.prices.get(symbol)
+            price_str = f"${price:,.2f}" if price else ""
+            print(f"{i:2d}. {symbol:<14} {price_str}")
+        choice = (await ainput(f"Select 1-{len(matches)} (Enter to go back): ")).strip()
+        if choice.isdigit() and 1 <= int(choice) <= len(matches):
+            return matches[int(choice) - 1]
+        return None
+
+    async def ask_order_type(self):
         """Ask user for order type"""
         print("\n📋 Order Types:")
         print("1. 🏃 Market Order (Execute immediately at current price)")
@@ -159,7 +293,7 @@ class InteractiveTradingBot:
         
         while True:
             try:
-                choice = input("Select order type (1-4): ").strip().lower()
+                choice = (await ainput("Select order type (1-4): ")).strip().lower()
                 
                 # Check for exit commands
                 if choice in ['exit', 'quit', 'q', '4']:
@@ -178,8 +312,9 @@ class InteractiveTradingBot:
                 print("\n👋 Goodbye!")
                 sys.exit(0)
 
-    def ask_quantity(self, symbol, side):
+    async def ask_quantity(self, symbol, side):
         """Ask user for quantity"""
+        await self.prefetcher.wait(('price', symbol))
         current_price = self.get_symbol_price(symbol)
         
         print(f"\n💰 Position Size for {symbol}:")
@@ -208,7 +343,7 @@ class InteractiveTradingBot:
         
         while True:
             try:
-                choice = input(f"\nEnter quantity or select (1-{len(suggestions)+2}): ").strip().lower()
+                choice = (await ainput(f"\nEnter quantity or select (1-{len(suggestions)+2}): ")).strip().lower()
                 
                 # Check for exit commands
                 if choice in ['exit', 'quit', 'q', str(len(suggestions)+2)]:
@@ -228,7 +363,7 @@ class InteractiveTradingBot:
                         # Custom amount
                         while True:
                             try:
-                                custom_input = input("Enter custom quantity or 'exit' to quit: ").strip().lower()
+                                custom_input = (await ainput("Enter custom quantity or 'exit' to quit: ")).strip().lower()
                                 if custom_input in ['exit', 'quit', 'q']:
                                     print("👋 Goodbye!")
                                     sys.exit(0)
@@ -271,16 +406,38 @@ class InteractiveTradingBot:
                 print("\n👋 Goodbye!")
                 sys.exit(0)
 
-    def ask_price(self, symbol, side):
+    async def ask_price(self, symbol, side):
         """Ask user for limit price"""
+        await self.prefetcher.wait(('price', symbol))
         current_price = self.get_symbol_price(symbol)
         
         print(f"\n💵 Limit Price for {symbol}:")
         if current_price:
             print(f"Current market price: ${current_price:,.2f}")
             
+            book = self.depth.get(symbol) if self.depth else None
+            if book and book.best_bid() and book.best_ask():
+                # Suggest prices from the live order book
+                bid, ask = book.best_bid(), book.best_ask()
+                spec = self._get_symbol_spec(symbol)
+                tick = float(spec.tick_size or 0) if spec else 0.0
+                print(f"Order book: bid ${bid:,.4f} ({book.depth_at(bid)}) / ask ${ask:,.4f} ({book.depth_at(ask)})")
+                if side.upper() == "BUY":
+                    suggestions = [
+                        bid,                                            # join best bid
+                        min(self._round_price(symbol, bid + tick), ask - tick) if tick else bid,  # improve bid
+                        self._round_price(symbol, book.mid()),          # mid
+                    ]
+                    print("Suggested BUY prices (best bid, bid + 1 tick, mid):")
+                else:
+                    suggestions = [
+                        ask,                                            # join best ask
+                        max(self._round_price(symbol, ask - tick), bid + tick) if tick else ask,  # improve ask
+                        self._round_price(symbol, book.mid()),          # mid
+                    ]
+                    print("Suggested SELL prices (best ask, ask - 1 tick, mid):")
             # Suggest prices based on side
-            if side.upper() == "BUY":
+            elif side.upper() == "BUY":
                 suggestions = [
                     current_price * 0.99,  # 1% below
                     current_price * 0.95,  # 5% below
@@ -297,7 +454,7 @@ class InteractiveTradingBot:
             
             for i, price in enumerate(suggestions, 1):
                 pct = ((price - current_price) / current_price) * 100
-                print(f"{i}. ${price:,.2f} ({pct:+.1f}%)")
+                print(f"{i}. ${price:,.4f} ({pct:+.2f}%)")
         else:
             print("Unable to get current price")
             suggestions = []
@@ -305,7 +462,7 @@ class InteractiveTradingBot:
         while True:
             try:
                 if suggestions:
-                    choice = input(f"\nEnter price or select (1-{len(suggestions)}): ").strip()
+                    choice = (await ainput(f"\nEnter price or select (1-{len(suggestions)}): ")).strip()
                     
                     if choice.isdigit() and 1 <= int(choice) <= len(suggestions):
                         return suggestions[int(choice)-1]
@@ -316,7 +473,7 @@ class InteractiveTradingBot:
                         else:
                             print("❌ Price must be positive.")
                 else:
-                    choice = input("\nEnter price: $").strip()
+                    choice = (await ainput("\nEnter price: $")).strip()
                     price = float(choice)
                     if price > 0:
                         return price
@@ -325,8 +482,9 @@ class InteractiveTradingBot:
             except (ValueError, KeyboardInterrupt):
                 print("❌ Invalid price. Please enter a number.")
 
-    def ask_stop_price(self, symbol, side):
+    async def ask_stop_price(self, symbol, side):
         """Ask user for stop price"""
+        await self.prefetcher.wait(('price', symbol))
         current_price = self.get_symbol_price(symbol)
         
         print(f"\n🛑 Stop Price for {symbol}:")
@@ -334,7 +492,7 @@ class InteractiveTradingBot:
         
         while True:
             try:
-                price = float(input("Enter stop price: $").strip())
+                price = float((await ainput("Enter stop price: $")).strip())
                 if price > 0:
                     return price
                 else:
@@ -342,7 +500,22 @@ class InteractiveTradingBot:
             except (ValueError, KeyboardInterrupt):
                 print("❌ Invalid price. Please enter a number.")
 
-    def confirm_order(self, order_details):
+    def check_market_impact(self, symbol, side, quantity):
+        """Estimate a MARKET order's fill from the local order book and warn on high slippage"""
+        book = self.depth.get(symbol) if self.depth else None
+        if book is None:
+            return
+        estimate = book.estimate_fill(side, quantity)
+        if estimate is None:
+            return
+        avg, worst, slippage, filled = estimate
+        print(f"\n📉 Estimated fill: avg ${avg:,.4f}, worst ${worst:,.4f}, slippage {slippage:.1f} bps vs mid")
+        if filled < quantity:
+            print(f"⚠️  Visible book only covers {filled} of {quantity}")
+        if slippage > MAX_SLIPPAGE_BPS:
+            print(f"⚠️  Slippage above {MAX_SLIPPAGE_BPS:.0f} bps - consider a LIMIT order")
+
+    async def confirm_order(self, order_details):
         """Ask user to confirm order"""
         print("\n" + "="*40)
         print("📋 ORDER CONFIRMATION")
@@ -353,7 +526,7 @@ class InteractiveTradingBot:
         print("Type 'exit' or 'quit' to cancel and exit")
         
         while True:
-            confirm = input("Confirm order? (y/n/exit): ").strip().lower()
+            confirm = (await ainput("Confirm order? (y/n/exit): ")).strip().lower()
             if confirm in ['y', 'yes']:
                 return True
             elif confirm in ['n', 'no']:
@@ -364,89 +537,109 @@ class InteractiveTradingBot:
             else:
                 print("❌ Please enter 'y', 'n', or 'exit'")
 
+    def _order_params(self, symbol, side, order_type, quantity, price=None, stop_price=None):
+        """Order parameters as sent, with quantity and prices rounded to the symbol's filters"""
+        params = {
+            'symbol': symbol,
+            'side': side,
+            'type': order_type,
+            'quantity': self._round_quantity(symbol, quantity)
+        }
+        
+        if order_type == "LIMIT":
+            params['price'] = self._round_price(symbol, price)
+            params['timeInForce'] = 'GTC'
+        elif order_type == "STOP_MARKET":
+            params['stopPrice'] = self._round_price(symbol, stop_price)
+        return params
+
     def place_order(self, symbol, side, order_type, quantity, price=None, stop_price=None):
         """Place the order"""
         try:
-            # Round quantity to proper precision
-            quantity = self._round_quantity(symbol, quantity)
+            params = self._order_params(symbol, side, order_type, quantity, price, stop_price)
+            quantity = params['quantity']
             
-            params = {
-                'symbol': symbol,
-                'side': side,
-                'type': order_type,
-                'quantity': quantity
-            }
-            
-            if order_type == "LIMIT":
-                params['price'] = price
-                params['timeInForce'] = 'GTC'
-            elif order_type == "STOP_MARKET":
-                params['stopPrice'] = stop_price
-            
-            result = self.client.futures_create_order(**params)
+            result = self.sender.submit(params)
+            order = Order.from_raw(result)
             
             print(f"\n✅ Order placed successfully!")
-            print(f"Order ID: {result['orderId']}")
-            print(f"Status: {result['status']}")
-            print(f"Quantity: {result['origQty']} (rounded from {quantity})")
+            print(f"Order ID: {order.order_id}")
+            print(f"Status: {order.status}")
+            print(f"Quantity: {order.quantity} (rounded from {quantity})")
             
             return result
             
         except BinanceAPIException as e:
             print(f"❌ API Error: {e}")
             return None
+        except RiskLimitExceeded as e:
+            print(f"🛑 Blocked by risk limits: {e}")
+            return None
+        except CircuitOpen as e:
+            print(f"🛑 Not sent: {e}")
+            return None
         except Exception as e:
             print(f"❌ Error: {e}")
             return None
 
-    def show_status(self):
+    async def show_status(self):
         """Show account status"""
         try:
-            account = self.client.futures_account()
-            balance = account.get('totalWalletBalance', '0')
-            available = account.get('availableBalance', '0')
+            if self.streams is None or not self.portfolio_loaded:
+                await self.prefetcher.wait('portfolio')
+            if self.portfolio.stale_age is not None:
+                print(f"\n⚠️  Exchange unreachable, showing cached data from {self.portfolio.stale_age:.0f}s ago")
             
-            print(f"\n💰 Balance: {balance} USDT")
-            print(f"💳 Available: {available} USDT")
+            print(f"\n💰 Balance: {self.portfolio.wallet_balance:.8f} USDT")
+            print(f"💳 Available: {self.portfolio.available_balance:.8f} USDT")
             
             # Show positions
-            positions = self.client.futures_position_information()
-            active_positions = [pos for pos in positions if float(pos['positionAmt']) != 0]
+            active_positions = self.portfolio.active_positions()
             
             if active_positions:
                 print("\n📊 Active Positions:")
                 for pos in active_positions:
-                    size = pos['positionAmt']
-                    symbol = pos['symbol']
-                    entry = pos['entryPrice']
-                    pnl = pos['unRealizedProfit']
-                    side = "LONG" if float(size) > 0 else "SHORT"
-                    print(f"   {symbol}: {side} {abs(float(size))} @ ${entry} (PnL: ${pnl})")
+                    print(f"   {pos.symbol}: {pos.side} {abs(pos.amount)} @ ${pos.entry_price} (PnL: ${pos.unrealized_pnl:.8f})")
+                if self.streams is not None:
+                    print("\n💸 Funding:")
+                    for symbol, rate, next_time, projected in self.funding.projections():
+                        at = time.strftime('%H:%M', time.localtime(next_time / 1000))
+                        print(f"   {symbol}: {rate * 100:+.4f}% at {at} -> ${projected:+.8f} "
+                              f"(paid last {self.funding.days}d: ${self.funding.cost(symbol):+.8f})")
+                    print(f"   Projected at next funding: ${self.funding.projected_total:+.8f}")
+                    if self.funding.settled:
+                        print(f"   Booked by the exchange since start: ${self.funding.settled:+.8f}")
             else:
                 print("\n📊 No active positions")
                 
         except Exception as e:
             print(f"❌ Error getting status: {e}")
 
-    def show_orders(self):
+    async def show_orders(self):
         """Show recent orders"""
-        symbol = self.ask_symbol()
+        symbol = await self.ask_symbol()
         try:
-            orders = self.client.futures_get_all_orders(symbol=symbol, limit=10)
+            # Only orders newer than the local history (or still open in it) are fetched
+            await asyncio.get_running_loop().run_in_executor(None, self.history.sync, self.client, symbol)
+            orders = self.history.recent(symbol, 5)
             print(f"\n📋 Recent {symbol} Orders:")
-            for order in orders[-5:]:
-                status_emoji = "✅" if order['status'] == 'FILLED' else "⏳" if order['status'] == 'NEW' else "❌"
-                price = order.get('avgPrice') if order.get('avgPrice') != '0' else order['price']
-                print(f"   {status_emoji} {order['side']} {order['origQty']} @ ${price} [{order['status']}]")
+            for order in orders:
+                status_emoji = "✅" if order.status == 'FILLED' else "⏳" if order.status == 'NEW' else "❌"
+                print(f"   {status_emoji} {order.side} {order.quantity} @ ${order.fill_price} [{order.status}]")
         except Exception as e:
             print(f"❌ Error getting orders: {e}")
 
-    def close_position(self):
+    async def close_position(self):
         """Close position"""
-        symbol = self.ask_symbol()
+        symbol = await self.ask_symbol()
         try:
-            positions = self.client.futures_position_information(symbol=symbol)
-            current_pos = float(positions[0]['positionAmt'])
+            if self.streams is not None:
+                current_pos = self.portfolio.get_position(symbol)
+            else:
+                positions = await self.prefetcher.wait(('position', symbol))
+                if positions is None:
+                    positions = self.client.futures_position_information(symbol=symbol)
+                current_pos = Position.from_raw(positions[0]).amount
             
             if current_pos == 0:
                 print(f"ℹ️  No position to close for {symbol}")
@@ -461,7 +654,7 @@ class InteractiveTradingBot:
                 'Type': 'Market Order'
             }
             
-            if self.confirm_order(order_details):
+            if await self.confirm_order(order_details):
                 result = self.place_order(symbol, side, "MARKET", abs(current_pos))
                 if result:
                     print(f"✅ Closed {symbol} position")
@@ -469,27 +662,36 @@ class InteractiveTradingBot:
         except Exception as e:
             print(f"❌ Error closing position: {e}")
 
-    def run(self):
+    def show_dashboard(self):
+        """Show the live dashboard until Ctrl+C"""
+        if self.streams is None:
+            print("❌ Live dashboard needs the websocket streams, which are unavailable.")
+            return
+        Dashboard(self.prices, self.portfolio, self.open_orders, tracker,
+                  watchlist=self.get_popular_symbols(), funding=self.funding).run()
+
+    async def run(self):
         """Main interactive loop"""
         print("🎉 Welcome to Binance Futures Trading Bot!")
         
         while True:
             try:
                 self.show_menu()
-                choice = input("\nSelect option (1-6): ").strip()
+                self.prefetch()
+                choice = (await ainput("\nSelect option (1-7): ")).strip()
                 
                 if choice == "1" or choice == "2":
                     side = "BUY" if choice == "1" else "SELL"
                     
-                    symbol = self.ask_symbol()
+                    symbol = await self.ask_symbol()
                     if not symbol:
                         continue
                         
-                    order_type = self.ask_order_type()
+                    order_type = await self.ask_order_type()
                     if not order_type:
                         continue
                         
-                    quantity = self.ask_quantity(symbol, side)
+                    quantity = await self.ask_quantity(symbol, side)
                     if not quantity:
                         continue
                     
@@ -497,9 +699,9 @@ class InteractiveTradingBot:
                     stop_price = None
                     
                     if order_type == "LIMIT":
-                        price = self.ask_price(symbol, side)
+                        price = await self.ask_price(symbol, side)
                     elif order_type == "STOP_MARKET":
-                        stop_price = self.ask_stop_price(symbol, side)
+                        stop_price = await self.ask_stop_price(symbol, side)
                     
                     # Prepare order details for confirmation
                     order_details = {
@@ -514,26 +716,33 @@ class InteractiveTradingBot:
                     if stop_price:
                         order_details['Stop Price'] = f"${stop_price:,.2f}"
                     
-                    if self.confirm_order(order_details):
+                    if order_type == "MARKET":
+                        self.check_market_impact(symbol, side, quantity)
+                    
+                    if await self.confirm_order(order_details):
                         self.place_order(symbol, side, order_type, quantity, price, stop_price)
                 
                 elif choice == "3":
-                    self.show_status()
+                    await self.show_status()
                 
                 elif choice == "4":
-                    self.show_orders()
+                    await self.show_orders()
                 
                 elif choice == "5":
-                    self.close_position()
+                    await self.close_position()
                 
                 elif choice == "6":
+                    self.show_dashboard()
+                    continue
+                
+                elif choice == "7":
                     print("👋 Goodbye!")
                     break
                 
                 else:
                     print("❌ Invalid choice. Please try again.")
                 
-                input("\nPress Enter to continue...")
+                await ainput("\nPress Enter to continue...")
                 
             except KeyboardInterrupt:
                 print("\n👋 Goodbye!")
@@ -542,5 +751,23 @@ class InteractiveTradingBot:
                 print(f"❌ Unexpected error: {e}")
 
 if __name__ == "__main__":
-    bot = InteractiveTradingBot(testnet=True)
-    bot.run()
+    parser = argparse.ArgumentParser(description="Interactive Binance Futures trading bot")
+    parser.add_argument("--profile", help="Profile from profiles.json (default: the file's default profile)")
+    parser.add_argument("--profiler", nargs="?", const=profiler.PROFILE_FILE, metavar="FILE",
+                        help=f"Sample the process and time order stages, writing a speedscope file on exit (default: {profiler.PROFILE_FILE})")
+    args = parser.parse_args()
+    if args.profiler:
+        profiler.start(args.profiler, bot_class=InteractiveTradingBot)
+    try:
+        profile = resolve_profile(args.profile)
+    except ProfileError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    bot = InteractiveTradingBot(profile=profile)
+    try:
+        asyncio.run(bot.run())
+    except KeyboardInterrupt:
+        print("\n👋 Goodbye!")
+    finally:
+        if bot.streams:
+            bot.streams.stop()
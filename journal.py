@@ -0,0 +1,248 @@
+"""
+Durable append-only order journal (write-ahead log).
+
+Every order gets a newClientOrderId and an INTENT record that is fsync'ed
+before the order is sent; the exchange's answer is appended afterwards as an
+ACK or FAIL record. fsyncs are group-committed by a background thread, so
+concurrent writers share one disk flush. At startup `recover()` looks up every
+INTENT without an outcome on the exchange by its client order ID.
+
+A journal file belongs to one live process at a time (an exclusive lock on
+`<file>.lock`); a second process on the same path gets the next free slot,
+`orders.2.journal` and so on, so recovery never touches another live
+process's in-flight orders.
+
+Record layout (little endian): length u32 | crc32 u32 | type u8 | time f64 | JSON body
+"""
+
+import atexit
+import itertools
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:         # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = "orders.journal"
+
+INTENT = 1
+ACK = 2
+FAIL = 3
+
+HEADER = struct.Struct("<IIBd")
+COMMIT_INTERVAL = 0.002
+MAX_SLOTS = 16
+
+# Exchange errors that leave the order's fate unknown (timeout / unexpected response)
+UNKNOWN_STATUS_CODES = (-1006, -1007)
+
+
+def is_ambiguous(error):
+    """True when an order error does not prove the order was rejected"""
+    code = getattr(error, "code", None)
+    return code is None or code in UNKNOWN_STATUS_CODES
+
+
+def _try_lock(f):
+    """Take an exclusive lock on an open file without waiting; False if another process holds it"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _slot_path(path, slot):
+    if slot == 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{slot}{ext}"
+
+
+class OrderJournal:
+    def __init__(self, path=JOURNAL_FILE, commit_interval=COMMIT_INTERVAL):
+        self.path, self._owner = self._claim(path)
+        self.commit_interval = commit_interval
+        # Time plus random bits: processes started in the same second still get distinct IDs
+        self.prefix = f"bot{int(time.time()):x}{os.urandom(3).hex()}"
+        self._counter = itertools.count(1)
+        self._truncate_torn_tail()
+        self._file = open(self.path, "ab")
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._written = 0
+        self._synced = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._commit_loop, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @staticmethod
+    def _claim(path):
+        """Lock the first journal slot no live process owns; returns (path, lock file)"""
+        for slot in range(1, MAX_SLOTS + 1):
+            candidate = _slot_path(path, slot)
+            owner = open(candidate + ".lock", "a+b")
+            if _try_lock(owner):
+                if slot > 1:
+                    logger.info(f"Journal {path} is in use by another process, using {candidate}")
+                return candidate, owner
+            owner.close()
+        raise RuntimeError(f"All {MAX_SLOTS} journal slots of {path} are in use")
+
+    def new_client_order_id(self):
+        """Return a unique newClientOrderId for this session"""
+        return f"{self.prefix}-{next(self._counter)}"
+
+    def append(self, record_type, body, sync=False):
+        """Append one record; with sync=True wait until it is on disk"""
+        payload = json.dumps(body, separators=(",", ":")).encode()
+        ts = time.time()
+        crc = zlib.crc32(HEADER.pack(0, 0, record_type, ts)[8:] + payload)
+        frame = HEADER.pack(len(payload), crc, record_type, ts) + payload
+        with self._cond:
+            self._file.write(frame)
+            self._written += 1
+            seq = self._written
+            self._cond.notify_all()
+            if sync:
+                while self._synced < seq and not self._closed:
+                    self._cond.wait()
+        return seq
+
+    def _commit_loop(self):
+        while True:
+            with self._cond:
+                while self._synced == self._written and not self._closed:
+                    self._cond.wait()
+                if self._closed and self._synced == self._written:
+                    return
+            # Let concurrent writers pile into the same fsync
+            time.sleep(self.commit_interval)
+            with self._cond:
+                target = self._written
+                self._file.flush()
+            # Writers keep appending while the disk syncs; their records wait for the next round
+            os.fsync(self._file.fileno())
+            with self._cond:
+                self._synced = target
+                self._cond.notify_all()
+
+    def close(self):
+        if self._file.closed:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._owner.close()
+
+    def submit(self, client, params, record_failure=True):
+        """Journal and send one order through client.futures_create_order
+
+        record_failure=False leaves the intent pending even on a definite
+        rejection, for resends whose earlier attempt may still be live.
+        """
+        params = dict(params)
+        params.setdefault("newClientOrderId", self.new_client_order_id())
+        cid = params["newClientOrderId"]
+        self.append(INTENT, params, sync=True)
+        try:
+            response = client.futures_create_order(**params)
+        except Exception as e:
+            # Timeouts and connection errors stay pending so recover() can look them up
+            if record_failure and not is_ambiguous(e):
+                self.append(FAIL, {"newClientOrderId": cid, "error": str(e)})
+            raise
+        self.append(ACK, {
+            "newClientOrderId": cid,
+            "orderId": response.get("orderId"),
+            "status": response.get("status"),
+        })
+        return response
+
+    def _truncate_torn_tail(self):
+        """Cut off a record left half-written by a crash so new records stay readable"""
+        if not os.path.exists(self.path):
+            return
+        valid = 0
+        for _, _, _, end in self._scan(self.path):
+            valid = end
+        if valid < os.path.getsize(self.path):
+            logger.warning(f"Journal {self.path}: truncating torn record at offset {valid}")
+            with open(self.path, "r+b") as f:
+                f.truncate(valid)
+
+    @staticmethod
+    def _scan(path):
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    return
+                length, crc, record_type, ts = HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(header[8:] + payload) != crc:
+                    return
+                yield record_type, ts, payload, f.tell()
+
+    @classmethod
+    def read(cls, path=JOURNAL_FILE):
+        """Yield (type, time, body) for every intact record"""
+        if not os.path.exists(path):
+            return
+        for record_type, ts, payload, _ in cls._scan(path):
+            yield record_type, ts, json.loads(payload)
+
+    def pending(self):
+        """Return the INTENT bodies that have no ACK/FAIL yet"""
+        with self._lock:
+            self._file.flush()
+        intents = {}
+        for record_type, ts, body in self.read(self.path):
+            cid = body.get("newClientOrderId")
+            if record_type == INTENT:
+                intents[cid] = body
+            else:
+                intents.pop(cid, None)
+        return list(intents.values())
+
+    def recover(self, client):
+        """Reconcile unresolved orders with the exchange; returns [(intent, order or None)]"""
+        results = []
+        for intent in self.pending():
+            cid = intent["newClientOrderId"]
+            try:
+                order = client.futures_get_order(symbol=intent["symbol"], origClientOrderId=cid)
+            except Exception as e:
+                # -2013 "Order does not exist": the order never reached the exchange
+                if getattr(e, "code", None) != -2013:
+                    logger.error(f"Recovery lookup failed for {cid}: {e}")
+                    continue
+                order = None
+            if order:
+                self.append(ACK, {"newClientOrderId": cid, "orderId": order["orderId"],
+                                  "status": order["status"], "recovered": True})
+                logger.info(f"Recovered order {cid}: exchange has it as {order['orderId']} [{order['status']}]")
+            else:
+                self.append(FAIL, {"newClientOrderId": cid, "error": "not found on exchange", "recovered": True})
+                logger.warning(f"Recovered order {cid}: never reached the exchange, safe to resend")
+            results.append((intent, order))
+        return results
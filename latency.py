@@ -0,0 +1,77 @@
+"""
+Rolling latency statistics for exchange calls.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+WINDOW = 1000
+
+
+class LatencyTracker:
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+        self.limits = {}            # call name -> SLO in seconds, checked by record()
+        self.on_breach = None       # callback(name, seconds, limit)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        """Record one latency sample (in seconds) for a call name"""
+        with self._lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self.counts[name] = self.counts.get(name, 0) + 1
+        limit = self.limits.get(name)
+        if limit is not None and seconds > limit and self.on_breach is not None:
+            self.on_breach(name, seconds, limit)
+
+    def watch(self, limits, callback):
+        """Call callback(name, seconds, limit) for every sample over its SLO ({name: seconds})"""
+        self.limits = dict(limits)
+        self.on_breach = callback
+
+    @contextmanager
+    def measure(self, name):
+        """Time the body of a with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def percentile(self, name, pct):
+        """Return the pct-th percentile (0-100) for a call name, or None"""
+        with self._lock:
+            samples = sorted(self.samples.get(name, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+    def summary(self):
+        """Return {name: (count, p50, p99, max)} with latencies in seconds"""
+        with self._lock:
+            names = list(self.samples)
+        result = {}
+        for name in names:
+            with self._lock:
+                samples = sorted(self.samples[name])
+                count = self.counts[name]
+            if samples:
+                result[name] = (
+                    count,
+                    samples[(len(samples) - 1) // 2],
+                    samples[min(len(samples) - 1, int(round(0.99 * (len(samples) - 1))))],
+                    samples[-1],
+                )
+        return result
+
+
+# Shared tracker used by the bots
+tracker = LatencyTracker()
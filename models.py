@@ -0,0 +1,175 @@
+"""
+Slotted domain objects parsed once from exchange payloads.
+
+python-binance returns raw JSON dicts with every number as a string, so
+code that reads a field twice parses it twice (float(pos['positionAmt'])
+in every position loop). These classes convert each field once at the
+boundary and keep it in __slots__, which also keeps long order and
+position lists compact. loads() uses orjson when it is installed.
+"""
+
+import json
+
+try:
+    from orjson import loads
+except ImportError:
+    loads = json.loads
+
+
+def _float(value):
+    return float(value) if value else 0.0
+
+
+class SymbolSpec:
+    """Trading rules of one symbol; tick_size/step_size stay exact strings for precision.py"""
+
+    __slots__ = ("symbol", "status", "base_asset", "quote_asset", "tick_size", "step_size",
+                 "min_price", "max_price", "min_qty", "max_qty", "min_notional")
+
+    def __init__(self, symbol, status="TRADING", base_asset="", quote_asset="", tick_size=None, step_size=None,
+                 min_price=0.0, max_price=0.0, min_qty=0.0, max_qty=0.0, min_notional=0.0):
+        self.symbol = symbol
+        self.status = status
+        self.base_asset = base_asset
+        self.quote_asset = quote_asset
+        self.tick_size = tick_size
+        self.step_size = step_size
+        self.min_price = min_price
+        self.max_price = max_price
+        self.min_qty = min_qty
+        self.max_qty = max_qty
+        self.min_notional = min_notional
+
+    @classmethod
+    def from_raw(cls, raw):
+        """Build from one exchangeInfo 'symbols' entry"""
+        spec = cls(raw['symbol'], raw.get('status', 'TRADING'), raw.get('baseAsset', ''), raw.get('quoteAsset', ''))
+        for f in raw.get('filters', ()):
+            kind = f['filterType']
+            if kind == 'PRICE_FILTER':
+                spec.tick_size = f['tickSize']
+                spec.min_price = _float(f.get('minPrice'))
+                spec.max_price = _float(f.get('maxPrice'))
+            elif kind == 'LOT_SIZE':
+                spec.step_size = f['stepSize']
+                spec.min_qty = _float(f.get('minQty'))
+                spec.max_qty = _float(f.get('maxQty'))
+            elif kind == 'MIN_NOTIONAL':
+                spec.min_notional = _float(f.get('notional') or f.get('minNotional'))
+        return spec
+
+    @staticmethod
+    def index(exchange_info):
+        """{symbol: SymbolSpec} for every symbol in an exchangeInfo response"""
+        return {raw['symbol']: SymbolSpec.from_raw(raw) for raw in exchange_info['symbols']}
+
+
+class Order:
+    __slots__ = ("order_id", "client_order_id", "symbol", "side", "type", "status", "price", "avg_price",
+                 "stop_price", "quantity", "filled", "reduce_only", "update_time", "time")
+
+    def __init__(self, order_id, client_order_id, symbol, side, type, status, price=0.0, avg_price=0.0,
+                 stop_price=0.0, quantity=0.0, filled=0.0, reduce_only=False, update_time=0, time=0):
+        self.order_id = order_id
+        self.client_order_id = client_order_id
+        self.symbol = symbol
+        self.side = side
+        self.type = type
+        self.status = status
+        self.price = price
+        self.avg_price = avg_price
+        self.stop_price = stop_price
+        self.quantity = quantity
+        self.filled = filled
+        self.reduce_only = reduce_only
+        self.update_time = update_time
+        self.time = time or update_time
+
+    @classmethod
+    def from_raw(cls, raw):
+        """Build from a REST order (create/query/open orders/all orders)"""
+        return cls(raw.get('orderId'), raw.get('clientOrderId'), raw.get('symbol'), raw.get('side'),
+                   raw.get('type'), raw.get('status'), _float(raw.get('price')), _float(raw.get('avgPrice')),
+                   _float(raw.get('stopPrice')), _float(raw.get('origQty')), _float(raw.get('executedQty')),
+                   bool(raw.get('reduceOnly')), raw.get('updateTime') or raw.get('time') or 0, raw.get('time') or 0)
+
+    @classmethod
+    def from_event(cls, o):
+        """Build from the 'o' object of an ORDER_TRADE_UPDATE event"""
+        return cls(o['i'], o['c'], o['s'], o['S'], o['o'], o['X'], _float(o.get('p')), _float(o.get('ap')),
+                   _float(o.get('sp')), _float(o.get('q')), _float(o.get('z')), bool(o.get('R')), o.get('T', 0))
+
+    @property
+    def fill_price(self):
+        """Average fill price, or the limit price while nothing has filled"""
+        return self.avg_price or self.price
+
+
+class Fill:
+    __slots__ = ("symbol", "order_id", "trade_id", "side", "price", "quantity", "commission",
+                 "commission_asset", "realized_pnl", "time", "maker")
+
+    def __init__(self, symbol, order_id, trade_id, side, price, quantity, commission=0.0,
+                 commission_asset="USDT", realized_pnl=0.0, time=0, maker=False):
+        self.symbol = symbol
+        self.order_id = order_id
+        self.trade_id = trade_id
+        self.side = side
+        self.price = price
+        self.quantity = quantity
+        self.commission = commission
+        self.commission_asset = commission_asset
+        self.realized_pnl = realized_pnl
+        self.time = time
+        self.maker = maker
+
+    @classmethod
+    def from_raw(cls, raw):
+        """Build from a futures_account_trades entry"""
+        return cls(raw['symbol'], raw['orderId'], raw['id'], raw['side'], float(raw['price']), float(raw['qty']),
+                   _float(raw.get('commission')), raw.get('commissionAsset', 'USDT'),
+                   _float(raw.get('realizedPnl')), raw.get('time', 0), bool(raw.get('maker')))
+
+    @classmethod
+    def from_event(cls, o):
+        """Build from the 'o' object of an ORDER_TRADE_UPDATE event with execution type TRADE"""
+        return cls(o['s'], o['i'], o.get('t'), o['S'], float(o['L']), float(o['l']), _float(o.get('n')),
+                   o.get('N') or 'USDT', _float(o.get('rp')), o.get('T', 0), bool(o.get('m')))
+
+    @property
+    def notional(self):
+        return self.price * self.quantity
+
+
+class Position:
+    __slots__ = ("symbol", "amount", "entry_price", "mark_price", "realized_pnl", "leverage", "position_side")
+
+    def __init__(self, symbol, amount=0.0, entry_price=0.0, mark_price=0.0, leverage=1, position_side="BOTH"):
+        self.symbol = symbol
+        self.amount = amount
+        self.entry_price = entry_price
+        self.mark_price = mark_price
+        self.realized_pnl = 0.0
+        self.leverage = leverage
+        self.position_side = position_side     # BOTH in one-way mode, LONG or SHORT in hedge mode
+
+    @classmethod
+    def from_raw(cls, raw):
+        """Build from a futures_position_information entry"""
+        return cls(raw['symbol'], float(raw['positionAmt']), _float(raw.get('entryPrice')),
+                   _float(raw.get('markPrice')), int(raw.get('leverage', 1) or 1),
+                   raw.get('positionSide') or "BOTH")
+
+    @property
+    def side(self):
+        return "LONG" if self.amount > 0 else "SHORT"
+
+    @property
+    def unrealized_pnl(self):
+        if not self.amount or not self.mark_price:
+            return 0.0
+        return (self.mark_price - self.entry_price) * self.amount
+
+    @property
+    def margin(self):
+        return abs(self.amount) * (self.mark_price or self.entry_price) / (self.leverage or 1)
@@ -0,0 +1,242 @@
+"""
+Local L2 order books maintained from a depth snapshot plus the diff stream.
+
+Follows Binance's futures procedure: buffer <symbol>@depth@100ms events,
+fetch a REST snapshot, drop events older than its lastUpdateId, then apply
+diffs checking that each event's `pu` equals the previous event's `u`. A gap
+triggers a resync from a fresh snapshot.
+
+Levels are kept in sorted parallel lists (bisect), so best bid/ask are O(1)
+and depth / slippage estimates walk only the levels they need.
+"""
+
+import bisect
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_LIMIT = 1000
+DEPTH_STREAM = "{}@depth@100ms"
+SNAPSHOT_RETRY = 1.0
+SNAPSHOT_RETRY_MAX = 30.0
+
+
+class BookSide:
+    """Price levels in ascending price order"""
+
+    def __init__(self):
+        self.prices = []
+        self.qtys = []
+
+    def load(self, levels):
+        levels = sorted((float(p), float(q)) for p, q in levels if float(q) > 0)
+        self.prices = [p for p, _ in levels]
+        self.qtys = [q for _, q in levels]
+
+    def update(self, price, qty):
+        i = bisect.bisect_left(self.prices, price)
+        found = i < len(self.prices) and self.prices[i] == price
+        if qty == 0:
+            if found:
+                del self.prices[i]
+                del self.qtys[i]
+        elif found:
+            self.qtys[i] = qty
+        else:
+            self.prices.insert(i, price)
+            self.qtys.insert(i, qty)
+
+    def qty_at(self, price):
+        i = bisect.bisect_left(self.prices, price)
+        if i < len(self.prices) and self.prices[i] == price:
+            return self.qtys[i]
+        return 0.0
+
+
+class OrderBook:
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.bids = BookSide()
+        self.asks = BookSide()
+        self.last_update_id = None
+        self.synced = False
+        self._lock = threading.Lock()
+
+    def apply_snapshot(self, snapshot):
+        with self._lock:
+            self.bids.load(snapshot['bids'])
+            self.asks.load(snapshot['asks'])
+            self.last_update_id = snapshot['lastUpdateId']
+            self.synced = False
+
+    def apply_diff(self, event):
+        """Apply one depthUpdate; returns False when a sequence gap requires a resync"""
+        with self._lock:
+            if self.last_update_id is None or event['u'] < self.last_update_id:
+                return True
+            if not self.synced:
+                if event['U'] > self.last_update_id:
+                    return False
+                self.synced = True
+            elif event['pu'] != self.last_update_id:
+                return False
+            for price, qty in event['b']:
+                self.bids.update(float(price), float(qty))
+            for price, qty in event['a']:
+                self.asks.update(float(price), float(qty))
+            self.last_update_id = event['u']
+            return True
+
+    def best_bid(self):
+        return self.bids.prices[-1] if self.bids.prices else None
+
+    def best_ask(self):
+        return self.asks.prices[0] if self.asks.prices else None
+
+    def mid(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def spread(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def depth_at(self, price):
+        """Resting quantity at an exact price level (bid or ask side)"""
+        with self._lock:
+            return self.bids.qty_at(price) or self.asks.qty_at(price)
+
+    def depth_within(self, side, pct):
+        """Quantity resting within pct% of the best price on one side ('BUY' = bids)"""
+        with self._lock:
+            if side.upper() == "BUY":
+                if not self.bids.prices:
+                    return 0.0
+                limit = self.bids.prices[-1] * (1 - pct / 100)
+                i = bisect.bisect_left(self.bids.prices, limit)
+                return sum(self.bids.qtys[i:])
+            if not self.asks.prices:
+                return 0.0
+            limit = self.asks.prices[0] * (1 + pct / 100)
+            i = bisect.bisect_right(self.asks.prices, limit)
+            return sum(self.asks.qtys[:i])
+
+    def estimate_fill(self, side, quantity):
+        """Walk the book for a market order of `quantity`.
+
+        Returns (avg_price, worst_price, slippage_bps vs mid, filled_qty) or None if the book is empty.
+        """
+        with self._lock:
+            if side.upper() == "BUY":
+                levels = zip(self.asks.prices, self.asks.qtys)
+            else:
+                levels = zip(reversed(self.bids.prices), reversed(self.bids.qtys))
+            remaining, cost, worst = quantity, 0.0, None
+            for price, qty in levels:
+                take = min(remaining, qty)
+                cost += take * price
+                remaining -= take
+                worst = price
+                if remaining <= 0:
+                    break
+            mid = self.mid()
+        filled = quantity - max(remaining, 0.0)
+        if not filled or mid is None:
+            return None
+        avg = cost / filled
+        slippage = (avg - mid) / mid * 10000 * (1 if side.upper() == "BUY" else -1)
+        return avg, worst, slippage, filled
+
+
+class DepthCache:
+    """Keeps an OrderBook per subscribed symbol in sync with the depth streams"""
+
+    def __init__(self, client, hub, background=True):
+        self.client = client
+        self.hub = hub
+        self.background = background    # False: snapshots load on the caller's thread (replay)
+        self.books = {}
+        self.buffers = {}
+        self._lock = threading.Lock()
+        hub.on('depthUpdate', self.on_depth)
+
+    def subscribe(self, symbol):
+        """Start maintaining the book for symbol (snapshot is fetched in the background unless background=False)"""
+        with self._lock:
+            if symbol in self.books:
+                return self.books[symbol]
+            book = self.books[symbol] = OrderBook(symbol)
+            self.buffers[symbol] = []
+        self.hub.add_streams([DEPTH_STREAM.format(symbol.lower())])
+        self._resync(symbol)
+        return book
+
+    def get(self, symbol):
+        """Return the synced book for symbol, or None"""
+        book = self.books.get(symbol)
+        return book if book is not None and book.synced else None
+
+    def _resync(self, symbol):
+        if not self.background:
+            self._load_snapshot(symbol)
+            return
+        threading.Thread(target=self._load_snapshot, args=(symbol,), daemon=True).start()
+
+    def _load_snapshot(self, symbol):
+        delay = SNAPSHOT_RETRY
+        while True:
+            try:
+                snapshot = self.client.futures_order_book(symbol=symbol, limit=SNAPSHOT_LIMIT)
+                break
+            except Exception as e:
+                if not self.background:
+                    logger.error(f"Depth snapshot for {symbol} failed: {e}")
+                    with self._lock:
+                        self.books.pop(symbol, None)
+                        self.buffers.pop(symbol, None)
+                    return
+                # The depth stream stays subscribed, so keep the book and try again
+                logger.error(f"Depth snapshot for {symbol} failed, retrying in {delay:.0f}s: {e}")
+                with self._lock:
+                    self.buffers[symbol] = []  # all older than the next snapshot
+            time.sleep(delay)
+            delay = min(delay * 2, SNAPSHOT_RETRY_MAX)
+        book = self.books[symbol]
+        book.apply_snapshot(snapshot)
+        # Replay what arrived meanwhile; live events keep buffering until the replay catches up
+        while True:
+            with self._lock:
+                buffered = self.buffers[symbol]
+                if not buffered:
+                    self.buffers[symbol] = None
+                    return
+                self.buffers[symbol] = []
+            for event in buffered:
+                if not book.apply_diff(event):
+                    self._gap(symbol)
+                    return
+
+    def _gap(self, symbol):
+        logger.warning(f"Depth sequence gap for {symbol}, resyncing")
+        self.books[symbol].synced = False
+        with self._lock:
+            self.buffers[symbol] = []
+        self._resync(symbol)
+
+    def on_depth(self, event):
+        symbol = event['s']
+        with self._lock:
+            if symbol not in self.books:
+                return
+            buffer = self.buffers.get(symbol)
+            if buffer is not None:
+                buffer.append(event)
+                return
+        if not self.books[symbol].apply_diff(event):
+            self._gap(symbol)
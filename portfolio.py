@@ -0,0 +1,235 @@
+"""
+In-memory portfolio / PnL engine.
+
+Positions, entry prices, realized/unrealized PnL and margin usage are kept
+up to date incrementally from fills (ORDER_TRADE_UPDATE), account snapshots
+(ACCOUNT_UPDATE) and mark-price ticks, so reading the account status is a
+local lookup instead of two REST calls.
+
+ACCOUNT_UPDATE carries the absolute position and wallet balance and is the
+source of truth for them. A fill moves the position only when no snapshot
+at or after its transaction time has been applied yet (the exchange usually
+sends the snapshot first); otherwise it only books realized PnL and fees.
+Positions are keyed by (symbol, position side) so hedge-mode LONG and SHORT
+legs stay apart.
+"""
+
+import collections
+import logging
+import threading
+
+from guard import stale_age
+from models import Fill, Position
+
+logger = logging.getLogger(__name__)
+
+MARK_PRICE_STREAM = "!markPrice@arr@1s"
+SEEN_TRADES = 10000         # trade IDs remembered to drop duplicate fill events
+POSITION_SIDES = ("BOTH", "LONG", "SHORT")
+
+
+class Portfolio:
+    def __init__(self, wallet_balance=0.0):
+        self.wallet_balance = wallet_balance
+        self.realized_pnl = 0.0
+        self.fees = 0.0
+        self.other_fees = {}        # commissions paid in assets other than USDT (e.g. BNB), by asset
+        self.unrealized_pnl = 0.0
+        self.margin_used = 0.0
+        self.positions = {}         # (symbol, position side) -> Position
+        self.active = set()
+        self.leverage = {}          # symbol -> leverage from the account config
+        self._synced_at = {}        # (symbol, position side) or 'USDT' -> time of the last ACCOUNT_UPDATE applied
+        self._seen_trades = set()
+        self._seen_order = collections.deque()
+        self.version = 0
+        self.stale_age = None       # seconds, when the last load was served from cache during an outage
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_client(cls, client):
+        """Build a portfolio from one bulk account + position snapshot"""
+        portfolio = cls()
+        portfolio.load(client)
+        return portfolio
+
+    def load(self, client):
+        """(Re)load balances and positions from the REST API"""
+        account = client.futures_account()
+        positions = client.futures_position_information()
+        ages = [age for age in (stale_age(account), stale_age(positions)) if age is not None]
+        with self._lock:
+            self.stale_age = max(ages) if ages else None
+            self.wallet_balance = float(account.get('totalWalletBalance', 0))
+            self.positions = {}
+            self.active = set()
+            self._synced_at = {}
+            self.unrealized_pnl = 0.0
+            self.margin_used = 0.0
+            for raw in positions:
+                pos = Position.from_raw(raw)
+                if 'leverage' in raw:
+                    self.leverage[pos.symbol] = pos.leverage
+                if pos.amount == 0:
+                    continue
+                self.positions[pos.symbol, pos.position_side] = pos
+                self._update_totals(pos, 0.0, 0.0)
+        logger.info(f"Portfolio loaded: {len(self.active)} active positions")
+
+    def attach(self, hub):
+        """Keep the portfolio current from a StreamHub"""
+        hub.on('ORDER_TRADE_UPDATE', self.on_order_update)
+        hub.on('ACCOUNT_UPDATE', self.on_account_update)
+        hub.on('ACCOUNT_CONFIG_UPDATE', self.on_config_update)
+        hub.on('markPriceUpdate', self.on_mark_price)
+        hub.add_streams([MARK_PRICE_STREAM])
+
+    def _position(self, symbol, position_side="BOTH"):
+        pos = self.positions.get((symbol, position_side))
+        if pos is None:
+            pos = Position(symbol, leverage=self.leverage.get(symbol, 1), position_side=position_side)
+            self.positions[symbol, position_side] = pos
+        return pos
+
+    def _update_totals(self, pos, old_upnl, old_margin):
+        self.unrealized_pnl += pos.unrealized_pnl - old_upnl
+        self.margin_used += pos.margin - old_margin
+        self.version += 1
+        key = (pos.symbol, pos.position_side)
+        if pos.amount:
+            self.active.add(key)
+        else:
+            self.active.discard(key)
+            if not self.active:
+                # Drop accumulated float drift once everything is flat
+                self.unrealized_pnl = 0.0
+                self.margin_used = 0.0
+
+    def apply_fill(self, symbol, side, quantity, price, commission=0.0, position_side="BOTH"):
+        """Apply one fill and return the PnL it realized"""
+        with self._lock:
+            return self._apply_fill(symbol, side, quantity, price, commission, position_side)
+
+    def _apply_fill(self, symbol, side, quantity, price, commission, position_side):
+        signed = quantity if side.upper() == "BUY" else -quantity
+        pos = self._position(symbol, position_side)
+        old_upnl, old_margin = pos.unrealized_pnl, pos.margin
+        amount = pos.amount
+        new_amount = round(amount + signed, 10)
+        realized = 0.0
+        if amount == 0 or (amount > 0) == (signed > 0):
+            pos.entry_price = (pos.entry_price * abs(amount) + price * abs(signed)) / abs(new_amount)
+        else:
+            closed = min(abs(amount), abs(signed))
+            realized = (price - pos.entry_price) * closed * (1 if amount > 0 else -1)
+            if new_amount == 0:
+                pos.entry_price = 0.0
+            elif (new_amount > 0) != (amount > 0):
+                pos.entry_price = price
+        pos.amount = new_amount
+        if not pos.mark_price:
+            pos.mark_price = price
+        pos.realized_pnl += realized
+        self.realized_pnl += realized
+        self.fees += commission
+        self.wallet_balance += realized - commission
+        self._update_totals(pos, old_upnl, old_margin)
+        return realized
+
+    def _legs(self, symbol):
+        for position_side in POSITION_SIDES:
+            pos = self.positions.get((symbol, position_side))
+            if pos is not None:
+                yield pos
+
+    def update_mark_price(self, symbol, mark_price):
+        """Revalue a symbol's positions at a new mark price"""
+        with self._lock:
+            for pos in self._legs(symbol):
+                old_upnl, old_margin = pos.unrealized_pnl, pos.margin
+                pos.mark_price = mark_price
+                self._update_totals(pos, old_upnl, old_margin)
+
+    def set_leverage(self, symbol, leverage):
+        with self._lock:
+            self.leverage[symbol] = leverage
+            for pos in self._legs(symbol):
+                old_upnl, old_margin = pos.unrealized_pnl, pos.margin
+                pos.leverage = leverage
+                self._update_totals(pos, old_upnl, old_margin)
+
+    def on_order_update(self, event):
+        """Handle ORDER_TRADE_UPDATE events from the user data stream"""
+        order = event['o']
+        if order.get('x') != 'TRADE':
+            return
+        trade_key = (order['s'], order.get('t'))
+        with self._lock:
+            if trade_key in self._seen_trades:
+                return
+            self._seen_trades.add(trade_key)
+            self._seen_order.append(trade_key)
+            if len(self._seen_order) > SEEN_TRADES:
+                self._seen_trades.discard(self._seen_order.popleft())
+        fill = Fill.from_event(order)
+        position_side = order.get('ps') or "BOTH"
+        when = event.get('T') or fill.time
+        commission = 0.0
+        with self._lock:
+            if fill.commission_asset == 'USDT':
+                commission = fill.commission
+            elif fill.commission:
+                # Paid from another balance (BNB fee discount): not part of the USDT wallet
+                self.other_fees[fill.commission_asset] = self.other_fees.get(fill.commission_asset, 0.0) + fill.commission
+            if when > self._synced_at.get((fill.symbol, position_side), -1):
+                self._apply_fill(fill.symbol, fill.side, fill.quantity, fill.price, commission, position_side)
+                return
+            # The ACCOUNT_UPDATE for this fill is already in: the position (and wallet) include it
+            pos = self._position(fill.symbol, position_side)
+            pos.realized_pnl += fill.realized_pnl
+            self.realized_pnl += fill.realized_pnl
+            self.fees += commission
+            if when > self._synced_at.get('USDT', -1):
+                self.wallet_balance += fill.realized_pnl - commission
+            self.version += 1
+
+    def on_account_update(self, event):
+        """Reconcile with the exchange's ACCOUNT_UPDATE snapshot"""
+        data = event['a']
+        when = event.get('T', 0)
+        with self._lock:
+            for balance in data.get('B', ()):
+                if balance['a'] == 'USDT':
+                    self.wallet_balance = float(balance['wb'])
+                    self._synced_at['USDT'] = when
+                    self.version += 1
+            for raw in data.get('P', ()):
+                pos = self._position(raw['s'], raw.get('ps') or "BOTH")
+                old_upnl, old_margin = pos.unrealized_pnl, pos.margin
+                pos.amount = float(raw['pa'])
+                pos.entry_price = float(raw['ep'])
+                self._synced_at[raw['s'], pos.position_side] = when
+                self._update_totals(pos, old_upnl, old_margin)
+
+    def on_config_update(self, event):
+        config = event.get('ac')
+        if config:
+            self.set_leverage(config['s'], int(config['l']))
+
+    def on_mark_price(self, event):
+        self.update_mark_price(event['s'], float(event['p']))
+
+    @property
+    def available_balance(self):
+        """Estimated available balance (wallet + unrealized PnL - position margin)"""
+        return self.wallet_balance + self.unrealized_pnl - self.margin_used
+
+    def active_positions(self):
+        """Return the open positions"""
+        with self._lock:
+            return [self.positions[key] for key in sorted(self.active)]
+
+    def get_position(self, symbol):
+        """Net position amount across the symbol's position sides"""
+        with self._lock:
+            return sum(pos.amount for pos in self._legs(symbol))
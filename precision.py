@@ -0,0 +1,43 @@
+"""
+Exact rounding of quantities and prices to exchange step / tick sizes.
+
+Values are rounded through Decimal(str(value)), the shortest decimal that
+round-trips to the float, so 0.3 is treated as 0.3 rather than
+0.29999999999999998889... Plain float arithmetic gets both of these wrong:
+0.3 // 0.1 == 2.0, and round(x, 2) cuts anything with a finer tick.
+"""
+
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_EVEN
+
+_steps = {}
+
+
+def _step(step):
+    key = str(step)
+    value = _steps.get(key)
+    if value is None:
+        value = _steps[key] = Decimal(key)
+    return value
+
+
+def _to_step(value, step, rounding):
+    step = _step(step)
+    if not step:
+        return float(value)
+    units = (Decimal(str(value)) / step).to_integral_value(rounding)
+    return float(units * step)
+
+
+def floor_step(value, step):
+    """Round value down to a multiple of step"""
+    return _to_step(value, step, ROUND_FLOOR)
+
+
+def ceil_step(value, step):
+    """Round value up to a multiple of step"""
+    return _to_step(value, step, ROUND_CEILING)
+
+
+def round_step(value, step):
+    """Round value to the nearest multiple of step (ties to even)"""
+    return _to_step(value, step, ROUND_HALF_EVEN)
@@ -0,0 +1,119 @@
+"""
+Asyncio helpers for the interactive CLI: non-blocking input and background
+prefetching of exchange data while the user is typing.
+"""
+
+import asyncio
+import collections
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 2.0
+
+
+class StdinReader:
+    """One daemon thread reading stdin for every prompt; a line nobody is waiting for is kept for the next one"""
+
+    def __init__(self):
+        self.lines = collections.deque()    # (line, exception) read while no prompt was waiting
+        self.waiter = None                  # (loop, future) of the pending prompt
+        self.closed = None                  # EOF/Ctrl+C, raised by every later prompt
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def read(self, loop):
+        """Future for the next line"""
+        future = loop.create_future()
+        with self._lock:
+            if self.lines:
+                _deliver(future, self.lines.popleft())
+            elif self.closed is not None:
+                _deliver(future, (None, self.closed))
+            else:
+                self.waiter = (loop, future)
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="stdin", daemon=True)
+                    self._thread.start()
+        return future
+
+    def _run(self):
+        while self.closed is None:
+            try:
+                item = (input(), None)
+            except BaseException as e:
+                item = (None, e)
+            with self._lock:
+                if item[1] is not None:
+                    self.closed = item[1]
+                waiter, self.waiter = self.waiter, None
+                if waiter is None or waiter[1].done():
+                    self.lines.append(item)
+                    continue
+            waiter[0].call_soon_threadsafe(self._hand_over, waiter[1], item)
+
+    def _hand_over(self, future, item):
+        if future.done():
+            # The prompt was cancelled meanwhile: keep the line for the next one
+            with self._lock:
+                self.lines.appendleft(item)
+            return
+        _deliver(future, item)
+
+
+def _deliver(future, item):
+    line, exc = item
+    if exc is None:
+        future.set_result(line)
+    else:
+        # EOF/Ctrl+C on the reader thread ends the session like a blocking input() would
+        future.set_exception(KeyboardInterrupt() if isinstance(exc, (KeyboardInterrupt, EOFError)) else exc)
+
+
+_stdin = StdinReader()
+
+
+async def ainput(prompt=""):
+    """Async input(): stdin is read on a long-lived daemon thread so the event loop keeps running"""
+    if prompt:
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+    return await _stdin.read(asyncio.get_running_loop())
+
+
+class Prefetcher:
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self.tasks = {}
+        self.finished = {}
+
+    def schedule(self, key, fn, *args):
+        """Run fn(*args) in the background unless it is already running or still fresh"""
+        task = self.tasks.get(key)
+        if task is not None and not task.done():
+            return task
+        if key in self.finished and time.monotonic() - self.finished[key] < self.ttl:
+            return task
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(None, fn, *args)
+        task.add_done_callback(lambda t, key=key: self._done(key, t))
+        self.tasks[key] = task
+        return task
+
+    def _done(self, key, task):
+        self.finished[key] = time.monotonic()
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Prefetch {key} failed: {task.exception()}")
+
+    async def wait(self, key):
+        """Wait for a scheduled prefetch (if any) and return its result, or None on failure"""
+        task = self.tasks.get(key)
+        if task is None:
+            return None
+        try:
+            return await task
+        except Exception:
+            return None
@@ -0,0 +1,219 @@
+"""
+Sampling profiler and per-stage order timers for a bot session.
+
+Nothing is wrapped or sampled until start() is called (the --profiler
+option of bot.py, trade.py and interactive_trade.py), so a normal run pays
+nothing. Once started, a daemon thread samples every thread's stack each
+INTERVAL and the stages of the order path are timed by wrapping them in
+place:
+
+  construct  quantity/price rounding and order params in the bot
+  risk       the pre-trade risk check
+  journal    writing the order intent (including its fsync)
+  sign       encoding the order body and its HMAC
+  network    HTTP round trips (requests Session.send)
+  parse      decoding responses
+
+On exit the samples are written as a speedscope file (drop it on
+https://www.speedscope.app) and the stage timings are printed.
+"""
+
+import atexit
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+
+from latency import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FILE = "profile.speedscope.json"
+INTERVAL = 0.005
+STAGE_WINDOW = 100000
+
+
+class SamplingProfiler:
+    def __init__(self, interval=INTERVAL):
+        self.interval = interval
+        self.frames = []            # speedscope frames: {"name", "file", "line"}
+        self.samples = {}           # (thread name, stack of frame indexes) -> count
+        self.started = None
+        self.elapsed = 0.0
+        self._index = {}            # code object -> frame index
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.elapsed = time.perf_counter() - self.started
+
+    def _frame(self, code):
+        index = self._index.get(code)
+        if index is None:
+            index = self._index[code] = len(self.frames)
+            self.frames.append({"name": getattr(code, "co_qualname", code.co_name),
+                                "file": code.co_filename, "line": code.co_firstlineno})
+        return index
+
+    def _run(self):
+        own = threading.get_ident()
+        samples = self.samples
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame(frame.f_code))
+                    frame = frame.f_back
+                key = (names.get(ident, str(ident)), tuple(reversed(stack)))
+                samples[key] = samples.get(key, 0) + 1
+
+    def speedscope(self, name="trading-bot"):
+        """The samples as a speedscope document, one sampled profile per thread"""
+        threads = {}
+        for (thread, stack), count in self.samples.items():
+            threads.setdefault(thread, []).append((stack, count))
+        profiles = []
+        for thread, rows in sorted(threads.items(), key=lambda item: -sum(count for _, count in item[1])):
+            weights = [count * self.interval for _, count in rows]
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": [list(stack) for stack, _ in rows],
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": self.frames},
+            "profiles": profiles,
+            "name": name,
+            "activeProfileIndex": 0,
+            "exporter": "trading-bot profiler",
+        }
+
+    def write(self, path, name="trading-bot"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.speedscope(name), f, separators=(",", ":"))
+
+
+class StageTimers:
+    def __init__(self):
+        self.latency = LatencyTracker(window=STAGE_WINDOW)
+        self.totals = {}
+        self._patched = []
+
+    def wrap(self, owner, attr, stage):
+        """Time every call of owner.attr (a class or module attribute) as stage"""
+        original = getattr(owner, attr, None)
+        if original is None:
+            return
+        record = self.record
+        perf_counter = time.perf_counter
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                record(stage, perf_counter() - start)
+
+        setattr(owner, attr, timed)
+        self._patched.append((owner, attr, original))
+
+    def record(self, stage, seconds):
+        self.latency.record(stage, seconds)
+        self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+
+    def unwrap(self):
+        for owner, attr, original in reversed(self._patched):
+            setattr(owner, attr, original)
+        self._patched = []
+
+    def report(self):
+        """Lines of count / total / p50 / p99 / max per stage"""
+        lines = []
+        for stage, (count, p50, p99, worst) in sorted(self.latency.summary().items()):
+            lines.append(f"⏱  {stage:<10} n={count:<6} total={self.totals[stage] * 1000:9.1f}ms "
+                         f"p50={p50 * 1e6:9.1f}us p99={p99 * 1e6:9.1f}us max={worst * 1e6:9.1f}us")
+        return lines
+
+
+def _stage_targets(bot_class):
+    """(owner, attribute, stage) of every timed step of the order path"""
+    import journal
+    import models
+    import risk
+    import signing
+
+    targets = [
+        (risk.RiskEngine, "check", "risk"),
+        (journal.OrderJournal, "append", "journal"),
+        (signing.OrderSigner, "build", "sign"),
+        (signing, "loads", "parse"),
+        (models, "loads", "parse"),
+    ]
+    if bot_class is not None:
+        # Whichever of these the bot has (missing ones are skipped by StageTimers.wrap)
+        targets += [(bot_class, attr, "construct") for attr in ("_round_quantity", "_round_price", "_order_params")]
+    try:
+        import requests
+    except ImportError:
+        return targets
+    return targets + [(requests.Session, "send", "network"), (requests.Response, "json", "parse")]
+
+
+class Profiler:
+    def __init__(self, path=PROFILE_FILE, interval=INTERVAL, bot_class=None):
+        self.path = path
+        self.sampler = SamplingProfiler(interval)
+        self.stages = StageTimers()
+        self.bot_class = bot_class
+        self._stopped = False
+
+    def start(self):
+        for owner, attr, stage in _stage_targets(self.bot_class):
+            self.stages.wrap(owner, attr, stage)
+        self.sampler.start()
+        atexit.register(self.stop)
+        logger.info(f"Profiling to {self.path} (sampling every {self.sampler.interval * 1000:.0f}ms)")
+        return self
+
+    def stop(self):
+        """Stop sampling, restore the wrapped stages, write the speedscope file and print the stage timings"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.sampler.stop()
+        self.stages.unwrap()
+        try:
+            self.sampler.write(self.path)
+        except OSError as e:
+            print(f"❌ Could not write profile {self.path}: {e}")
+            return
+        samples = sum(self.sampler.samples.values())
+        print(f"\n🔥 Profile: {samples:,} samples over {self.sampler.elapsed:.1f}s -> {self.path} "
+              f"(open in https://www.speedscope.app)")
+        for line in self.stages.report():
+            print(f"   {line}")
+
+
+def start(path=PROFILE_FILE, interval=INTERVAL, bot_class=None):
+    """Start profiling this process until exit"""
+    return Profiler(path, interval, bot_class).start()
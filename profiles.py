@@ -0,0 +1,237 @@
+"""
+Environment profiles.
+
+A profiles file (profiles.json, or the path in BOT_PROFILES) names each
+environment the bots can run against, with its accounts, symbol universe
+and risk limits. API keys stay in .env; a profile lists account names only
+("main" is API_KEY/API_SECRET, "sub1" is SUB1_API_KEY/SUB1_API_SECRET).
+
+{
+  "default": "testnet",
+  "profiles": {
+    "testnet": {"environment": "testnet", "symbols": ["BTCUSDT", "ETHUSDT"]},
+    "live": {"environment": "mainnet", "accounts": ["main"], "limits": {"max_order_notional": 500}}
+  }
+}
+
+Without a file, "testnet" and "mainnet" profiles are built from .env as
+before. Each profile keeps a warm cache directory (cache/<profile>/) with
+its exchange info and account leverage/margin state, so starting a bot on
+any profile reads local files instead of paying the cold-start calls.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from models import loads
+from risk import ENV_LIMITS, RiskLimits
+
+logger = logging.getLogger(__name__)
+
+PROFILES_FILE = "profiles.json"
+CACHE_ROOT = "cache"
+ENVIRONMENTS = ("testnet", "mainnet")
+PROFILE_KEYS = ("environment", "accounts", "symbols", "limits", "cache_dir")
+
+EXCHANGE_INFO_TTL = 3600
+ACCOUNT_CONFIG_TTL = 600
+
+
+class ProfileError(ValueError):
+    pass
+
+
+class ProfileCache:
+    """Warm per-profile state on disk: exchange info and account config, each with a max age"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def read_entry(self, name):
+        """(saved time, value) of a cached file, or None"""
+        try:
+            with open(self.path(name), "rb") as f:
+                entry = loads(f.read())
+        except (OSError, ValueError):
+            return None
+        return entry.get("saved", 0), entry.get("data")
+
+    def read(self, name, max_age):
+        """Cached value if it is younger than max_age seconds, else None"""
+        entry = self.read_entry(name)
+        if entry is None or time.time() - entry[0] > max_age:
+            return None
+        return entry[1]
+
+    def write(self, name, data):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self.path(name) + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"saved": time.time(), "data": data}, f, separators=(",", ":"))
+            os.replace(tmp, self.path(name))
+
+    def exchange_info(self, client, max_age=EXCHANGE_INFO_TTL):
+        info = self.read("exchange_info.json", max_age)
+        if info is None:
+            info = client.futures_exchange_info()
+            self.write("exchange_info.json", info)
+        else:
+            logger.info(f"Exchange info from {self.directory}")
+        return info
+
+    def account_config(self, config, client, account="main", max_age=ACCOUNT_CONFIG_TTL):
+        """Restore an account's AccountConfigCache from disk (or bulk load it) and save every change
+
+        The saved state is only trusted by a cache attached to a stream; without one, a leverage
+        change made elsewhere since the save would go unnoticed, so the state is loaded fresh.
+        """
+        name = f"account_config-{account}.json"
+        state = self.read(name, max_age) if config.tracking else None
+        if state is None:
+            config.load(client)
+            self.write(name, config.snapshot())
+        else:
+            config.restore(state)
+            logger.info(f"Account config for {account} from {self.directory}")
+        config.on_change = lambda changed: self.write(name, changed.snapshot())
+        return config
+
+
+class Profile:
+    def __init__(self, name, environment="testnet", accounts=None, symbols=(), limits=None, cache_dir=None):
+        self.name = name
+        self.environment = environment
+        self.accounts = accounts
+        self.symbols = list(symbols)
+        self.limits = dict(limits or {})
+        self.cache = ProfileCache(cache_dir or os.path.join(CACHE_ROOT, name))
+
+    @property
+    def testnet(self):
+        return self.environment == "testnet"
+
+    def path(self, name):
+        """Path of a per-profile file in the cache directory"""
+        os.makedirs(self.cache.directory, exist_ok=True)
+        return self.cache.path(name)
+
+    def credentials(self):
+        """{account name: (api_key, api_secret)} of the profile's accounts"""
+        from accounts import account_credentials, load_accounts
+
+        if self.accounts is None:
+            return load_accounts()
+        return {name: account_credentials(name) for name in self.accounts}
+
+    def risk_limits(self):
+        """RISK_* limits from the environment, overridden by the profile's limits"""
+        limits = RiskLimits.from_env()
+        for name, value in self.limits.items():
+            setattr(limits, name, value)
+        return limits
+
+    def __repr__(self):
+        return f"Profile({self.name!r}, {self.environment})"
+
+
+def _validate(name, raw):
+    if not isinstance(raw, dict):
+        raise ProfileError(f"profile {name}: expected an object")
+    unknown = set(raw) - set(PROFILE_KEYS)
+    if unknown:
+        raise ProfileError(f"profile {name}: unknown keys {', '.join(sorted(unknown))}")
+    environment = raw.get("environment", "testnet")
+    if environment not in ENVIRONMENTS:
+        raise ProfileError(f"profile {name}: environment must be one of {', '.join(ENVIRONMENTS)}")
+    accounts = raw.get("accounts")
+    if accounts is not None and (not isinstance(accounts, list) or not all(isinstance(a, str) and a for a in accounts)):
+        raise ProfileError(f"profile {name}: accounts must be a list of account names")
+    symbols = raw.get("symbols", [])
+    if not isinstance(symbols, list) or not all(isinstance(s, str) and s for s in symbols):
+        raise ProfileError(f"profile {name}: symbols must be a list of symbols")
+    limits = raw.get("limits", {})
+    if not isinstance(limits, dict):
+        raise ProfileError(f"profile {name}: limits must be an object")
+    for key, value in limits.items():
+        if key not in ENV_LIMITS:
+            raise ProfileError(f"profile {name}: unknown limit {key} (expected {', '.join(ENV_LIMITS)})")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            raise ProfileError(f"profile {name}: limit {key} must be a positive number")
+    limits = {key: ENV_LIMITS[key][1](value) for key, value in limits.items()}
+    return Profile(name, environment, accounts, [s.upper() for s in symbols], limits, raw.get("cache_dir"))
+
+
+class ProfileConfig:
+    def __init__(self, profiles, default):
+        self.profiles = profiles
+        self.default = default
+
+    @classmethod
+    def builtin(cls):
+        """testnet/mainnet profiles from .env, used when there is no profiles file"""
+        return cls({env: Profile(env, env) for env in ENVIRONMENTS}, "testnet")
+
+    @classmethod
+    def load(cls, path):
+        """Read and validate a profiles file"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                raw = json.load(f)
+        except ValueError as e:
+            raise ProfileError(f"{path}: {e}")
+        if not isinstance(raw, dict) or not isinstance(raw.get("profiles"), dict) or not raw["profiles"]:
+            raise ProfileError(f"{path}: expected a non-empty 'profiles' object")
+        profiles = {name: _validate(name, entry) for name, entry in raw["profiles"].items()}
+        default = raw.get("default") or next(iter(profiles))
+        if default not in profiles:
+            raise ProfileError(f"{path}: default profile {default} is not defined")
+        return cls(profiles, default)
+
+    def get(self, name=None):
+        name = name or self.default
+        if name not in self.profiles:
+            raise ProfileError(f"unknown profile {name} (available: {', '.join(self.profiles)})")
+        return self.profiles[name]
+
+    def for_environment(self, testnet):
+        """The default profile if it matches the environment, else the first that does"""
+        environment = "testnet" if testnet else "mainnet"
+        default = self.profiles[self.default]
+        if default.environment == environment:
+            return default
+        for profile in self.profiles.values():
+            if profile.environment == environment:
+                return profile
+        return Profile(environment, environment)
+
+
+_configs = {}
+_configs_lock = threading.Lock()
+
+
+def load_config(path=None):
+    """The profiles of a file, loaded and validated once per process"""
+    path = path or os.getenv("BOT_PROFILES", PROFILES_FILE)
+    with _configs_lock:
+        config = _configs.get(path)
+        if config is None:
+            config = _configs[path] = ProfileConfig.load(path) if os.path.exists(path) else ProfileConfig.builtin()
+        return config
+
+
+def resolve_profile(name=None, testnet=None):
+    """Profile by name, else by environment flag, else the default (BOT_PROFILE or the file's default)"""
+    config = load_config()
+    if name:
+        return config.get(name)
+    if testnet is not None:
+        return config.for_environment(testnet)
+    return config.get(os.getenv("BOT_PROFILE"))
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Replay a capture (see capture.py) through the bot's stream consumers and
+order path against an in-memory mock exchange.
+
+Recorded messages are fed through StreamHub.dispatch exactly as the live
+websocket delivers them, at 1x, Nx or maximum speed, into the Portfolio,
+PriceCache, OrderCache, DepthCache and RiskEngine. Optionally a fixed
+order pattern is sent every N events through OrderSender (journal, risk
+checks, retries) to MockExchange, which fills against the replayed prices
+and answers with ORDER_TRADE_UPDATE events. At maximum speed everything
+runs on one thread, so a run is repeatable.
+
+Usage: python replay.py captures/btc [--speed 1|10|max] [--orders-every 100] [--report report.json]
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from capture import SegmentReader
+from latency import LatencyTracker
+from models import Position
+from streams import StreamHub
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BALANCE = 10000.0
+ORDER_NOTIONAL = 100.0
+STATS_WINDOW = 200000
+OPEN_STATUSES = ("NEW", "PARTIALLY_FILLED")
+
+
+class ReplayHub(StreamHub):
+    """StreamHub that never connects; messages arrive through dispatch() only"""
+
+    def __init__(self):
+        super().__init__(None, None)
+
+    def start(self, streams=(), user_data=True):
+        self.subscribed.update(streams)
+        return self
+
+    def add_streams(self, streams):
+        self.subscribed.update(streams)
+        return None
+
+    def stop(self):
+        pass
+
+
+class MockExchange:
+    """In-memory stand-in for the python-binance Client, filling orders at replayed prices"""
+
+    def __init__(self, hub, snapshots=None, balance=DEFAULT_BALANCE, latency=0.0):
+        self.hub = hub
+        self.snapshots = snapshots or {}
+        self.latency = latency
+        self.prices = {}
+        self.orders = {}
+        self.by_client_id = {}
+        self.resting = {}
+        self.positions = {}
+        self.balance = balance
+        self.timestamp_offset = 0
+        self._ids = itertools.count(1)
+        self._trades = itertools.count(1)
+        self._lock = threading.RLock()
+        for ticker in self._snapshot("futures_symbol_ticker") or ():
+            self.prices[ticker['symbol']] = float(ticker['price'])
+        account = self._snapshot("futures_account")
+        if account:
+            self.balance = float(account.get('totalWalletBalance', balance))
+        for pos in map(Position.from_raw, self._snapshot("futures_position_information") or ()):
+            if pos.amount:
+                self.positions[pos.symbol] = [pos.amount, pos.entry_price]
+        hub.on('24hrMiniTicker', lambda e: self.on_price(e['s'], float(e['c'])))
+        hub.on('markPriceUpdate', lambda e: self.on_price(e['s'], float(e['p'])))
+
+    def _snapshot(self, method, key=None):
+        return self.snapshots.get(method, {}).get(key)
+
+    def _delay(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    # Market data
+
+    def on_price(self, symbol, price):
+        with self._lock:
+            self.prices[symbol] = price
+            resting = self.resting.get(symbol)
+            if not resting:
+                return
+            for order in list(resting):
+                buy = order['side'] == 'BUY'
+                if order['type'].startswith('STOP'):
+                    limit = float(order['stopPrice'])
+                    triggered = price >= limit if buy else price <= limit
+                else:
+                    limit = float(order['price'])
+                    triggered = price <= limit if buy else price >= limit
+                if triggered:
+                    resting.remove(order)
+                    self._fill(order, price if order['type'] == 'STOP_MARKET' else limit)
+
+    def futures_symbol_ticker(self, symbol=None):
+        self._delay()
+        if symbol:
+            return {'symbol': symbol, 'price': str(self.prices.get(symbol, 0.0))}
+        return [{'symbol': s, 'price': str(p)} for s, p in self.prices.items()]
+
+    def futures_mark_price(self, symbol=None):
+        self._delay()
+        if symbol:
+            return {'symbol': symbol, 'markPrice': str(self.prices.get(symbol, 0.0))}
+        return [{'symbol': s, 'markPrice': str(p)} for s, p in self.prices.items()]
+
+    def futures_order_book(self, symbol, limit=1000):
+        self._delay()
+        book = self._snapshot("futures_order_book", symbol)
+        if book is None:
+            raise ValueError(f"No order book snapshot for {symbol} in the capture")
+        return book
+
+    # Account
+
+    def futures_account(self):
+        self._delay()
+        return {'totalWalletBalance': str(self.balance), 'availableBalance': str(self.balance)}
+
+    def futures_position_information(self, symbol=None):
+        self._delay()
+        with self._lock:
+            items = self.positions.items() if symbol is None else [(symbol, self.positions.get(symbol, [0.0, 0.0]))]
+            return [{'symbol': s, 'positionAmt': str(amount), 'entryPrice': str(entry),
+                     'markPrice': str(self.prices.get(s, entry)), 'leverage': '1'}
+                    for s, (amount, entry) in items]
+
+    def futures_income_history(self, **params):
+        return []
+
+    # Orders
+
+    def futures_create_order(self, **params):
+        self._delay()
+        with self._lock:
+            symbol, side, order_type = params['symbol'], params['side'], params.get('type', 'MARKET')
+            order = {
+                'orderId': next(self._ids),
+                'clientOrderId': params.get('newClientOrderId') or f"mock-{len(self.orders)}",
+                'symbol': symbol, 'side': side, 'type': order_type,
+                'origQty': str(params['quantity']), 'executedQty': '0', 'avgPrice': '0',
+                'price': str(params.get('price', 0)), 'stopPrice': str(params.get('stopPrice', 0)),
+                'status': 'NEW', 'updateTime': int(time.time() * 1000),
+            }
+            if order['clientOrderId'] in self.by_client_id:
+                from binance.exceptions import BinanceAPIException
+                raise BinanceAPIException(None, 400, '{"code": -4116, "msg": "ClientOrderId is duplicated."}')
+            self.orders[order['orderId']] = order
+            self.by_client_id[order['clientOrderId']] = order
+            price = self.prices.get(symbol)
+            if price is None:
+                order['status'] = 'REJECTED'
+            elif order_type == 'MARKET':
+                self._fill(order, price)
+            else:
+                self._emit(order, 'NEW')
+                self.resting.setdefault(symbol, []).append(order)
+                self.on_price(symbol, price)
+            return dict(order)
+
+    def futures_get_order(self, symbol, orderId=None, origClientOrderId=None):
+        self._delay()
+        order = self.orders.get(orderId) if orderId else self.by_client_id.get(origClientOrderId)
+        if order is None:
+            from binance.exceptions import BinanceAPIException
+            raise BinanceAPIException(None, 400, '{"code": -2013, "msg": "Order does not exist."}')
+        return dict(order)
+
+    def futures_get_open_orders(self, symbol=None):
+        self._delay()
+        with self._lock:
+            return [dict(o) for s, orders in self.resting.items() if symbol in (None, s) for o in orders]
+
+    def futures_cancel_order(self, symbol, orderId=None, origClientOrderId=None):
+        self._delay()
+        with self._lock:
+            order = self.futures_get_order(symbol, orderId, origClientOrderId)
+            order = self.orders[order['orderId']]
+            if order['status'] in OPEN_STATUSES:
+                self.resting[symbol].remove(order)
+                order['status'] = 'CANCELED'
+                self._emit(order, 'CANCELED')
+            return dict(order)
+
+    def _fill(self, order, price):
+        quantity = float(order['origQty'])
+        signed = quantity if order['side'] == 'BUY' else -quantity
+        amount, entry = self.positions.get(order['symbol'], [0.0, 0.0])
+        new_amount = round(amount + signed, 10)
+        if amount == 0 or (amount > 0) == (signed > 0):
+            entry = (entry * abs(amount) + price * quantity) / abs(new_amount)
+        else:
+            self.balance += (price - entry) * min(abs(amount), quantity) * (1 if amount > 0 else -1)
+            entry = 0.0 if new_amount == 0 else (price if (new_amount > 0) != (amount > 0) else entry)
+        self.positions[order['symbol']] = [new_amount, entry]
+        order.update(status='FILLED', executedQty=order['origQty'], avgPrice=str(price))
+        self._emit(order, 'FILLED', last_qty=quantity, last_price=price)
+
+    def _emit(self, order, status, last_qty=0.0, last_price=0.0):
+        now = int(time.time() * 1000)
+        self.hub.dispatch({'e': 'ORDER_TRADE_UPDATE', 'E': now, 'T': now, 'o': {
+            's': order['symbol'], 'c': order['clientOrderId'], 'S': order['side'], 'o': order['type'],
+            'q': order['origQty'], 'p': order['price'], 'sp': order['stopPrice'], 'ap': order['avgPrice'],
+            'x': 'TRADE' if last_qty else status, 'X': status, 'i': order['orderId'],
+            'l': str(last_qty), 'z': order['executedQty'], 'L': str(last_price),
+            'n': '0', 'N': 'USDT', 't': next(self._trades) if last_qty else 0,
+        }})
+
+
+class OrderFlow:
+    """Fixed order pattern sent every `every` events, cycling through the order types"""
+
+    PATTERN = (('BUY', 'MARKET', 0.0), ('SELL', 'LIMIT', 0.01), ('SELL', 'MARKET', 0.0),
+               ('BUY', 'LIMIT', -0.01), ('BUY', 'STOP_MARKET', 0.02), ('cancel', None, 0.0))
+
+    def __init__(self, sender, exchange, symbols, every=100, stats=None):
+        self.sender = sender
+        self.exchange = exchange
+        self.symbols = symbols
+        self.every = every
+        self.stats = stats
+        self.sent = 0
+        self.failed = 0
+        self._step = 0
+
+    def on_event(self, count):
+        if not self.every or count % self.every:
+            return
+        symbol = self.symbols[self._step % len(self.symbols)]
+        side, order_type, offset = self.PATTERN[self._step % len(self.PATTERN)]
+        self._step += 1
+        price = self.exchange.prices.get(symbol)
+        if not price:
+            return
+        start = time.perf_counter()
+        try:
+            if side == 'cancel':
+                open_orders = self.exchange.futures_get_open_orders(symbol)
+                if open_orders:
+                    self.exchange.futures_cancel_order(symbol, orderId=open_orders[0]['orderId'])
+                name = 'order_cancel'
+            else:
+                params = {'symbol': symbol, 'side': side, 'type': order_type,
+                          'quantity': round(ORDER_NOTIONAL / price, 3) or 0.001}
+                if order_type == 'LIMIT':
+                    params.update(price=round(price * (1 + offset), 2), timeInForce='GTC')
+                elif order_type == 'STOP_MARKET':
+                    params['stopPrice'] = round(price * (1 + offset), 2)
+                self.sender.submit(params)
+                self.sent += 1
+                name = 'order_submit'
+        except Exception as e:
+            logger.debug(f"Replay order failed: {e}")
+            self.failed += 1
+            name = 'order_failed'
+        if self.stats is not None:
+            self.stats.record(name, time.perf_counter() - start)
+
+
+def stream_name(msg):
+    """Stable label for a raw message: the stream name, or the event type for user data"""
+    if isinstance(msg, dict):
+        stream = msg.get('stream')
+        if stream:
+            return stream
+        return msg.get('e', 'unknown')
+    return 'list'
+
+
+class Replayer:
+    def __init__(self, reader, hub, speed=1.0, stats=None):
+        self.reader = reader
+        self.hub = hub
+        self.speed = speed
+        self.stats = stats or LatencyTracker(window=STATS_WINDOW)
+        self.events = 0
+        self.first = self.last = None
+        self.elapsed = 0.0
+
+    def run(self, start=None, end=None, on_event=None, include_user_data=True):
+        """Dispatch every recorded message; speed 0 means as fast as possible"""
+        begin = time.perf_counter()
+        for t, kind, msg in self.reader.records(start, end, kinds=("ws",)):
+            if not include_user_data and isinstance(msg, dict) and 'stream' not in msg:
+                continue
+            if self.first is None:
+                self.first = t
+            self.last = t
+            if self.speed:
+                delay = begin + (t - self.first) / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    self.stats.record('lag', -delay)
+            dispatch_start = time.perf_counter()
+            self.hub.dispatch(msg)
+            self.stats.record(f"dispatch {stream_name(msg)}", time.perf_counter() - dispatch_start)
+            self.events += 1
+            if on_event is not None:
+                on_event(self.events)
+        self.elapsed = time.perf_counter() - begin
+        return self.events
+
+    def report(self, **extra):
+        span = (self.last - self.first) if self.first is not None else 0.0
+        return {
+            'events': self.events,
+            'wall_seconds': round(self.elapsed, 3),
+            'capture_seconds': round(span, 3),
+            'events_per_second': round(self.events / self.elapsed, 1) if self.elapsed else None,
+            'effective_speed': round(span / self.elapsed, 2) if self.elapsed else None,
+            'latency_us': {name: {'count': count, 'p50': round(p50 * 1e6, 1), 'p99': round(p99 * 1e6, 1),
+                                  'max': round(worst * 1e6, 1)}
+                           for name, (count, p50, p99, worst) in sorted(self.stats.summary().items())},
+            **extra,
+        }
+
+
+def parse_speed(value):
+    return 0.0 if value == 'max' else float(value.rstrip('x'))
+
+
+def main():
+    from caches import OrderCache, PriceCache
+    from journal import OrderJournal
+    from orderbook import DepthCache
+    from portfolio import Portfolio
+    from retry import OrderSender, RetryPolicy
+    from risk import RiskEngine, RiskLimits
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s [%(levelname)s] %(message)s')
+    parser = argparse.ArgumentParser(description="Replay a capture against a mock exchange")
+    parser.add_argument("directory", help="capture directory from capture.py")
+    parser.add_argument("--speed", type=parse_speed, default=1.0, help="1, 10 (or 10x), or max")
+    parser.add_argument("--orders-every", type=int, default=0, help="send one order every N events (0 = none)")
+    parser.add_argument("--exchange-latency", type=float, default=0.0, help="simulated mock exchange latency (s)")
+    parser.add_argument("--no-user-data", action="store_true", help="skip recorded user data events")
+    parser.add_argument("--report", help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    reader = SegmentReader(args.directory)
+    if not reader.segments:
+        print(f"❌ No capture in {args.directory}")
+        return 1
+    symbols = reader.meta.get('symbols') or ['BTCUSDT']
+    hub = ReplayHub()
+    exchange = MockExchange(hub, reader.rest_snapshots(), latency=args.exchange_latency)
+
+    # The same consumers the bots attach
+    portfolio = Portfolio.from_client(exchange)
+    portfolio.attach(hub)
+    prices = PriceCache()
+    prices.attach(hub)
+    prices.load(exchange)
+    orders = OrderCache()
+    orders.attach(hub)
+    orders.load(exchange)
+    risk = RiskEngine(RiskLimits.from_env())
+    if risk.enabled:
+        risk.load(exchange)
+        risk.attach(hub)
+    depth = DepthCache(exchange, hub, background=False)  # no snapshot thread racing the replayed diffs
+    for symbol in symbols:
+        if exchange._snapshot("futures_order_book", symbol) is not None:
+            depth.subscribe(symbol)
+
+    stats = LatencyTracker(window=STATS_WINDOW)
+    journal_dir = tempfile.mkdtemp(prefix="replay-")
+    journal = OrderJournal(os.path.join(journal_dir, "orders.journal"))
+    sender = OrderSender(exchange, journal, RetryPolicy(hedge=False), latency=stats, risk=risk)
+    flow = OrderFlow(sender, exchange, symbols, every=args.orders_every, stats=stats)
+
+    speed_label = 'max' if not args.speed else f"{args.speed:g}x"
+    print(f"▶️  Replaying {args.directory} at {speed_label} ({', '.join(symbols)})")
+    replayer = Replayer(reader, hub, speed=args.speed, stats=stats)
+    try:
+        replayer.run(on_event=flow.on_event, include_user_data=not args.no_user_data)
+    except KeyboardInterrupt:
+        print("\n⏹️  Stopped")
+    journal.close()
+
+    report = replayer.report(speed=speed_label, orders_sent=flow.sent, orders_failed=flow.failed,
+                             positions={p.symbol: p.amount for p in portfolio.active_positions()})
+    print(f"\n📊 {report['events']:,} events in {report['wall_seconds']:.2f}s "
+          f"({report['events_per_second'] or 0:,.0f}/s, {report['effective_speed'] or 0:g}x real time)")
+    if flow.every:
+        print(f"   Orders: {flow.sent} sent, {flow.failed} failed")
+    print(f"\n   {'stage':<40} {'count':>9} {'p50 µs':>9} {'p99 µs':>9} {'max µs':>10}")
+    for name, row in report['latency_us'].items():
+        print(f"   {name:<40} {row['count']:>9,} {row['p50']:>9.1f} {row['p99']:>9.1f} {row['max']:>10.1f}")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"\n✅ Report written to {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
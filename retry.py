@@ -0,0 +1,192 @@
+"""
+Idempotent order retries with client order IDs and hedged lookups.
+
+An order keeps the same newClientOrderId across every attempt. The exchange
+only refuses a duplicate client ID while the first order is still open, so
+that alone does not prevent a second fill: after an ambiguous failure
+(timeout, connection error, unknown status) the order is looked up by its
+client ID, and "not found" only counts once the lost attempt's timestamp is
+past its recvWindow, when the exchange would reject it if it arrived late.
+
+Lookups are reads, so when one runs longer than the observed p99 a
+duplicate query is hedged and the first answer wins. Order submissions
+themselves are never hedged.
+"""
+
+import logging
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from journal import ACK, FAIL, is_ambiguous
+from latency import tracker
+
+logger = logging.getLogger(__name__)
+
+ORDER_NOT_FOUND = -2013
+TIMESTAMP_OUTSIDE_RECV_WINDOW = -1021
+DUPLICATE_CLIENT_ORDER_ID = -4116
+DEFAULT_RECV_WINDOW = 5000      # ms, the exchange's default when none is sent
+LATE_ARRIVAL_MARGIN = 0.5       # s, clock offset and server processing slack
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=4, base_delay=0.1, max_delay=2.0, hedge=True,
+                 hedge_percentile=99, hedge_default=0.5, min_samples=20):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_default = hedge_default
+        self.min_samples = min_samples
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff for the given attempt (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class OrderSender:
+    def __init__(self, client, journal, policy=None, latency=tracker, risk=None, alerts=None):
+        self.client = client
+        self.journal = journal
+        self.risk = risk
+        self.alerts = alerts        # alerts.AlertBus: order results and rejects
+        self.policy = policy or RetryPolicy()
+        self.latency = latency
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hedge")
+
+    def _hedge_after(self, name):
+        samples = self.latency.samples.get(name, ())
+        if len(samples) < self.policy.min_samples:
+            return self.policy.hedge_default
+        return self.latency.percentile(name, self.policy.hedge_percentile)
+
+    def hedged_call(self, name, fn, **kwargs):
+        """Call an idempotent read, hedging with a duplicate request past the p99 latency"""
+        start = time.perf_counter()
+        primary = self._pool.submit(fn, **kwargs)
+        if not self.policy.hedge:
+            result = primary.result()
+            self.latency.record(name, time.perf_counter() - start)
+            return result
+        done, _ = wait([primary], timeout=self._hedge_after(name))
+        futures = [primary]
+        if not done:
+            logger.info(f"Hedging slow {name} call")
+            futures.append(self._pool.submit(fn, **kwargs))
+        error = None
+        pending = futures
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self.latency.record(name, time.perf_counter() - start)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def lookup(self, symbol, client_order_id):
+        """Return the order with this client ID, or None if the exchange does not have it"""
+        try:
+            return self.hedged_call("futures_get_order", self.client.futures_get_order,
+                                    symbol=symbol, origClientOrderId=client_order_id)
+        except Exception as e:
+            if getattr(e, "code", None) == ORDER_NOT_FOUND:
+                return None
+            raise
+
+    @staticmethod
+    def _recv_window(params, clock):
+        """recvWindow (ms) an attempt was signed with"""
+        return params.get("recvWindow") or (clock.recv_window() if clock is not None else None) or DEFAULT_RECV_WINDOW
+
+    def submit(self, params, replaces=None):
+        """Send an order, retrying ambiguous failures without risking a double fill
+
+        replaces: client order ID of an order being cancelled for this one (see RiskEngine.check)
+        """
+        params = dict(params)
+        params.setdefault("newClientOrderId", self.journal.new_client_order_id())
+        cid = params["newClientOrderId"]
+        if self.risk is not None:
+            try:
+                self.risk.check(params, replaces=replaces)
+            except Exception as e:
+                if self.alerts is not None:
+                    self.alerts.order_rejected(params, e)
+                raise
+        sent = False  # an earlier attempt may have reached the exchange
+        expires = 0.0  # when the last ambiguous attempt can no longer be accepted
+        clock = getattr(self.client, "clock", None)
+        for attempt in range(1, self.policy.max_attempts + 1):
+            start = time.perf_counter()
+            sent_at = time.time()
+            refused = False
+            try:
+                response = self.journal.submit(self.client, params, record_failure=not sent)
+                self.latency.record("futures_create_order", time.perf_counter() - start)
+                if self.risk is not None:
+                    self.risk.on_response(response)
+                if self.alerts is not None:
+                    self.alerts.order_sent(params, response)
+                return response
+            except Exception as e:
+                self.latency.record("futures_create_order", time.perf_counter() - start)
+                code = getattr(e, "code", None)
+                if code == TIMESTAMP_OUTSIDE_RECV_WINDOW and clock is not None and attempt < self.policy.max_attempts:
+                    # Rejected before matching, so resync and resend without a lookup
+                    logger.warning(f"Order {cid} rejected for timestamp, resyncing clock")
+                    clock.sample()
+                    last_error = e
+                    continue
+                if code != DUPLICATE_CLIENT_ORDER_ID and not is_ambiguous(e):
+                    if not sent:
+                        if self.risk is not None:
+                            self.risk.release(cid)
+                        if self.alerts is not None:
+                            self.alerts.order_rejected(params, e)
+                        raise
+                    # A resend was refused (e.g. CircuitOpen after the breaker tripped on the
+                    # earlier failure), which says nothing about the earlier attempt: look it up
+                    logger.warning(f"Order {cid} resend refused, resolving earlier attempt: {e}")
+                    refused = True
+                else:
+                    logger.warning(f"Order {cid} attempt {attempt} ambiguous: {e}")
+                    sent = True
+                    last_error = e
+                    expires = max(expires, sent_at + self._recv_window(params, clock) / 1000 + LATE_ARRIVAL_MARGIN)
+            try:
+                order = self.lookup(params["symbol"], cid)
+                if order is None and time.time() < expires:
+                    # The lost request may still reach the matcher: wait it out before calling it missing
+                    logger.info(f"Order {cid} not found yet, waiting {expires - time.time():.1f}s for its recvWindow")
+                    time.sleep(max(0.0, expires - time.time()))
+                    order = self.lookup(params["symbol"], cid)
+                missing = order is None
+            except Exception as e:
+                logger.warning(f"Lookup of {cid} failed: {e}")
+                order, missing = None, False
+            if order:
+                self.journal.append(ACK, {"newClientOrderId": cid, "orderId": order["orderId"],
+                                          "status": order["status"]})
+                logger.info(f"Order {cid} found on exchange after ambiguous failure: {order['orderId']}")
+                if self.risk is not None:
+                    self.risk.on_response(order)
+                if self.alerts is not None:
+                    self.alerts.order_sent(params, order)
+                return order
+            if refused:
+                break
+            if attempt < self.policy.max_attempts:
+                time.sleep(self.policy.backoff(attempt))
+        if missing:
+            self.journal.append(FAIL, {"newClientOrderId": cid, "error": str(last_error)})
+            if self.risk is not None:
+                self.risk.release(cid)
+            if self.alerts is not None:
+                self.alerts.order_rejected(params, last_error)
+        elif self.alerts is not None:
+            self.alerts.order_unknown(params, last_error, self.policy.max_attempts)
+        # Otherwise the order stays pending in the journal for recover()
+        raise last_error
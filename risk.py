@@ -0,0 +1,322 @@
+"""
+Pre-trade risk limits checked against incremental exposure counters.
+
+Every order is checked before it is journaled or sent: order notional,
+per-symbol position notional (counting resting orders on the same side),
+gross account exposure, number of open orders and the day's realized loss.
+Counters are updated from order responses and, when a StreamHub is attached,
+from ORDER_TRADE_UPDATE and mark price events, so a check is a handful of
+dict lookups under a lock instead of a round trip. Orders that only reduce
+a position are never blocked.
+
+Limits are read from the environment (.env); unset limits are not enforced:
+  RISK_MAX_ORDER_NOTIONAL     largest single order, in USDT
+  RISK_MAX_POSITION_NOTIONAL  largest position per symbol, in USDT
+  RISK_MAX_GROSS_NOTIONAL     sum of all position notionals, in USDT
+  RISK_MAX_OPEN_ORDERS        resting orders across the account
+  RISK_MAX_DAILY_LOSS         realized loss since 00:00 UTC, in USDT
+"""
+
+import logging
+import os
+import threading
+import time
+
+from guard import require_fresh
+from models import Order, Position
+
+logger = logging.getLogger(__name__)
+
+MARK_PRICE_STREAM = "!markPrice@arr@1s"
+CLOSED_STATUSES = frozenset(("FILLED", "CANCELED", "EXPIRED", "REJECTED", "EXPIRED_IN_MATCH"))
+
+ENV_LIMITS = {
+    'max_order_notional': ('RISK_MAX_ORDER_NOTIONAL', float),
+    'max_position_notional': ('RISK_MAX_POSITION_NOTIONAL', float),
+    'max_gross_notional': ('RISK_MAX_GROSS_NOTIONAL', float),
+    'max_open_orders': ('RISK_MAX_OPEN_ORDERS', int),
+    'max_daily_loss': ('RISK_MAX_DAILY_LOSS', float),
+}
+
+
+class RiskLimitExceeded(Exception):
+    """An order was rejected locally by a pre-trade limit"""
+
+
+class RiskLimits:
+    def __init__(self, max_order_notional=None, max_position_notional=None, max_gross_notional=None,
+                 max_open_orders=None, max_daily_loss=None):
+        self.max_order_notional = max_order_notional
+        self.max_position_notional = max_position_notional
+        self.max_gross_notional = max_gross_notional
+        self.max_open_orders = max_open_orders
+        self.max_daily_loss = max_daily_loss
+
+    @classmethod
+    def from_env(cls):
+        """Read the RISK_* limits from the environment"""
+        values = {}
+        for name, (env, cast) in ENV_LIMITS.items():
+            raw = os.getenv(env)
+            if raw:
+                values[name] = cast(raw)
+        return cls(**values)
+
+    @property
+    def enabled(self):
+        return any(getattr(self, name) is not None for name in ENV_LIMITS)
+
+
+class SymbolExposure:
+    __slots__ = ('position', 'entry_price', 'open_buy', 'open_sell')
+
+    def __init__(self):
+        self.position = 0.0
+        self.entry_price = 0.0
+        self.open_buy = 0.0
+        self.open_sell = 0.0
+
+
+def _utc_day():
+    return int(time.time() // 86400)
+
+
+class RiskEngine:
+    def __init__(self, limits=None):
+        self.limits = limits or RiskLimits()
+        self.enabled = self.limits.enabled
+        self.symbols = {}
+        self.marks = {}
+        # clientOrderId -> [symbol, side, quantity, filled, avg_price, resting]
+        self.orders = {}
+        self.order_ids = {}         # orderId -> clientOrderId, so amendments by orderId need no lookup
+        self.resting = 0
+        self.gross_notional = 0.0
+        self.realized_today = 0.0
+        self.day = _utc_day()
+        self._lock = threading.Lock()
+
+    def _symbol(self, symbol):
+        exposure = self.symbols.get(symbol)
+        if exposure is None:
+            exposure = self.symbols[symbol] = SymbolExposure()
+        return exposure
+
+    def load(self, client):
+        """Seed the counters from positions, open orders, mark prices and today's realized PnL"""
+        # Cached answers would seed the counters with exposure that may be long gone
+        positions = require_fresh(client.futures_position_information(), "Positions")
+        marks = require_fresh(client.futures_mark_price(), "Mark prices")
+        open_orders = require_fresh(client.futures_get_open_orders(), "Open orders")
+        day = _utc_day()
+        income = client.futures_income_history(incomeType='REALIZED_PNL', startTime=day * 86400000, limit=1000)
+        with self._lock:
+            for mark in marks:
+                self.marks[mark['symbol']] = float(mark['markPrice'])
+            for pos in map(Position.from_raw, positions):
+                if pos.amount:
+                    exposure = self._symbol(pos.symbol)
+                    exposure.position = pos.amount
+                    exposure.entry_price = pos.entry_price
+            for order in map(Order.from_raw, open_orders):
+                self._track(order.client_order_id, order.symbol, order.side, order.quantity,
+                            order.filled, order.avg_price, order.type)
+                self.order_ids[order.order_id] = order.client_order_id
+            self.gross_notional = sum(abs(e.position) * self.marks.get(symbol, e.entry_price)
+                                      for symbol, e in self.symbols.items())
+            self.day = day
+            self.realized_today = sum(float(i['income']) for i in income)
+        logger.info(f"Risk limits active: gross {self.gross_notional:.2f} USDT, {len(self.orders)} open orders,"
+                    f" {self.realized_today:.2f} USDT realized today")
+
+    def attach(self, hub):
+        """Keep the counters current from a StreamHub"""
+        hub.on('ORDER_TRADE_UPDATE', self.on_order_update)
+        hub.on('markPriceUpdate', self.on_mark_price)
+        hub.add_streams([MARK_PRICE_STREAM])
+
+    def client_order_id(self, order_id):
+        """Client order ID of a tracked order, or None"""
+        with self._lock:
+            return self.order_ids.get(order_id)
+
+    def check(self, params, replaces=None):
+        """Check an order against the limits and reserve its exposure; raises RiskLimitExceeded
+
+        replaces is the client order ID of an order being cancelled for this one: its
+        reservation is left out of the check (it is released when the cancel is confirmed).
+        """
+        if not self.enabled:
+            return
+        symbol, side = params['symbol'], params['side']
+        quantity = float(params['quantity'])
+        resting = params.get('type', 'MARKET') != 'MARKET'
+        limits = self.limits
+        with self._lock:
+            if self.day != _utc_day():
+                self.day, self.realized_today = _utc_day(), 0.0
+            exposure = self._symbol(symbol)
+            open_buy, open_sell, open_orders = exposure.open_buy, exposure.open_sell, self.resting
+            old = self.orders.get(replaces) if replaces is not None else None
+            if old is not None:
+                if old[0] == symbol:
+                    if old[1] == 'BUY':
+                        open_buy -= old[2] - old[3]
+                    else:
+                        open_sell -= old[2] - old[3]
+                if old[5]:
+                    open_orders -= 1
+            buy = side == 'BUY'
+            position = exposure.position
+            reduces = bool(params.get('reduceOnly')) or (
+                position != 0 and (position > 0) != buy and quantity <= abs(position))
+            if not reduces:
+                mark = self.marks.get(symbol)
+                price = float(params.get('price') or params.get('stopPrice') or 0) or mark
+                if not price:
+                    raise RiskLimitExceeded(f"No reference price for {symbol}")
+                mark = mark or price
+                if limits.max_daily_loss is not None and -self.realized_today >= limits.max_daily_loss:
+                    raise RiskLimitExceeded(f"Daily loss limit reached ({-self.realized_today:.2f} USDT)")
+                if limits.max_order_notional is not None and quantity * price > limits.max_order_notional:
+                    raise RiskLimitExceeded(f"Order notional {quantity * price:.2f} USDT exceeds {limits.max_order_notional}")
+                if limits.max_position_notional is not None:
+                    if buy:
+                        worst = position + open_buy + quantity
+                    else:
+                        worst = position - open_sell - quantity
+                    if abs(worst) * mark > limits.max_position_notional:
+                        raise RiskLimitExceeded(f"{symbol} position would reach {abs(worst) * mark:.2f} USDT,"
+                                                f" limit {limits.max_position_notional}")
+                if limits.max_gross_notional is not None:
+                    added = (abs(position + (quantity if buy else -quantity)) - abs(position)) * mark
+                    if self.gross_notional + added > limits.max_gross_notional:
+                        raise RiskLimitExceeded(f"Gross exposure would reach {self.gross_notional + added:.2f} USDT,"
+                                                f" limit {limits.max_gross_notional}")
+                if resting and limits.max_open_orders is not None and open_orders >= limits.max_open_orders:
+                    raise RiskLimitExceeded(f"{open_orders} open orders, limit {limits.max_open_orders}")
+            self._track(params.get('newClientOrderId'), symbol, side, quantity, 0.0, 0.0, params.get('type', 'MARKET'))
+
+    def _track(self, cid, symbol, side, quantity, filled, avg_price, order_type):
+        exposure = self._symbol(symbol)
+        if side == 'BUY':
+            exposure.open_buy += quantity - filled
+        else:
+            exposure.open_sell += quantity - filled
+        if order_type != 'MARKET':
+            self.resting += 1
+        self.orders[cid] = [symbol, side, quantity, filled, avg_price, order_type != 'MARKET']
+
+    def replace(self, cid, params):
+        """Re-check a resting order at its amended quantity/price; returns the old entry for restore()"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            old = self.orders.pop(cid, None)
+            if old is not None:
+                self._untrack(old)
+        filled, avg_price = (old[3], old[4]) if old is not None else (0.0, 0.0)
+        try:
+            # Only the unfilled remainder adds exposure
+            self.check(dict(params, newClientOrderId=cid, type=params.get('type', 'LIMIT'),
+                            quantity=float(params['quantity']) - filled))
+        except RiskLimitExceeded:
+            self.restore(cid, old)
+            raise
+        with self._lock:
+            tracked = self.orders[cid]
+            tracked[2], tracked[3], tracked[4] = float(params['quantity']), filled, avg_price
+        return old
+
+    def restore(self, cid, old):
+        """Undo replace() after the exchange rejected the amendment"""
+        with self._lock:
+            current = self.orders.pop(cid, None)
+            if current is not None:
+                self._untrack(current)
+            if old is not None:
+                self._track(cid, old[0], old[1], old[2], old[3], old[4], 'LIMIT' if old[5] else 'MARKET')
+
+    def _untrack(self, tracked):
+        symbol, side, quantity, filled, _, resting = tracked
+        exposure = self._symbol(symbol)
+        if side == 'BUY':
+            exposure.open_buy = max(0.0, exposure.open_buy - (quantity - filled))
+        else:
+            exposure.open_sell = max(0.0, exposure.open_sell - (quantity - filled))
+        if resting:
+            self.resting -= 1
+
+    def release(self, cid):
+        """Drop the reservation of an order the exchange does not have"""
+        self.update(Order(None, cid, None, None, None, 'REJECTED'))
+
+    def on_response(self, response):
+        """Apply an order response (or lookup result)"""
+        self.update(Order.from_raw(response))
+
+    def update(self, order, track=False):
+        """Apply an Order's status and cumulative fill to the counters"""
+        cid, status, filled, avg_price = order.client_order_id, order.status, order.filled, order.avg_price
+        with self._lock:
+            tracked = self.orders.get(cid)
+            if tracked is None:
+                if not track or (status in CLOSED_STATUSES and not filled):
+                    return
+                # placed elsewhere (web UI, another process): start tracking it
+                self._track(cid, order.symbol, order.side, order.quantity, 0.0, 0.0, order.type)
+                tracked = self.orders[cid]
+            if order.order_id is not None:
+                self.order_ids[order.order_id] = cid
+            symbol, side, quantity, seen, seen_avg, resting = tracked
+            exposure = self._symbol(symbol)
+            if filled > seen:
+                delta = filled - seen
+                price = (avg_price * filled - seen_avg * seen) / delta if seen else avg_price
+                if side == 'BUY':
+                    exposure.open_buy -= delta
+                else:
+                    exposure.open_sell -= delta
+                self._apply_fill(symbol, exposure, delta if side == 'BUY' else -delta, price)
+                tracked[3], tracked[4] = filled, avg_price
+            if status in CLOSED_STATUSES:
+                left = quantity - tracked[3]
+                if side == 'BUY':
+                    exposure.open_buy = max(0.0, exposure.open_buy - left)
+                else:
+                    exposure.open_sell = max(0.0, exposure.open_sell - left)
+                if resting:
+                    self.resting -= 1
+                del self.orders[cid]
+                self.order_ids.pop(order.order_id, None)
+
+    def _apply_fill(self, symbol, exposure, signed, price):
+        position = exposure.position
+        new_position = round(position + signed, 10)
+        if position == 0 or (position > 0) == (signed > 0):
+            exposure.entry_price = (exposure.entry_price * abs(position) + price * abs(signed)) / abs(new_position)
+        else:
+            closed = min(abs(position), abs(signed))
+            self.realized_today += (price - exposure.entry_price) * closed * (1 if position > 0 else -1)
+            if new_position == 0:
+                exposure.entry_price = 0.0
+            elif (new_position > 0) != (position > 0):
+                exposure.entry_price = price
+        exposure.position = new_position
+        mark = self.marks.get(symbol)
+        if mark is None:
+            mark = self.marks[symbol] = price
+        self.gross_notional += (abs(new_position) - abs(position)) * mark
+
+    def on_order_update(self, event):
+        """Handle ORDER_TRADE_UPDATE events from the user data stream"""
+        self.update(Order.from_event(event['o']), track=True)
+
+    def on_mark_price(self, event):
+        symbol = event['s']
+        price = float(event['p'])
+        with self._lock:
+            exposure = self.symbols.get(symbol)
+            if exposure is not None and exposure.position:
+                self.gross_notional += abs(exposure.position) * (price - self.marks.get(symbol, price))
+            self.marks[symbol] = price
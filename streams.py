@@ -0,0 +1,91 @@
+"""
+Binance Futures websocket streams shared by the bots.
+
+A single StreamHub owns the websocket manager and fans every event out to
+the listeners registered for its event type ('ORDER_TRADE_UPDATE',
+'ACCOUNT_UPDATE', 'markPriceUpdate', ...).
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class StreamHub:
+    def __init__(self, api_key, api_secret, testnet=True):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.testnet = testnet
+        self.twm = None
+        self.listeners = {}
+        self.taps = []
+        self.sockets = []
+        self.subscribed = set()
+        self._lock = threading.Lock()
+
+    def on(self, event_type, callback):
+        """Register a callback for an event type ('*' receives every event)"""
+        with self._lock:
+            self.listeners.setdefault(event_type, []).append(callback)
+
+    def start(self, streams=(), user_data=True):
+        """Start the websocket manager, the user data stream and any market streams"""
+        from binance import ThreadedWebsocketManager
+
+        if self.twm is None:
+            self.twm = ThreadedWebsocketManager(self.api_key, self.api_secret, testnet=self.testnet)
+            self.twm.start()
+            if user_data:
+                self.sockets.append(self.twm.start_futures_user_socket(callback=self.dispatch))
+        if streams:
+            self.add_streams(streams)
+        return self
+
+    def add_streams(self, streams):
+        """Subscribe to extra market streams, e.g. ['btcusdt@depth@100ms', '!markPrice@arr@1s']"""
+        if self.twm is None:
+            return self.start(streams=streams, user_data=False)
+        streams = [s for s in streams if s not in self.subscribed]
+        if not streams:
+            return None
+        self.subscribed.update(streams)
+        name = self.twm.start_futures_multiplex_socket(callback=self.dispatch, streams=list(streams))
+        self.sockets.append(name)
+        logger.info(f"Subscribed to streams: {', '.join(streams)}")
+        return name
+
+    def stop(self):
+        """Stop every socket"""
+        if self.twm is not None:
+            self.twm.stop()
+            self.twm = None
+            self.sockets = []
+            self.subscribed = set()
+
+    def tap(self, callback):
+        """Register a callback for every raw message before it is unpacked (e.g. a recorder)"""
+        with self._lock:
+            self.taps.append(callback)
+
+    def dispatch(self, msg):
+        """Route a raw websocket message to the registered listeners"""
+        for callback in self.taps:
+            callback(msg)
+        data = msg.get('data', msg) if isinstance(msg, dict) else msg
+        events = data if isinstance(data, list) else [data]
+        with self._lock:
+            catch_all = list(self.listeners.get('*', ()))
+        for event in events:
+            if not isinstance(event, dict):
+                continue
+            event_type = event.get('e')
+            if event_type == 'error':
+                logger.error(f"Stream error: {event.get('m')}")
+            with self._lock:
+                callbacks = list(self.listeners.get(event_type, ()))
+            for callback in callbacks + catch_all:
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.error(f"Stream listener error on {event_type}: {e}")
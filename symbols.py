@@ -0,0 +1,126 @@
+"""
+Local symbol index built from (cached) exchange info.
+
+Symbol entry is validated and completed without a round trip: exact lookup,
+prefix search over the sorted symbol list, base/quote asset lookup, status
+filtering and fuzzy matching for typos. Popularity comes from 24h quote
+volume, fetched for every symbol in one bulk ticker call and kept in the
+profile cache so a restart ranks symbols offline.
+"""
+
+import bisect
+import difflib
+import logging
+import time
+
+from models import SymbolSpec
+
+logger = logging.getLogger(__name__)
+
+TRADING = "TRADING"
+VOLUME_TTL = 3600
+VOLUMES_FILE = "volumes.json"
+FUZZY_CUTOFF = 0.6
+
+
+class SymbolIndex:
+    def __init__(self, specs):
+        self.specs = specs                  # symbol -> SymbolSpec
+        self.names = sorted(specs)
+        self.by_base = {}
+        self.by_quote = {}
+        for spec in specs.values():
+            self.by_base.setdefault(spec.base_asset, []).append(spec.symbol)
+            self.by_quote.setdefault(spec.quote_asset, []).append(spec.symbol)
+        self.volumes = {}                   # symbol -> 24h quote volume
+        self.volumes_at = 0.0
+
+    @classmethod
+    def from_exchange_info(cls, exchange_info):
+        return cls(SymbolSpec.index(exchange_info))
+
+    def __contains__(self, symbol):
+        return symbol in self.specs
+
+    def __len__(self):
+        return len(self.specs)
+
+    def get(self, symbol):
+        return self.specs.get(symbol)
+
+    def tradable(self, symbol):
+        """True if the symbol exists and is currently trading"""
+        spec = self.specs.get(symbol)
+        return spec is not None and spec.status == TRADING
+
+    def base(self, asset, status=TRADING):
+        """Symbols with this base asset (e.g. BTC -> BTCUSDT, BTCUSDC)"""
+        return self._filter(self.by_base.get(asset.upper(), ()), status)
+
+    def quote(self, asset, status=TRADING):
+        """Symbols quoted in this asset"""
+        return self._filter(self.by_quote.get(asset.upper(), ()), status)
+
+    def _filter(self, symbols, status):
+        if status is None:
+            return list(symbols)
+        return [symbol for symbol in symbols if self.specs[symbol].status == status]
+
+    def prefix(self, text, status=TRADING):
+        """Symbols starting with text, in name order"""
+        text = text.upper()
+        start = bisect.bisect_left(self.names, text)
+        end = bisect.bisect_left(self.names, text + "\uffff", start)
+        return self._filter(self.names[start:end], status)
+
+    def search(self, query, limit=10, status=TRADING):
+        """Best matches for what the user typed: exact, base asset, prefix, then fuzzy; busiest first within each"""
+        query = query.strip().upper()
+        if not query:
+            return []
+        rank = self._by_volume
+        results = []
+        seen = set()
+
+        def add(symbols):
+            for symbol in symbols:
+                if symbol not in seen:
+                    seen.add(symbol)
+                    results.append(symbol)
+
+        if query in self.specs and (status is None or self.specs[query].status == status):
+            add([query])
+        add(rank(self.base(query, status)))
+        add(rank(self.prefix(query, status)))
+        if len(results) < limit:
+            candidates = self._filter(self.names, status)
+            add(difflib.get_close_matches(query, candidates, n=limit, cutoff=FUZZY_CUTOFF))
+        return results[:limit]
+
+    def _by_volume(self, symbols):
+        volumes = self.volumes
+        return sorted(symbols, key=lambda symbol: -volumes.get(symbol, 0.0))
+
+    def load_volumes(self, client, cache=None, max_age=VOLUME_TTL):
+        """24h quote volume of every symbol from one bulk ticker call (or the profile cache)"""
+        if self.volumes and time.time() - self.volumes_at < max_age:
+            return self.volumes
+        if cache is not None:
+            entry = cache.read_entry(VOLUMES_FILE)
+            if entry is not None and entry[1] and time.time() - entry[0] < max_age:
+                self.volumes_at, self.volumes = entry
+                return self.volumes
+        tickers = client.futures_ticker()
+        self.volumes = {ticker['symbol']: float(ticker.get('quoteVolume') or 0) for ticker in tickers}
+        self.volumes_at = time.time()
+        if cache is not None:
+            cache.write(VOLUMES_FILE, self.volumes)
+        logger.info(f"24h volumes loaded for {len(self.volumes)} symbols")
+        return self.volumes
+
+    def popular(self, count=10, quote="USDT"):
+        """The most traded symbols by 24h quote volume, or [] before volumes are loaded"""
+        if not self.volumes:
+            return []
+        symbols = self.quote(quote) if quote else self._filter(self.names, TRADING)
+        return [symbol for symbol in self._by_volume(symbols) if self.volumes.get(symbol)][:count]
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Transaction cost analysis of the account's fills.
+
+Syncs fills (futures_account_trades), orders and 1m klines into the local
+history (history.py), loads each symbol's fills as array columns and
+computes, per symbol and overall:
+  - slippage: fill VWAP of each order vs the arrival price (market price
+    when the order was created), in bps, positive = cost
+  - limit order fill rate: filled / ordered quantity, and fully filled share
+  - fees: commission in USDT and bps of notional, maker share; fees paid
+    in another asset (BNB) are valued at its USDT price at the fill, or
+    listed unconverted when that price is not available
+  - markouts: price move after each fill at several horizons, in bps,
+    positive = the market moved in our favour
+Prices come from 1m klines, interpolated between open and close. Fills are
+in time order, so markout prices are sampled in one forward walk over the
+klines instead of a search per fill.
+
+Usage: python tca.py --symbols BTCUSDT,ETHUSDT --days 30 --csv tca.csv --html tca.html [--profile NAME | --mainnet] [--no-sync]
+"""
+
+import argparse
+import csv
+import html
+import logging
+import os
+import sys
+import time
+from bisect import bisect_right
+from datetime import datetime
+from itertools import compress
+from operator import mul
+
+from history import KLINE_MS, OrderHistory
+from profiles import ProfileError, resolve_profile
+
+logger = logging.getLogger(__name__)
+
+HORIZONS = (60, 300, 1800)
+QUOTE_ASSETS = ("USDT", "USDC", "BUSD", "FDUSD")
+FEE_QUOTE = "USDT"          # other commission assets are valued via their <asset>USDT klines
+TERMINAL_STATUSES = ("FILLED", "CANCELED", "EXPIRED")
+
+FIELDS = ["symbol", "fills", "orders", "quantity", "notional", "buy_notional", "sell_notional", "fees",
+          "fee_bps", "unconverted_fees", "maker_pct", "realized_pnl", "slippage_bps", "limit_orders", "fill_rate_pct",
+          "full_fill_pct"] + [f"markout_{h}s_bps" for h in HORIZONS]
+
+
+class PriceSeries:
+    """1m kline prices of one symbol, interpolated linearly from open to close within each minute"""
+
+    def __init__(self, times, opens, closes):
+        self.times = times
+        self.opens = opens
+        self.closes = closes
+
+    def _interpolate(self, i, t):
+        frac = (t - self.times[i]) / KLINE_MS
+        if frac > 2:
+            return None  # gap in the klines
+        return self.opens[i] + (self.closes[i] - self.opens[i]) * min(frac, 1.0)
+
+    def at(self, t):
+        """Price at time t (ms), or None outside the stored klines"""
+        i = bisect_right(self.times, t) - 1
+        return self._interpolate(i, t) if i >= 0 else None
+
+    def sample(self, times):
+        """Prices at ascending times, walking the klines once"""
+        out = []
+        append = out.append
+        kline_times, opens, closes = self.times, self.opens, self.closes
+        n = len(kline_times)
+        i = -1
+        next_open = kline_times[0] if n else None
+        for t in times:
+            if next_open is not None and next_open <= t:
+                while i + 1 < n and kline_times[i + 1] <= t:
+                    i += 1
+                next_open = kline_times[i + 1] if i + 1 < n else None
+            if i < 0:
+                append(None)
+                continue
+            frac = (t - kline_times[i]) / KLINE_MS
+            if frac > 2:
+                append(None)
+            else:
+                append(opens[i] + (closes[i] - opens[i]) * (frac if frac < 1.0 else 1.0))
+        return out
+
+
+def new_totals():
+    return {"fills": 0, "orders": 0, "quantity": 0.0, "notional": 0.0, "buy_notional": 0.0, "sell_notional": 0.0,
+            "fees": 0.0, "unconverted_fees": {}, "maker_notional": 0.0, "realized_pnl": 0.0, "slippage": 0.0, "slippage_notional": 0.0,
+            "limit_orders": 0, "limit_full": 0, "limit_quantity": 0.0, "limit_filled": 0.0,
+            "markout": [0.0] * len(HORIZONS), "markout_notional": [0.0] * len(HORIZONS)}
+
+
+def fee_assets(fills):
+    """Commission assets of the fills that are not quote assets (e.g. BNB)"""
+    return set(fills["commission_asset"]).difference(QUOTE_ASSETS, (None,))
+
+
+def accumulate(fills, orders, prices, now, fee_prices=None):
+    """Sum one symbol's fills (history.fill_columns) and orders (Order list) into a totals dict
+
+    fee_prices: {asset: PriceSeries of <asset>USDT} to value commissions paid in other assets
+    """
+    totals = new_totals()
+    price, qty, sign, times = fills["price"], fills["quantity"], fills["sign"], fills["time"]
+    totals["fills"] = len(price)
+
+    # Whole-column sums run in C (map/compress/sum); only per-order grouping loops in Python
+    notionals = list(map(mul, price, qty))
+    buys = [s > 0 for s in sign]
+    totals["quantity"] = sum(qty)
+    totals["notional"] = sum(notionals)
+    totals["buy_notional"] = sum(compress(notionals, buys))
+    totals["sell_notional"] = totals["notional"] - totals["buy_notional"]
+    commissions, assets = fills["commission"], fills["commission_asset"]
+    quoted = list(map(QUOTE_ASSETS.__contains__, assets))
+    totals["fees"] = sum(compress(commissions, quoted))
+    if not all(quoted):
+        fee_prices = fee_prices or {}
+        unconverted = totals["unconverted_fees"]
+        for commission, asset, t, is_quote in zip(commissions, assets, times, quoted):
+            if is_quote:
+                continue
+            series = fee_prices.get(asset)
+            value = series.at(t) if series is not None else None
+            if value:
+                totals["fees"] += commission * value
+            else:
+                unconverted[asset] = unconverted.get(asset, 0.0) + commission
+    totals["maker_notional"] = sum(compress(notionals, fills["maker"]))
+    totals["realized_pnl"] = sum(fills["realized_pnl"])
+
+    per_order = {}
+    for order_id, side, notional, quantity, t in zip(fills["order_id"], sign, notionals, qty, times):
+        entry = per_order.get(order_id)
+        if entry is None:
+            per_order[order_id] = [side, notional, quantity, t]
+        else:
+            entry[1] += notional
+            entry[2] += quantity
+
+    for h, horizon in enumerate(HORIZONS):
+        horizon_ms = horizon * 1000
+        later = prices.sample([t + horizon_ms for t in times])
+        total = weight = 0.0
+        for t, side, p, notional, moved in zip(times, sign, price, notionals, later):
+            if moved is None or t + horizon_ms > now:
+                continue
+            total += side * (moved - p) / p * 1e4 * notional
+            weight += notional
+        totals["markout"][h] = total
+        totals["markout_notional"][h] = weight
+
+    # Slippage of each order's fill VWAP against the price when it was created
+    by_id = {o.order_id: o for o in orders}
+    totals["orders"] = len(per_order)
+    for order_id, (side, notional, quantity, first_fill) in per_order.items():
+        order = by_id.get(order_id)
+        arrival = prices.at(order.time if order is not None else first_fill)
+        if not arrival:
+            continue
+        totals["slippage"] += side * (notional / quantity - arrival) / arrival * 1e4 * notional
+        totals["slippage_notional"] += notional
+
+    for order in orders:
+        if order.type == "LIMIT" and order.status in TERMINAL_STATUSES and order.quantity:
+            totals["limit_orders"] += 1
+            totals["limit_full"] += order.status == "FILLED"
+            totals["limit_quantity"] += order.quantity
+            totals["limit_filled"] += order.filled
+    return totals
+
+
+def merge(all_totals):
+    merged = new_totals()
+    for totals in all_totals:
+        for key, value in totals.items():
+            if isinstance(value, list):
+                merged[key] = [a + b for a, b in zip(merged[key], value)]
+            elif isinstance(value, dict):
+                for asset, amount in value.items():
+                    merged[key][asset] = merged[key].get(asset, 0.0) + amount
+            else:
+                merged[key] += value
+    return merged
+
+
+def _ratio(num, den, scale=1.0):
+    return round(num / den * scale, 4) if den else None
+
+
+def metrics(symbol, totals):
+    """Report row of derived metrics from a totals dict"""
+    row = {
+        "symbol": symbol,
+        "fills": totals["fills"],
+        "orders": totals["orders"],
+        "quantity": round(totals["quantity"], 8),
+        "notional": round(totals["notional"], 2),
+        "buy_notional": round(totals["buy_notional"], 2),
+        "sell_notional": round(totals["sell_notional"], 2),
+        "fees": round(totals["fees"], 8),
+        "fee_bps": _ratio(totals["fees"], totals["notional"], 1e4),
+        "unconverted_fees": " ".join(f"{amount:.8g} {asset}" for asset, amount in sorted(totals["unconverted_fees"].items())),
+        "maker_pct": _ratio(totals["maker_notional"], totals["notional"], 100),
+        "realized_pnl": round(totals["realized_pnl"], 8),
+        "slippage_bps": _ratio(totals["slippage"], totals["slippage_notional"]),
+        "limit_orders": totals["limit_orders"],
+        "fill_rate_pct": _ratio(totals["limit_filled"], totals["limit_quantity"], 100),
+        "full_fill_pct": _ratio(totals["limit_full"], totals["limit_orders"], 100),
+    }
+    for h, horizon in enumerate(HORIZONS):
+        row[f"markout_{horizon}s_bps"] = _ratio(totals["markout"][h], totals["markout_notional"][h])
+    return row
+
+
+def analyze(history, symbols, start=None, end=None):
+    """Report rows per symbol with fills, plus an 'ALL' row"""
+    now = int(time.time() * 1000)
+    rows, per_symbol = [], []
+    for symbol in symbols:
+        fills = history.fill_columns(symbol, start, end)
+        if not len(fills["time"]):
+            continue
+        orders = history.query(symbol=symbol, start=start, end=end)
+        first = min(fills["time"][0], orders[0].time if orders else fills["time"][0])
+        prices = PriceSeries(*history.klines(symbol, first - KLINE_MS, fills["time"][-1] + max(HORIZONS) * 1000))
+        fee_prices = {asset: PriceSeries(*history.klines(f"{asset}{FEE_QUOTE}", fills["time"][0] - KLINE_MS,
+                                                         fills["time"][-1]))
+                      for asset in fee_assets(fills)}
+        totals = accumulate(fills, orders, prices, now, fee_prices)
+        per_symbol.append(totals)
+        rows.append(metrics(symbol, totals))
+    if rows:
+        rows.append(metrics("ALL", merge(per_symbol)))
+    return rows
+
+
+def sync(history, client, symbols, start):
+    """Bring fills, orders and the klines around them up to date"""
+    now = int(time.time() * 1000)
+    for symbol in symbols:
+        history.sync_fills(client, symbol)
+        history.sync(client, symbol)
+        fills = history.fill_columns(symbol, start)
+        if len(fills["time"]):
+            orders = history.query(symbol=symbol, start=start)
+            first = min(fills["time"][0], orders[0].time if orders else fills["time"][0])
+            end = min(now, fills["time"][-1] + max(HORIZONS) * 1000)
+            history.sync_klines(client, symbol, first - KLINE_MS, end)
+            for asset in fee_assets(fills):
+                try:
+                    history.sync_klines(client, f"{asset}{FEE_QUOTE}", fills["time"][0] - KLINE_MS, fills["time"][-1])
+                except Exception as e:
+                    logger.warning(f"No {asset}{FEE_QUOTE} prices to value {asset} fees: {e}")
+
+
+def write_csv(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_html(rows, path, title):
+    def cell(value):
+        return "" if value is None else html.escape(f"{value:,}" if isinstance(value, (int, float)) else str(value))
+
+    lines = [
+        "<!DOCTYPE html>", "<html><head><meta charset='utf-8'>", f"<title>{html.escape(title)}</title>",
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+        "th,td{border:1px solid #ccc;padding:4px 8px;text-align:right}th{background:#f0f0f0}"
+        "td:first-child{text-align:left;font-weight:bold}tr:last-child{background:#fafae0}</style>",
+        "</head><body>", f"<h1>{html.escape(title)}</h1>",
+        f"<p>Generated {datetime.now():%Y-%m-%d %H:%M:%S}. Slippage is against the arrival price "
+        f"(positive = cost); markouts are the price move after each fill (positive = in our favour).</p>",
+        "<table>", "<tr>" + "".join(f"<th>{html.escape(name)}</th>" for name in FIELDS) + "</tr>",
+    ]
+    for row in rows:
+        lines.append("<tr>" + "".join(f"<td>{cell(row[name])}</td>" for name in FIELDS) + "</tr>")
+    lines += ["</table>", "</body></html>"]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def print_summary(rows):
+    def fmt(value, spec):
+        return "n/a" if value is None else format(value, spec)
+
+    print(f"\n{'Symbol':<12}{'Fills':>8}{'Notional':>16}{'Fees':>12}{'Fee bps':>9}{'Maker%':>8}"
+          f"{'Slip bps':>10}{'Fill%':>8}" + "".join(f"{f'MO {h}s':>10}" for h in HORIZONS))
+    for row in rows:
+        print(f"{row['symbol']:<12}{row['fills']:>8}{row['notional']:>16,.2f}{row['fees']:>12,.4f}"
+              f"{fmt(row['fee_bps'], '>9.2f')}{fmt(row['maker_pct'], '>8.1f')}{fmt(row['slippage_bps'], '>10.2f')}"
+              f"{fmt(row['fill_rate_pct'], '>8.1f')}"
+              + "".join(fmt(row[f'markout_{h}s_bps'], '>10.2f') for h in HORIZONS))
+    if rows and rows[-1]["unconverted_fees"]:
+        print(f"\n⚠️  Fees without a USDT price, not in Fees / Fee bps: {rows[-1]['unconverted_fees']}")
+
+
+def main():
+    from binance.client import Client
+    from dotenv import load_dotenv
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    parser = argparse.ArgumentParser(description="Transaction cost analysis of account fills")
+    parser.add_argument("--symbols", default="", help="comma-separated symbols (default: the profile's, else BTCUSDT)")
+    parser.add_argument("--days", type=float, default=30, help="analyze fills of the last N days (default: 30)")
+    parser.add_argument("--csv", help="write the report as CSV")
+    parser.add_argument("--html", help="write the report as HTML")
+    parser.add_argument("--mainnet", action="store_true", help="Use mainnet (default: testnet)")
+    parser.add_argument("--profile", help="Profile from profiles.json (default: the file's default profile)")
+    parser.add_argument("--no-sync", action="store_true", help="only use the local history")
+    args = parser.parse_args()
+
+    try:
+        profile = resolve_profile(args.profile, testnet=False if args.mainnet else None)
+    except ProfileError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()] or profile.symbols or ["BTCUSDT"]
+    start = int((time.time() - args.days * 86400) * 1000)
+    history = OrderHistory(profile.path("orders.db"))
+    if not args.no_sync:
+        load_dotenv()
+        client = Client(os.getenv("API_KEY"), os.getenv("API_SECRET"), testnet=profile.testnet)
+        sync(history, client, symbols, start)
+
+    started = time.perf_counter()
+    rows = analyze(history, symbols, start)
+    elapsed = time.perf_counter() - started
+    if not rows:
+        print(f"ℹ️  No fills for {', '.join(symbols)} in the last {args.days:g} days")
+        return 0
+    print_summary(rows)
+    print(f"\n⏱️  Analyzed {rows[-1]['fills']:,} fills in {elapsed:.2f}s")
+    if args.csv:
+        write_csv(rows, args.csv)
+        print(f"📄 CSV report: {args.csv}")
+    if args.html:
+        write_html(rows, args.html, f"TCA report ({profile.name}, last {args.days:g} days)")
+        print(f"📄 HTML report: {args.html}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
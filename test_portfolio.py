@@ -0,0 +1,87 @@
+"""
+Portfolio event-ordering checks.
+
+One fill reaches the user data stream twice: as the absolute ACCOUNT_UPDATE
+snapshot and as the ORDER_TRADE_UPDATE trade. The exchange usually sends the
+snapshot first but does not promise it, so each pair is replayed in both
+arrival orders and must leave the same position, wallet, PnL and fees.
+
+  pytest test_portfolio.py
+"""
+
+import itertools
+
+from portfolio import Portfolio
+
+WHEN = 1700000000000
+
+
+def account_update(symbol, amount, entry, wallet, position_side="BOTH", when=WHEN):
+    return {'e': 'ACCOUNT_UPDATE', 'E': when + 5, 'T': when, 'a': {
+        'm': 'ORDER',
+        'B': [{'a': 'USDT', 'wb': str(wallet), 'cw': str(wallet)}],
+        'P': [{'s': symbol, 'pa': str(amount), 'ep': str(entry), 'ps': position_side}],
+    }}
+
+
+def order_update(symbol, side, quantity, price, trade_id, commission=0.0, asset='USDT', realized=0.0,
+                 position_side="BOTH", when=WHEN):
+    return {'e': 'ORDER_TRADE_UPDATE', 'E': when + 5, 'T': when, 'o': {
+        's': symbol, 'c': f'test{trade_id}', 'S': side, 'o': 'MARKET', 'q': str(quantity), 'p': '0',
+        'ap': str(price), 'sp': '0', 'x': 'TRADE', 'X': 'FILLED', 'i': trade_id, 'l': str(quantity),
+        'z': str(quantity), 'L': str(price), 'n': str(commission), 'N': asset, 'T': when, 't': trade_id,
+        'rp': str(realized), 'm': False, 'ps': position_side,
+    }}
+
+
+def replay(events, wallet=1000.0):
+    portfolio = Portfolio(wallet_balance=wallet)
+    portfolio.leverage['BTCUSDT'] = 20
+    for event in events:
+        if event['e'] == 'ACCOUNT_UPDATE':
+            portfolio.on_account_update(event)
+        else:
+            portfolio.on_order_update(event)
+    return portfolio
+
+
+def state(portfolio):
+    return (portfolio.get_position('BTCUSDT'), round(portfolio.wallet_balance, 8),
+            round(portfolio.realized_pnl, 8), round(portfolio.fees, 8), tuple(sorted(portfolio.other_fees.items())))
+
+
+def test_open_both_orders():
+    pair = [account_update('BTCUSDT', 1, 40000, 999.96),
+            order_update('BTCUSDT', 'BUY', 1, 40000, 1, commission=0.04)]
+    results = {state(replay(order)) for order in itertools.permutations(pair)}
+    assert results == {(1.0, 999.96, 0.0, 0.04, ())}
+
+
+def test_close_both_orders():
+    opened = [account_update('BTCUSDT', 1, 40000, 999.96, when=WHEN - 1000),
+              order_update('BTCUSDT', 'BUY', 1, 40000, 1, commission=0.04, when=WHEN - 1000)]
+    pair = [account_update('BTCUSDT', 0, 0, 1099.92),
+            order_update('BTCUSDT', 'SELL', 1, 40100, 2, commission=0.04, realized=100.0)]
+    results = {state(replay(opened + list(order))) for order in itertools.permutations(pair)}
+    assert results == {(0.0, 1099.92, 100.0, 0.08, ())}
+
+
+def test_hedge_legs_kept_apart():
+    events = [account_update('BTCUSDT', 1, 40000, 1000, position_side='LONG'),
+              account_update('BTCUSDT', -2, 40100, 1000, position_side='SHORT')]
+    portfolio = replay(events)
+    legs = {(pos.position_side, pos.amount) for pos in portfolio.active_positions()}
+    assert legs == {('LONG', 1.0), ('SHORT', -2.0)}
+    assert portfolio.get_position('BTCUSDT') == -1.0
+
+
+def test_new_position_uses_account_leverage():
+    portfolio = replay([order_update('BTCUSDT', 'BUY', 1, 40000, 1)])
+    assert portfolio.active_positions()[0].leverage == 20
+
+
+def test_non_usdt_commission_recorded():
+    pair = [account_update('BTCUSDT', 1, 40000, 1000),
+            order_update('BTCUSDT', 'BUY', 1, 40000, 1, commission=0.0001, asset='BNB')]
+    results = {state(replay(order)) for order in itertools.permutations(pair)}
+    assert results == {(1.0, 1000.0, 0.0, 0.0, (('BNB', 0.0001),))}
@@ -0,0 +1,246 @@
+"""
+Rounding regression harness over a saved exchangeInfo snapshot.
+
+Every symbol's LOT_SIZE / PRICE_FILTER is swept with random quantities and
+prices through BasicBot._round_quantity/_round_price and through the order
+parameters the interactive bot's place_order builds. What would actually be sent (signing.format_value of the
+result) is compared against an exact integer-ratio reference, so float
+artefacts like 0.3 // 0.1 == 2.0 or a hard-coded round(x, 2) show up as
+failures.
+The sweep is split into per-symbol batches run on all cores; no API calls
+are made unless --save is given. Under pytest each rounding function is a
+test swept in-process over exchange_info_sample.json.
+
+  pytest test_precision.py                                  # TEST_SAMPLES inputs per function
+  python test_precision.py                                  # exchange_info_sample.json, 1M inputs
+  python test_precision.py --snapshot info.json -n 5000000
+  python test_precision.py --save info.json [--mainnet]     # snapshot the live exchangeInfo
+"""
+
+import argparse
+import functools
+import json
+import math
+import os
+import random
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+from signing import format_value
+
+DEFAULT_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exchange_info_sample.json")
+MAX_EXAMPLES = 5
+TEST_SAMPLES = 20000
+
+# (name, bot, method or function below taking the bot, filter, step key, bounds keys, rounding)
+CASES = [
+    ("BasicBot._round_quantity", "basic", "_round_quantity", "LOT_SIZE", "stepSize", ("minQty", "maxQty"), "floor"),
+    ("BasicBot._round_price", "basic", "_round_price", "PRICE_FILTER", "tickSize", ("minPrice", "maxPrice"), "floor"),
+    ("InteractiveTradingBot._round_quantity", "interactive", "_round_quantity", "LOT_SIZE", "stepSize", ("minQty", "maxQty"), "ceil"),
+    ("InteractiveTradingBot.place_order price", "interactive", "limit_price", "PRICE_FILTER", "tickSize", None, "nearest"),
+    ("InteractiveTradingBot.place_order stopPrice", "interactive", "stop_price", "PRICE_FILTER", "tickSize", None, "nearest"),
+]
+
+_bots = {}
+
+
+def load_snapshot(path):
+    with open(path) as f:
+        info = json.load(f)
+    return info
+
+
+def save_snapshot(path, mainnet=False):
+    """Download the live futures exchangeInfo to path"""
+    from binance.client import Client
+    from dotenv import load_dotenv
+    load_dotenv()
+    client = Client(os.getenv('API_KEY'), os.getenv('API_SECRET'), testnet=not mainnet)
+    info = client.futures_exchange_info()
+    with open(path, "w") as f:
+        json.dump(info, f, indent=1)
+    print(f"✅ Saved {len(info['symbols'])} symbols to {path}")
+
+
+def _init_worker(path):
+    """Build the bots without connecting: only exchange_info is needed for rounding"""
+    from bot import BasicBot
+    from interactive_trade import InteractiveTradingBot
+    from models import SymbolSpec
+    info = load_snapshot(path)
+    for key, cls in (("basic", BasicBot), ("interactive", InteractiveTradingBot)):
+        bot = cls.__new__(cls)
+        bot.exchange_info = info
+        bot.specs = SymbolSpec.index(info)
+        _bots[key] = bot
+
+
+def limit_price(bot, symbol, price):
+    return bot._order_params(symbol, "BUY", "LIMIT", 1.0, price=price)["price"]
+
+
+def stop_price(bot, symbol, price):
+    return bot._order_params(symbol, "SELL", "STOP_MARKET", 1.0, stop_price=price)["stopPrice"]
+
+
+def ratio(text):
+    """Exact (numerator, denominator) of a decimal string"""
+    return Decimal(text).as_integer_ratio()
+
+
+def reference(value, step, rounding, bounds=None):
+    """Exact expected result for value rounded to step, as (numerator, denominator)"""
+    vn, vd = ratio(repr(value))
+    if bounds:
+        (ln, ld), (hn, hd) = bounds
+        if vn * ld < ln * vd:
+            vn, vd = ln, ld
+        elif vn * hd > hn * vd:
+            vn, vd = hn, hd
+    sn, sd = step
+    num, den = vn * sd, vd * sn
+    if rounding == "floor":
+        units = num // den
+    elif rounding == "ceil":
+        units = -(-num // den)
+    else:
+        units, rest = divmod(num, den)
+        if 2 * rest > den or (2 * rest == den and units % 2):  # ties to even
+            units += 1
+    return units * sn, sd
+
+
+def generate(rng, step, low, high, count):
+    """Random inputs: log-uniform floats, exact grid values and grid midpoints"""
+    step_dec = Decimal(step)
+    low, high = math.log(low / 2), math.log(high * 1.1)
+    for i in range(count):
+        value = math.exp(rng.uniform(low, high))
+        kind = i % 3
+        if kind:
+            units = Decimal(int(value / float(step_dec)))
+            if kind == 2:
+                units += Decimal("0.5")
+            value = float(units * step_dec)
+        yield value
+
+
+def sweep(task):
+    """Run one (case, symbol) batch; returns (case, symbol, count, failures)"""
+    case_index, symbol, filters, count, seed = task
+    name, bot_key, method, filter_type, step_key, bound_keys, rounding = CASES[case_index]
+    bot = _bots[bot_key]
+    fn = getattr(bot, method) if hasattr(bot, method) else functools.partial(globals()[method], bot)
+    spec = filters[filter_type]
+    step = ratio(spec[step_key])
+    bounds = (ratio(spec[bound_keys[0]]), ratio(spec[bound_keys[1]])) if bound_keys else None
+    low = float(spec.get("minQty") or spec.get("minPrice") or spec[step_key]) or float(spec[step_key])
+    high = float(spec.get("maxQty") or spec.get("maxPrice") or 0) or low * 1e6
+    failures = []
+    for value in generate(random.Random(seed), spec[step_key], low, high, count):
+        expected = reference(value, step, rounding, bounds)
+        try:
+            sent = format_value(fn(symbol, value))
+            sn, sd = ratio(sent)
+            ok = sn * expected[1] == expected[0] * sd
+        except Exception as e:
+            sent, ok = f"{type(e).__name__}: {e}", False
+        if not ok:
+            failures.append((value, sent, str(Decimal(expected[0]) / Decimal(expected[1]))))
+    return name, symbol, count, failures
+
+
+def build_tasks(info, samples, seed):
+    tasks = []
+    symbols = [s for s in info["symbols"]
+               if {"LOT_SIZE", "PRICE_FILTER"} <= {f["filterType"] for f in s["filters"]}]
+    per_batch = max(1, samples // (len(symbols) * len(CASES)))
+    for s in symbols:
+        filters = {f["filterType"]: f for f in s["filters"]}
+        for i in range(len(CASES)):
+            tasks.append((i, s["symbol"], filters, per_batch, seed ^ zlib.crc32(f"{i}{s['symbol']}".encode())))
+    return tasks, len(symbols)
+
+
+def run_case(case_index, samples=TEST_SAMPLES, seed=1, path=DEFAULT_SNAPSHOT):
+    """Sweep one rounding function in this process; returns [(symbol, value, sent, expected)]"""
+    if not _bots:
+        _init_worker(path)
+    tasks, _ = build_tasks(load_snapshot(path), samples * len(CASES), seed)
+    failed = []
+    for task in tasks:
+        if task[0] == case_index:
+            _, symbol, _, failures = sweep(task)
+            failed += [(symbol,) + failure for failure in failures]
+    return failed
+
+
+def test_basic_round_quantity():
+    failed = run_case(0)
+    assert not failed, failed[:MAX_EXAMPLES]
+
+
+def test_basic_round_price():
+    failed = run_case(1)
+    assert not failed, failed[:MAX_EXAMPLES]
+
+
+def test_interactive_round_quantity():
+    failed = run_case(2)
+    assert not failed, failed[:MAX_EXAMPLES]
+
+
+def test_interactive_limit_price():
+    failed = run_case(3)
+    assert not failed, failed[:MAX_EXAMPLES]
+
+
+def test_interactive_stop_price():
+    failed = run_case(4)
+    assert not failed, failed[:MAX_EXAMPLES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep every symbol's filters through the bots' rounding")
+    parser.add_argument("--snapshot", default=DEFAULT_SNAPSHOT, help="exchangeInfo JSON file")
+    parser.add_argument("-n", "--samples", type=int, default=1_000_000, help="total random inputs")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--save", metavar="PATH", help="save the live exchangeInfo to PATH and exit")
+    parser.add_argument("--mainnet", action="store_true", help="snapshot mainnet instead of testnet (with --save)")
+    args = parser.parse_args()
+
+    if args.save:
+        save_snapshot(args.save, args.mainnet)
+        return 0
+
+    info = load_snapshot(args.snapshot)
+    tasks, n_symbols = build_tasks(info, args.samples, args.seed)
+    print(f"🔍 Sweeping {n_symbols} symbols x {len(CASES)} rounding functions from {args.snapshot}")
+
+    start = time.perf_counter()
+    totals, failed = {}, {}
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.snapshot,)) as pool:
+        for name, symbol, count, failures in pool.map(sweep, tasks, chunksize=4):
+            totals[name] = totals.get(name, 0) + count
+            if failures:
+                failed.setdefault(name, []).append((symbol, failures))
+    elapsed = time.perf_counter() - start
+
+    checked = sum(totals.values())
+    print(f"Checked {checked:,} inputs in {elapsed:.2f}s ({checked / elapsed:,.0f}/s)\n")
+    for name, _, _, _, _, _, _ in CASES:
+        bad = failed.get(name, [])
+        count = sum(len(f) for _, f in bad)
+        print(f"{'❌' if bad else '✅'} {name}: {count:,} / {totals.get(name, 0):,} wrong")
+        for symbol, failures in bad[:MAX_EXAMPLES]:
+            value, sent, expected = failures[0]
+            print(f"     {symbol}: {value!r} -> {sent} (expected {expected}, {len(failures)} failures)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,4 +7,4 @@ if "%VIRTUAL_ENV%"=="" (
     exit /b 1
 )
 
-python "%~dp0trade.py" %*
+python "%~dp0trade_client.py" %*
@@ -5,12 +5,28 @@ Usage: python trade.py [command] [options]
 """
 
 import argparse
+import contextlib
 import os
 import sys
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from dotenv import load_dotenv
+from clock import ClockSync
 import logging
+from datetime import datetime, timedelta, timezone
+import alerts
+from batch import DEFAULT_CONCURRENCY, BatchRunner
+from funding import FundingTracker
+from guard import CircuitOpen, ExchangeGuard
+from history import OrderHistory
+from journal import OrderJournal
+from models import Order, Position
+from portfolio import Portfolio
+import profiler
+from profiles import ProfileError, resolve_profile
+from retry import OrderSender
+from risk import RiskEngine, RiskLimitExceeded
+from signing import FastOrderClient
 
 # Load environment variables
 load_dotenv()
@@ -20,7 +36,7 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(me
 logger = logging.getLogger(__name__)
 
 class TradingBot:
-    def __init__(self, testnet=True):
+    def __init__(self, testnet=True, profile=None):
         self.api_key = os.getenv("API_KEY")
         self.api_secret = os.getenv("API_SECRET")
         
@@ -28,18 +44,47 @@ class TradingBot:
             print("❌ Error: API_KEY and API_SECRET not found in .env file")
             sys.exit(1)
         
-        self.testnet = testnet
-        self.client = Client(self.api_key, self.api_secret, testnet=testnet)
+        self.profile = profile or resolve_profile(testnet=testnet)
+        self.testnet = testnet = self.profile.testnet
+        self.guard = ExchangeGuard(store=self.profile.cache)
+        self.client = self.guard.wrap(Client(self.api_key, self.api_secret, testnet=testnet))
+        self.clock = ClockSync(self.client).start()
         
-        # Get exchange info for validation
+        # Get exchange info for validation (warm from the profile cache)
         try:
-            self.exchange_info = self.client.futures_exchange_info()
+            self.exchange_info = self.profile.cache.exchange_info(self.client)
             env_name = "TESTNET" if testnet else "MAINNET"
-            print(f"✅ Connected to Binance Futures {env_name}")
+            print(f"✅ Connected to Binance Futures {env_name} ({self.profile.name})")
         except Exception as e:
             print(f"❌ Connection failed: {e}")
             sys.exit(1)
 
+        self.portfolio = None
+        self.funding = None
+        self.history = None
+        self.journal = OrderJournal(self.profile.path("orders.journal"))
+        self.journal.recover(self.client)
+        self.risk = RiskEngine(self.profile.risk_limits())
+        if self.risk.enabled:
+            self.risk.load(self.client)
+        self.sender = OrderSender(FastOrderClient(self.client, clock=self.clock, guard=self.guard), self.journal, risk=self.risk)
+        self.alerts = alerts.from_env()
+        if self.alerts is not None:
+            self.alerts.instrument(sender=self.sender, log=logger)
+
+    def get_portfolio(self):
+        """Load the local portfolio on first use"""
+        if self.portfolio is None:
+            self.portfolio = Portfolio.from_client(self.client)
+        return self.portfolio
+
+    def get_funding(self):
+        """Load funding rates and past funding payments on first use"""
+        if self.funding is None:
+            self.funding = FundingTracker(self.get_portfolio())
+            self.funding.load(self.client)
+        return self.funding
+
     def buy(self, symbol="BTCUSDT", amount=0.001, price=None):
         """Place a BUY order"""
         if price:
@@ -57,40 +102,52 @@ class TradingBot:
     def status(self):
         """Show account status"""
         try:
-            account = self.client.futures_account()
-            balance = account.get('totalWalletBalance', '0')
-            available = account.get('availableBalance', '0')
+            portfolio = self.get_portfolio()
+            if portfolio.stale_age is not None:
+                print(f"⚠️  Exchange unreachable, showing cached data from {portfolio.stale_age:.0f}s ago")
             
-            print(f"💰 Balance: {balance} USDT")
-            print(f"💳 Available: {available} USDT")
+            print(f"💰 Balance: {portfolio.wallet_balance:.8f} USDT")
+            print(f"💳 Available: {portfolio.available_balance:.8f} USDT")
             
             # Show positions
-            positions = self.client.futures_position_information()
-            active_positions = [pos for pos in positions if float(pos['positionAmt']) != 0]
+            active_positions = portfolio.active_positions()
             
             if active_positions:
                 print("\n📊 Active Positions:")
                 for pos in active_positions:
-                    size = pos['positionAmt']
-                    symbol = pos['symbol']
-                    entry = pos['entryPrice']
-                    pnl = pos['unRealizedProfit']
-                    side = "LONG" if float(size) > 0 else "SHORT"
-                    print(f"   {symbol}: {side} {abs(float(size))} @ {entry} (PnL: {pnl})")
+                    print(f"   {pos.symbol}: {pos.side} {abs(pos.amount)} @ {pos.entry_price} (PnL: {pos.unrealized_pnl:.8f})")
+                funding = self.get_funding()
+                print("\n💸 Funding:")
+                for symbol, rate, next_time, projected in funding.projections():
+                    at = datetime.fromtimestamp(next_time / 1000).strftime('%H:%M')
+                    print(f"   {symbol}: {rate * 100:+.4f}% at {at} -> {projected:+.8f} USDT "
+                          f"(paid last {funding.days}d: {funding.cost(symbol):+.8f})")
+                print(f"   Projected at next funding: {funding.projected_total:+.8f} USDT")
+                if funding.settled:
+                    print(f"   Booked by the exchange since start: {funding.settled:+.8f} USDT")
             else:
                 print("\n📊 No active positions")
                 
         except Exception as e:
             print(f"❌ Error getting status: {e}")
 
-    def orders(self, symbol="BTCUSDT", limit=5):
-        """Show recent orders"""
+    def get_history(self):
+        """Open the local order history on first use"""
+        if self.history is None:
+            self.history = OrderHistory(self.profile.path("orders.db"))
+        return self.history
+
+    def orders(self, symbol="BTCUSDT", limit=5, since=None, until=None):
+        """Show recent orders (synced into the local history, optionally within a date range)"""
         try:
-            orders = self.client.futures_get_all_orders(symbol=symbol, limit=limit)
+            history = self.get_history()
+            history.sync(self.client, symbol)
+            orders = history.query(symbol=symbol, start=since, end=until, limit=limit)
             print(f"\n📋 Recent {symbol} Orders:")
-            for order in orders[-limit:]:
-                status_emoji = "✅" if order['status'] == 'FILLED' else "⏳" if order['status'] == 'NEW' else "❌"
-                print(f"   {status_emoji} {order['side']} {order['origQty']} @ {order.get('avgPrice', order['price'])} [{order['status']}]")
+            for order in orders:
+                status_emoji = "✅" if order.status == 'FILLED' else "⏳" if order.status == 'NEW' else "❌"
+                opened = datetime.fromtimestamp(order.time / 1000).strftime('%Y-%m-%d %H:%M:%S')
+                print(f"   {status_emoji} {opened} {order.side} {order.quantity} @ {order.fill_price} [{order.status}]")
         except Exception as e:
             print(f"❌ Error getting orders: {e}")
 
@@ -98,7 +155,7 @@ class TradingBot:
         """Close position for symbol"""
         try:
             positions = self.client.futures_position_information(symbol=symbol)
-            current_pos = float(positions[0]['positionAmt'])
+            current_pos = Position.from_raw(positions[0]).amount
             
             if current_pos == 0:
                 print(f"ℹ️  No position to close for {symbol}")
@@ -112,48 +169,55 @@ class TradingBot:
         except Exception as e:
             print(f"❌ Error closing position: {e}")
 
+    def _order_params(self, symbol, side, order_type, quantity, price=None):
+        params = dict(symbol=symbol, side=side, type=order_type, quantity=quantity)
+        if price is not None:
+            params.update(price=price, timeInForce="GTC")
+        return params
+
     def _place_market_order(self, symbol, side, quantity):
         try:
-            result = self.client.futures_create_order(
-                symbol=symbol,
-                side=side,
-                type="MARKET",
-                quantity=quantity
-            )
+            result = self.sender.submit(self._order_params(symbol, side, "MARKET", quantity))
             
-            status_emoji = "✅" if result['status'] == 'FILLED' else "⏳"
-            print(f"{status_emoji} {side} {quantity} {symbol} [Market] - Order ID: {result['orderId']}")
+            order = Order.from_raw(result)
+            status_emoji = "✅" if order.status == 'FILLED' else "⏳"
+            print(f"{status_emoji} {side} {quantity} {symbol} [Market] - Order ID: {order.order_id}")
             return result
             
         except BinanceAPIException as e:
             print(f"❌ API Error: {e}")
             return None
+        except RiskLimitExceeded as e:
+            print(f"🛑 Blocked by risk limits: {e}")
+            return None
+        except CircuitOpen as e:
+            print(f"🛑 Not sent: {e}")
+            return None
         except Exception as e:
             print(f"❌ Error: {e}")
             return None
 
     def _place_limit_order(self, symbol, side, quantity, price):
         try:
-            result = self.client.futures_create_order(
-                symbol=symbol,
-                side=side,
-                type="LIMIT",
-                quantity=quantity,
-                price=price,
-                timeInForce="GTC"
-            )
+            result = self.sender.submit(self._order_params(symbol, side, "LIMIT", quantity, price))
             
-            print(f"⏳ {side} {quantity} {symbol} @ {price} [Limit] - Order ID: {result['orderId']}")
+            print(f"⏳ {side} {quantity} {symbol} @ {price} [Limit] - Order ID: {Order.from_raw(result).order_id}")
             return result
             
         except BinanceAPIException as e:
             print(f"❌ API Error: {e}")
             return None
+        except RiskLimitExceeded as e:
+            print(f"🛑 Blocked by risk limits: {e}")
+            return None
+        except CircuitOpen as e:
+            print(f"🛑 Not sent: {e}")
+            return None
         except Exception as e:
             print(f"❌ Error: {e}")
             return None
 
-def main():
+def build_parser():
     parser = argparse.ArgumentParser(
         prog='trade',
         description='🚀 Binance Futures Trading Bot',
@@ -167,13 +231,17 @@ Examples:
   trade sell --amount 0.005          # Sell 0.005 BTCUSDT
   trade status                       # Show account info
   trade orders                       # Show recent orders
+  trade orders -n 20 --since 2024-01-01  # Orders from a date range (local history)
+  trade status --profile live        # Use a profile from profiles.json
   trade close                        # Close BTCUSDT position
   trade close --symbol ETHUSDT       # Close ETHUSDT position
+  trade run --file commands.txt      # Run buy/sell/close lines from a file
+  cat commands.txt | trade run       # ... or from stdin, results as JSON lines
         """
     )
     
     # Main command
-    parser.add_argument('command', choices=['buy', 'sell', 'status', 'orders', 'close'], 
+    parser.add_argument('command', choices=['buy', 'sell', 'status', 'orders', 'close', 'run'], 
                        help='Trading command')
     
     # Optional arguments
@@ -185,13 +253,73 @@ Examples:
                        help='Limit price (if not specified, uses market order)')
     parser.add_argument('--mainnet', action='store_true', 
                        help='Use mainnet (default: testnet)')
-    
+    parser.add_argument('--profile', 
+                       help='Profile from profiles.json (default: the file\'s default profile)')
+    parser.add_argument('--limit', '-n', type=int, default=5, 
+                       help='Orders to show (default: 5)')
+    parser.add_argument('--since', type=parse_date, 
+                       help='Show orders from this date (YYYY-MM-DD, UTC)')
+    parser.add_argument('--until', type=parse_date, 
+                       help='Show orders up to and including this date (YYYY-MM-DD, UTC)')
+    parser.add_argument('--file', '-f', default='-', 
+                       help='Command file for run (default: stdin)')
+    parser.add_argument('--output', '-o', default='-', 
+                       help='JSON lines result file for run (default: stdout)')
+    parser.add_argument('--concurrency', '-c', type=int, default=DEFAULT_CONCURRENCY, 
+                       help=f'Commands in flight for run (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--profiler', nargs='?', const=profiler.PROFILE_FILE, metavar='FILE', 
+                       help=f'Sample the process and time order stages, writing a speedscope file on exit (default: {profiler.PROFILE_FILE})')
+    return parser
+
+def parse_date(value):
+    """YYYY-MM-DD (UTC) as epoch milliseconds"""
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+    return int(day.timestamp() * 1000)
+
+def get_profile(args):
+    """The profile selected by --profile / --mainnet"""
+    try:
+        return resolve_profile(args.profile, testnet=False if args.mainnet else None)
+    except ProfileError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+def run_file(args, parser):
+    """Execute a command file (or stdin) through one long-lived bot"""
+    out = sys.stdout if args.output == '-' else open(args.output, 'a', encoding='utf-8')
+    # Keep stdout clean for the JSON results
+    with contextlib.redirect_stdout(sys.stderr):
+        bot = TradingBot(profile=get_profile(args))
+    source = sys.stdin if args.file == '-' else open(args.file, encoding='utf-8')
+    try:
+        counts = BatchRunner(bot, parser, out, concurrency=args.concurrency).run(source)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    if counts['failed']:
+        sys.exit(1)
+
+def main():
+    parser = build_parser()
     args = parser.parse_args()
+    if args.profiler:
+        profiler.start(args.profiler, bot_class=TradingBot)
     
-    # Initialize bot
-    bot = TradingBot(testnet=not args.mainnet)
+    if args.command == 'run':
+        run_file(args, parser)
+        return
     
-    # Execute command
+    # Initialize bot
+    bot = TradingBot(profile=get_profile(args))
+    dispatch(bot, args)
+
+def dispatch(bot, args):
+    """Execute one parsed command on a bot"""
     if args.command == 'buy':
         bot.buy(args.symbol, args.amount, args.price)
     elif args.command == 'sell':
@@ -199,7 +327,8 @@ Examples:
     elif args.command == 'status':
         bot.status()
     elif args.command == 'orders':
-        bot.orders(args.symbol)
+        until = args.until + int(timedelta(days=1).total_seconds() * 1000) if args.until else None
+        bot.orders(args.symbol, args.limit, args.since, until)
     elif args.command == 'close':
         bot.close(args.symbol)
 
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Lightweight trade.py front end.
+
+Sends the command to a running daemon.py over the local socket (a few
+milliseconds of local overhead) and falls back to running trade.py
+in-process when no daemon is running.
+Usage: python trade_client.py [command] [options]   (same as trade.py)
+"""
+
+import json
+import socket
+import sys
+
+from daemon_protocol import ENCODING, endpoint, profile_name, token_path
+
+CONNECT_TIMEOUT = 0.5
+
+
+class NoAnswer(Exception):
+    """The request reached the daemon but no response came back; what it did is unknown"""
+
+
+def send(argv, profile=None):
+    """Send argv to the profile's daemon; returns its response dict or None if no daemon is running
+
+    Raises NoAnswer once the request has been written: the daemon may already
+    have acted on it, so running it again locally could place an order twice.
+    """
+    try:
+        profile = profile or profile_name(argv)
+    except ValueError:
+        return None  # unknown profile: let trade.py report it
+    family, address = endpoint(profile)
+    try:
+        with open(token_path(profile)) as f:
+            token = f.read().strip()
+        sock = socket.socket(family, socket.SOCK_STREAM)
+    except OSError:
+        return None
+    try:
+        try:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(address)
+            sock.settimeout(None)
+        except OSError:
+            return None
+        data = b""
+        try:
+            sock.sendall(json.dumps({"token": token, "argv": argv}).encode(ENCODING) + b"\n")
+            data = sock.makefile("rb").readline()
+            return json.loads(data)
+        except (OSError, ValueError) as e:
+            raise NoAnswer(f"daemon did not answer ({e})" if data else "daemon closed the connection without answering")
+    finally:
+        sock.close()
+
+
+def main():
+    argv = sys.argv[1:]
+    if any(arg == "--profiler" or arg.startswith("--profiler=") for arg in argv):
+        # The daemon would ignore it: profile a local run instead
+        print("ℹ️  --profiler runs trade.py in this process, not in the daemon")
+    elif argv and argv[0] not in ("run", "-h", "--help"):
+        try:
+            response = send(argv)
+        except NoAnswer as e:
+            print(f"❌ {e}, order state unknown: check 'status' / 'orders' before retrying")
+            sys.exit(1)
+        if response is not None:
+            sys.stdout.write(response["output"])
+            sys.exit(response["exit"])
+    import trade
+    trade.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 from binance.client import Client
 from dotenv import load_dotenv
+from datetime import datetime
+from history import OrderHistory
+import tca
+import time
 import os
 
 load_dotenv()
@@ -23,16 +27,17 @@ except Exception as e:
 
 # 2. Check recent orders
 print("\n2. Recent Orders:")
+history = OrderHistory(testnet=True)
 try:
-    orders = client.futures_get_all_orders(symbol="BTCUSDT", limit=5)
-    for order in orders[-3:]:  # Show last 3 orders
-        print(f"   Order ID: {order['orderId']}")
-        print(f"   Symbol: {order['symbol']}")
-        print(f"   Side: {order['side']}")
-        print(f"   Type: {order['type']}")
-        print(f"   Quantity: {order['origQty']}")
-        print(f"   Status: {order['status']}")
-        print(f"   Time: {order['time']}")
+    history.sync(client, "BTCUSDT")
+    for order in history.recent("BTCUSDT", 3):  # Show last 3 orders
+        print(f"   Order ID: {order.order_id}")
+        print(f"   Symbol: {order.symbol}")
+        print(f"   Side: {order.side}")
+        print(f"   Type: {order.type}")
+        print(f"   Quantity: {order.quantity}")
+        print(f"   Status: {order.status}")
+        print(f"   Time: {datetime.fromtimestamp(order.time / 1000)}")
         print("   ---")
 except Exception as e:
     print(f"   ✗ Error: {e}")
@@ -68,4 +73,21 @@ try:
 except Exception as e:
     print(f"   ✗ Error: {e}")
 
+# 5. Trading costs of the last 7 days (fills, fees, slippage, markouts)
+print("\n5. Trading Costs (last 7 days):")
+try:
+    start = int((time.time() - 7 * 86400) * 1000)
+    tca.sync(history, client, ["BTCUSDT"], start)
+    rows = tca.analyze(history, ["BTCUSDT"], start)
+    if rows:
+        row = rows[0]
+        print(f"   Fills: {row['fills']} ({row['orders']} orders), Notional: {row['notional']} USDT")
+        print(f"   Fees: {row['fees']} USDT ({row['fee_bps']} bps), Maker: {row['maker_pct']}%")
+        print(f"   Slippage vs arrival: {row['slippage_bps']} bps, Limit fill rate: {row['fill_rate_pct']}%")
+        print(f"   Markout 60s/300s: {row['markout_60s_bps']} / {row['markout_300s_bps']} bps")
+    else:
+        print("   No fills")
+except Exception as e:
+    print(f"   ✗ Error: {e}")
+
 print("\n=== TESTNET VERIFICATION COMPLETE ===")